@@ -0,0 +1,322 @@
+"""Write an anonymised copy of a real membership, include and names triple.
+
+Run with:
+    uv run benchmarks/anonymise.py members.csv include.txt bbo_names.txt \\
+        output_directory [--seed N]
+
+The copy keeps what makes real exports slow or awkward to read, so that
+a performance problem can be reproduced and shared without member data:
+
+- every row and line, in order, including preamble rows before the
+  title row, blank rows and malformed lines;
+- the length and kind of every character: digits stay digits, letters
+  stay letters of the same case, accented letters stay accented (so a
+  Windows-1252 file still needs Windows-1252), and punctuation such as
+  the commas inside quoted fields is kept;
+- the encoding, line endings, quoting and size of each file;
+- how values repeat: an EBU number or BBO username is replaced by the
+  same pseudonym wherever it appears, in any of the files, so joins and
+  duplicate EBU numbers in bbo_names behave as before.
+
+The title row and the STATUS column are kept as they are. Compressed
+membership files are read and written uncompressed, and an xlsx export
+is written as csv.
+"""
+import argparse
+import csv
+import io
+import random
+import re
+import string
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+from members_files.csv_utils import csv_encoding, open_text_file
+from members_files.validation import normalise_ebu
+from members_files.xlsx_utils import iter_xlsx_rows
+
+KEY_FIELD = 'EBU'
+KEPT_FIELDS = ('STATUS',)
+ACCENTED = 'àáâãäåçèéêëìíîïñòóôõöùúûüý'
+MAX_ATTEMPTS = 100
+FIELD_END = re.compile(r'[,\r\n]')
+
+
+class Pseudonyms():
+    """Replace values with random ones of the same shape."""
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.names = {}  # any text: its replacement
+        self.usernames = {}  # lower case username: replacement
+        self.ebus = {}  # normalised EBU number: replacement
+        self._used_usernames = set()
+        self._used_ebus = set()
+
+    def scramble(self, text: str) -> str:
+        """Return random characters of the same kinds as text."""
+        return ''.join(self._character(char) for char in text)
+
+    def name(self, text: str) -> str:
+        if text not in self.names:
+            self.names[text] = self.scramble(text)
+        return self.names[text]
+
+    def username(self, text: str) -> str:
+        """Return the same pseudonym for a username in any case."""
+        key = text.strip().lower()
+        if not key:
+            return text
+        if key not in self.usernames:
+            self.usernames[key] = self._unique(key, self._used_usernames)
+        pseudonym = self.usernames[key]
+        # Keep the case, and surrounding spaces, of this occurrence
+        start = len(text) - len(text.lstrip())
+        body = text.strip()
+        cased = ''.join(_match_case(char, like)
+                        for (char, like) in zip(pseudonym, body))
+        return (text[:start] + cased + pseudonym[len(body):]
+                + text[start + len(body):])
+
+    def ebu(self, text: str) -> str:
+        """Return the same pseudonym for an EBU number however it is
+        written, keeping leading zeros, spaces and a trailing '.0'."""
+        ebu = normalise_ebu(text)
+        if ebu is None:
+            return self.scramble(text)
+        if ebu not in self.ebus:
+            self.ebus[ebu] = self._unique_number(ebu)
+        pseudonym = iter(self.ebus[ebu])
+        output = []
+        leading = True
+        for char in text:
+            if char.isdigit() and leading and char == '0' and ebu != '0':
+                output.append(char)
+                continue
+            if char.isdigit():
+                leading = False
+                output.append(next(pseudonym, char))
+            else:
+                output.append(char)
+        return ''.join(output)
+
+    def _unique(self, text: str, used: set) -> str:
+        for _ in range(MAX_ATTEMPTS):
+            pseudonym = self.scramble(text)
+            if pseudonym not in used:
+                used.add(pseudonym)
+                return pseudonym
+        # Too few values of this shape; a longer one is still unique
+        return self._unique(text + 'x', used)
+
+    def _unique_number(self, ebu: str) -> str:
+        """Return an unused number with as many digits as ebu, which
+        replaces its digits one for one."""
+        low = 10 ** (len(ebu) - 1) if len(ebu) > 1 else 0
+        high = 10 ** len(ebu) - 1
+        for _ in range(MAX_ATTEMPTS):
+            pseudonym = str(self.rng.randint(low, high))
+            if pseudonym not in self._used_ebus:
+                break
+        else:
+            # Most numbers of this length are used; take the next free
+            # one. There is always one, as the EBU numbers are distinct.
+            start = self.rng.randint(low, high)
+            span = high - low + 1
+            for step in range(span):
+                pseudonym = str(low + (start - low + step) % span)
+                if pseudonym not in self._used_ebus:
+                    break
+        self._used_ebus.add(pseudonym)
+        return pseudonym
+
+    def _character(self, char: str) -> str:
+        if char.isascii() and char.isdigit():
+            return self.rng.choice(string.digits)
+        if char.isascii() and char.isalpha():
+            return _match_case(self.rng.choice(string.ascii_lowercase), char)
+        if char.isalpha():
+            return _match_case(self.rng.choice(ACCENTED), char)
+        return char
+
+
+def _match_case(char: str, like: str) -> str:
+    return char.upper() if like.isupper() else char.lower()
+
+
+def anonymise_members(path: Path, output: Path,
+                      pseudonyms: Pseudonyms) -> None:
+    if path.suffix.lower() == '.xlsx':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\r\n')
+        writer.writerows(row for (_, row) in iter_xlsx_rows(path))
+        (text, encoding) = (buffer.getvalue(), 'utf8')
+    else:
+        encoding = csv_encoding(path)
+        with open_text_file(path, encoding) as f_csv:
+            text = f_csv.read()
+        encoding = encoding or 'utf8'
+
+    fieldnames = None
+    output_text = []
+    for (fields, ending) in csv_records(text):
+        row = [value for (value, quoting) in fields]
+        if fieldnames is None:
+            if KEY_FIELD in row:
+                fieldnames = row
+            else:
+                # Preamble rows may name the club
+                row = [pseudonyms.scramble(item) for item in row]
+        else:
+            row = [_member_field(fieldnames[index]
+                                 if index < len(fieldnames) else '',
+                                 item, pseudonyms)
+                   for (index, item) in enumerate(row)]
+        output_text.append(','.join(
+            _field_text(value, quoting)
+            for (value, (_, quoting)) in zip(row, fields)))
+        output_text.append(ending)
+
+    with open(output, 'w', encoding=encoding, newline='') as f_csv:
+        f_csv.write(''.join(output_text))
+
+
+def csv_records(text: str) -> Iterator[tuple[list[tuple], str]]:
+    """
+    Yield (fields, line ending) for each record of csv text.
+
+    Each field is (value, quoting). Values are read as csv.reader reads
+    them; quoting is None for a value not in quotes, otherwise (length,
+    closed): how much of the value is within the quotes and whether they
+    were closed, as text between a closing quote and the next comma is
+    part of a malformed value. With these, the record can be written
+    back exactly as it was.
+    """
+    (pos, size) = (0, len(text))
+    while pos < size:
+        fields = []
+        while True:
+            if text.startswith('"', pos):
+                chars = []
+                closed = False
+                pos += 1
+                while pos < size and not closed:
+                    if text[pos] != '"':
+                        chars.append(text[pos])
+                        pos += 1
+                    elif text.startswith('""', pos):
+                        chars.append('"')
+                        pos += 2
+                    else:
+                        closed = True
+                        pos += 1
+                end = _field_end(text, pos)
+                fields.append((''.join(chars) + text[pos:end],
+                               (len(chars), closed)))
+            else:
+                end = _field_end(text, pos)
+                fields.append((text[pos:end], None))
+            pos = end
+            if not text.startswith(',', pos):
+                break
+            pos += 1
+        ending = ('\r\n' if text.startswith('\r\n', pos)
+                  else text[pos:pos + 1])
+        pos += len(ending)
+        yield (fields, ending)
+
+
+def _field_end(text: str, pos: int) -> int:
+    """Return the position of the comma or line end after pos."""
+    match = FIELD_END.search(text, pos)
+    return match.start() if match else len(text)
+
+
+def _field_text(value: str, quoting: tuple[int, bool] | None) -> str:
+    if quoting is None:
+        return value
+    (length, closed) = quoting
+    return ('"' + value[:length].replace('"', '""')
+            + ('"' if closed else '') + value[length:])
+
+
+def _member_field(field: str, value: str, pseudonyms: Pseudonyms) -> str:
+    if field in KEPT_FIELDS:
+        return value
+    if field == KEY_FIELD:
+        return pseudonyms.ebu(value)
+    if field == 'BBOUSERNAME':
+        return pseudonyms.username(value)
+    return pseudonyms.name(value)
+
+
+def anonymise_lines(path: Path, output: Path, pseudonyms: Pseudonyms,
+                    names_file: bool) -> None:
+    """Anonymise an include file, or a bbo_names file of
+    username,first name,surname,EBU lines."""
+    data = path.read_bytes()
+    try:
+        (text, encoding) = (data.decode('utf8'), 'utf8')
+    except UnicodeDecodeError:
+        (text, encoding) = (data.decode('Windows-1252'), 'Windows-1252')
+
+    lines = []
+    for line in text.splitlines(keepends=True):
+        body = line.rstrip('\r\n')
+        ending = line[len(body):]
+        if names_file:
+            fields = body.split(',')
+            converters = (pseudonyms.username, pseudonyms.name,
+                          pseudonyms.name, pseudonyms.ebu)
+            body = ','.join(
+                converters[index](field) if index < len(converters)
+                else pseudonyms.scramble(field)
+                for (index, field) in enumerate(fields))
+        else:
+            body = pseudonyms.username(body)
+        lines.append(body + ending)
+    output.write_bytes(''.join(lines).encode(encoding))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Write an anonymised copy of the input files.')
+    parser.add_argument('member_file', type=Path)
+    parser.add_argument('bbo_include_file', type=Path)
+    parser.add_argument('bbo_names_file', type=Path)
+    parser.add_argument('output_directory', type=Path)
+    parser.add_argument('--seed', type=int,
+                        help='repeat a previous run; omit for real data')
+    args = parser.parse_args()
+
+    pseudonyms = Pseudonyms(random.Random(args.seed))
+    args.output_directory.mkdir(parents=True, exist_ok=True)
+    member_name = Path(args.member_file.name)
+    while member_name.suffix.lower() in ('.gz', '.bz2', '.xz', '.zip',
+                                         '.xlsx'):
+        member_name = member_name.with_suffix('')
+    outputs = (
+        Path(args.output_directory, member_name.with_suffix('.csv')),
+        Path(args.output_directory, args.bbo_include_file.name),
+        Path(args.output_directory, args.bbo_names_file.name),
+    )
+    if args.output_directory.resolve() in (
+            path.parent.resolve() for path in (
+                args.member_file, args.bbo_include_file,
+                args.bbo_names_file)):
+        sys.exit('*** The output directory must not hold the inputs ***')
+
+    # Members first, so their usernames and EBU numbers are mapped in
+    # file order
+    anonymise_members(args.member_file, outputs[0], pseudonyms)
+    anonymise_lines(args.bbo_include_file, outputs[1], pseudonyms, False)
+    anonymise_lines(args.bbo_names_file, outputs[2], pseudonyms, True)
+    for (source, output) in zip(
+            (args.member_file, args.bbo_include_file, args.bbo_names_file),
+            outputs):
+        print(f'{source.name}: {source.stat().st_size} bytes -> '
+              f'{output}: {output.stat().st_size} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Compare reading compressed and uncompressed membership exports.
+
+Run with: uv run benchmarks/bench_compressed.py [rows]
+"""
+import bz2
+import csv
+import gzip
+import lzma
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from members_files.csv_utils import get_records_from_csv_file
+
+DEFAULT_ROWS = 50_000
+REPEATS = 3
+HEADER = ['EBU', 'FIRSTNAME', 'SURNAME', 'BBOUSERNAME', 'STATUS', 'EMAIL']
+
+
+def _write_exports(directory: Path, rows: int) -> dict[str, Path]:
+    plain = Path(directory, 'members.csv')
+    with open(plain, 'w', newline='', encoding='utf8') as f_csv:
+        writer = csv.writer(f_csv)
+        writer.writerow(['Membership export'])
+        writer.writerow([])
+        writer.writerow(HEADER)
+        for index in range(rows):
+            writer.writerow([
+                100000 + index,
+                f'First{index}',
+                f'Surname{index % 997}',
+                f'user{index}',
+                'Member' if index % 5 else 'Lapsed',
+                f'member{index}@example.com',
+            ])
+    data = plain.read_bytes()
+
+    paths = {'csv': plain}
+    for (name, module) in (('gz', gzip), ('bz2', bz2), ('xz', lzma)):
+        path = Path(directory, f'members.csv.{name}')
+        path.write_bytes(module.compress(data))
+        paths[name] = path
+
+    path = Path(directory, 'members.zip')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('members.csv', data)
+    paths['zip'] = path
+    return paths
+
+
+def _time_read(path: Path) -> tuple[float, int]:
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        (records, _fieldnames) = get_records_from_csv_file(path, 'EBU')
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return (best, len(records))
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    with tempfile.TemporaryDirectory() as directory:
+        paths = _write_exports(Path(directory), rows)
+        size = paths['csv'].stat().st_size
+        print(f'{rows} rows, {size / 1e6:.1f} MB uncompressed')
+        print(f'{"format":<8}{"on disk MB":>12}{"seconds":>10}'
+              f'{"MB/s":>8}{"rows/s":>12}')
+        for (name, path) in paths.items():
+            (elapsed, count) = _time_read(path)
+            print(f'{name:<8}{path.stat().st_size / 1e6:>12.2f}'
+                  f'{elapsed:>10.3f}{size / 1e6 / elapsed:>8.1f}'
+                  f'{count / elapsed:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""Time the report window's interactions against a latency budget.
+
+MainFrame and ReportFrame are driven programmatically on synthetic
+input files of increasing size. Each interaction is timed twice: how
+long it blocks the main loop, and the wall time until the window has
+finished redrawing. The run fails (exit status 1) if a wall time
+exceeds its budget in gui_budget.json.
+
+Without a DISPLAY the benchmark runs under Xvfb, which must be
+installed:
+    uv run benchmarks/bench_gui.py [rows ...]
+"""
+import functools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from psiutils.treeview import sort_treeview
+from psiutils.widgets import get_styles
+
+from bench_threads import write_sources
+from members_files.backups import BackupStore
+from members_files.config import config_service
+from members_files.forms import frm_report
+from members_files.forms.frm_main import MainFrame
+from members_files.forms.frm_report import ReportFrame
+
+DEFAULT_ROWS = (1_000, 10_000, 50_000)
+BUDGET_PATH = Path(Path(__file__).parent, 'gui_budget.json')
+XVFB_TIMEOUT = 10.0  # seconds
+
+
+@contextmanager
+def _virtual_display() -> Iterator[None]:
+    """Run the block under Xvfb unless there is a display already."""
+    if os.environ.get('DISPLAY'):
+        yield
+        return
+    (read_fd, write_fd) = os.pipe()
+    try:
+        xvfb = subprocess.Popen(
+            ['Xvfb', '-displayfd', str(write_fd), '-screen', '0',
+             '1280x1024x24', '-nolisten', 'tcp'],
+            pass_fds=(write_fd,), stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        sys.exit('*** No DISPLAY, and Xvfb is not installed ***')
+    os.close(write_fd)
+    try:
+        # Xvfb writes its display number when it is ready
+        with os.fdopen(read_fd) as f_display:
+            display = f_display.readline().strip()
+        if not display:
+            sys.exit('*** Xvfb did not start ***')
+        os.environ['DISPLAY'] = f':{display}'
+        yield
+    finally:
+        xvfb.terminate()
+        xvfb.wait(XVFB_TIMEOUT)
+        os.environ.pop('DISPLAY', None)
+
+
+def _measure(root: tk.Tk, action: Callable[[], object]) -> tuple:
+    """Return the ms action blocked the main loop, and until idle."""
+    start = time.perf_counter()
+    action()
+    blocked = time.perf_counter() - start
+    root.update()
+    wall = time.perf_counter() - start
+    return (blocked * 1000, wall * 1000)
+
+
+def _interactions(main: MainFrame) -> Iterator[tuple[str, Callable]]:
+    """Yield (name, action) for each interaction, in the order run."""
+    report = None
+
+    def open_report() -> None:
+        nonlocal report
+        report = ReportFrame(main)
+
+    yield ('open_report', open_report)
+    yield ('populate_include', lambda: report._populate_include_tree())
+    yield ('populate_names', lambda: report._populate_names_tree())
+    yield ('populate_suggestions',
+           lambda: report._populate_suggestions_tree())
+    yield ('sort_include', lambda: report._sort_tree(
+        report.include_tree, 'name'))
+    yield ('sort_suggestions', lambda: sort_treeview(
+        report.suggestions_tree, 'name', False))
+    yield ('search', lambda: report.search.set('user1'))
+    yield ('copy_include', lambda: report._copy_include())
+    yield ('close_report', lambda: report.root.destroy())
+
+
+def _run(root: tk.Tk, directory: Path, rows: int) -> dict[str, tuple]:
+    sources = write_sources(directory, rows)
+    main = MainFrame(root)
+    # Point the window at the synthetic files without saving the choice
+    main.member_file.set(sources.member_file.get())
+    main.bbo_include_file.set(sources.bbo_include_file.get())
+    main.bbo_names_file.set(sources.bbo_names_file.get())
+    main.other_include_files.get().clear()
+    root.update()
+    return {name: _measure(root, action)
+            for (name, action) in _interactions(main)}
+
+
+class _NoUpload():
+    """Stands in for BackgroundUpload: finished at once, nothing sent."""
+    done = True
+    result = None
+    error = None
+
+    def __init__(self, *args) -> None:
+        pass
+
+    def start(self) -> '_NoUpload':
+        return self
+
+
+def _isolate(directory: Path) -> None:
+    """Keep the run from changing the user's config and backups, from
+    uploading, and from waiting on dialogs."""
+    config_service.window_resize = lambda *args: None
+    frm_report.BackupStore = functools.partial(
+        BackupStore, directory=Path(directory, 'backups'))
+    frm_report.BackgroundUpload = _NoUpload
+    messagebox = frm_report.messagebox
+    messagebox.askyesno = lambda *args, **kwargs: True
+    messagebox.showinfo = lambda *args, **kwargs: 'ok'
+    messagebox.showerror = lambda *args, **kwargs: 'ok'
+
+
+def _over_budget(results: dict, budget: dict) -> list[str]:
+    output = []
+    for (rows, timings) in results.items():
+        for (name, (_, wall)) in timings.items():
+            limit = budget.get(name, {}).get(str(rows))
+            if limit is not None and wall > limit:
+                output.append(f'{name} with {rows} rows took {wall:.0f}ms, '
+                              f'budget {limit}ms')
+    return output
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_ROWS)
+    budget = json.loads(BUDGET_PATH.read_text(encoding='utf8'))
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, _virtual_display():
+        _isolate(Path(directory))
+        for rows in sizes:
+            root = tk.Tk()
+            get_styles()
+            run_directory = Path(directory, str(rows))
+            run_directory.mkdir()
+            results[rows] = _run(root, run_directory, rows)
+            root.destroy()
+
+    for (rows, timings) in results.items():
+        print(f'{rows} members')
+        print(f'  {"interaction":<22}{"blocked":>10}{"wall":>10}')
+        for (name, (blocked, wall)) in timings.items():
+            print(f'  {name:<22}{blocked:>8.0f}ms{wall:>8.0f}ms')
+
+    over = _over_budget(results, budget)
+    for line in over:
+        print(f'*** Over budget: {line} ***')
+    if over:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Compare parsing the input files in turn and on a thread pool.
+
+The thread pool only helps on a free-threaded interpreter, e.g.
+    uv run --python 3.13t benchmarks/bench_threads.py [rows]
+On a build with the GIL the threaded timing shows the overhead instead.
+"""
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from members_files.parallel import gil_enabled
+from members_files.process import Compare, SourceFiles
+
+DEFAULT_ROWS = 200_000
+REPEATS = 3
+HEADER = ['EBU', 'FIRSTNAME', 'SURNAME', 'BBOUSERNAME', 'STATUS']
+
+
+def write_sources(directory: Path, rows: int) -> SourceFiles:
+    """Write synthetic membership, include and bbo_names files of rows
+    members to directory."""
+    members = Path(directory, 'members.csv')
+    with open(members, 'w', newline='', encoding='utf8') as f_csv:
+        writer = csv.writer(f_csv)
+        writer.writerow(HEADER)
+        for index in range(rows):
+            writer.writerow([
+                100000 + index,
+                f'First{index}',
+                f'Surname{index % 997}',
+                f'user{index}',
+                'Member' if index % 5 else 'Lapsed',
+            ])
+
+    include = Path(directory, 'include.txt')
+    include.write_text(
+        '\n'.join(f'user{index}' for index in range(0, rows, 2)),
+        encoding='utf8')
+
+    names = Path(directory, 'bbo_names.txt')
+    names.write_text(
+        '\n'.join(f'user{index},First{index},Surname{index % 997},'
+                  f'{100000 + index}' for index in range(0, rows, 3)),
+        encoding='utf8')
+    return SourceFiles(str(members), str(include), str(names))
+
+
+def _time_compare(sources: SourceFiles, parallel: bool) -> float:
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        Compare(sources, parallel=parallel)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    gil = 'enabled' if gil_enabled() else 'disabled'
+    print(f'Python {sys.version.split()[0]}, GIL {gil}, {rows} members')
+    with tempfile.TemporaryDirectory() as directory:
+        sources = write_sources(Path(directory), rows)
+        sequential = _time_compare(sources, parallel=False)
+        threaded = _time_compare(sources, parallel=True)
+    print(f'{"sequential":<12}{sequential:>8.3f}s')
+    print(f'{"threads":<12}{threaded:>8.3f}s')
+    print(f'{"speedup":<12}{sequential / threaded:>8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Keep the last few versions of a file before it is overwritten.
+
+Each file has its own directory under USER_DATA_DIR/backups. The newest
+version is stored whole (compressed) and each older version is stored
+as a compressed reverse delta: the edits that turn the next newer
+version back into it. Backing up a new version therefore rewrites only
+the previous head as a delta, and the oldest version can be dropped by
+deleting one file.
+
+Deltas between sorted files, which is how the include and bbo_names
+files are written, are found by a single merge of the two line lists.
+Other files fall back to difflib.
+"""
+import difflib
+import hashlib
+import json
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from members_files.constants import USER_DATA_DIR
+from members_files.diff import sorted_diff
+from members_files.file_utils import atomic_file, write_text_atomic
+
+BACKUP_DIR = Path(USER_DATA_DIR, 'backups')
+DEFAULT_KEEP = 10
+INDEX_FILE = 'index.json'
+ENCODING = ('utf8', 'surrogateescape')  # keeps any bytes round trip
+
+
+@dataclass
+class Version():
+    """A backed up version of a file."""
+    id: int
+    time: str  # ISO format
+    size: int
+    sha256: str
+    file: str  # name of the stored head or delta
+
+
+class BackupStore():
+    """The backed up versions of one file, newest last."""
+    def __init__(self, path: str | Path, directory: str | Path = BACKUP_DIR,
+                 keep: int = DEFAULT_KEEP) -> None:
+        self.path = Path(path).resolve()
+        digest = hashlib.sha256(str(self.path).encode('utf8')).hexdigest()
+        self.directory = Path(directory, f'{self.path.name}-{digest[:12]}')
+        self.keep = max(keep, 1)
+        self.versions = self._read_index()
+
+    def _read_index(self) -> list[Version]:
+        try:
+            with open(Path(self.directory, INDEX_FILE),
+                      encoding='utf8') as f_index:
+                content = json.load(f_index)
+            return [Version(**item) for item in content['versions']]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError,
+                TypeError):
+            return []
+
+    def _write_index(self) -> None:
+        content = {'path': str(self.path),
+                   'versions': [asdict(version) for version in self.versions]}
+        write_text_atomic(Path(self.directory, INDEX_FILE),
+                          json.dumps(content, indent=1))
+
+    def backup(self) -> Version | None:
+        """
+        Store the file's current content as the newest version.
+
+        Return the new Version, or None if the file does not exist or is
+        the same as the newest version.
+        """
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return None
+        sha256 = hashlib.sha256(data).hexdigest()
+        if self.versions and self.versions[-1].sha256 == sha256:
+            return None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        new_id = self.versions[-1].id + 1 if self.versions else 1
+        now = datetime.now().isoformat(timespec='seconds')
+        version = Version(new_id, now, len(data), sha256, f'{new_id}.full.z')
+        _write_compressed(Path(self.directory, version.file), data)
+
+        old_head = None
+        if self.versions:
+            # Replace the previous head with the edits back to it from here
+            head = self.versions[-1]
+            old_head = Path(self.directory, head.file)
+            previous = _read_compressed(old_head)
+            delta = make_delta(_lines(data), _lines(previous))
+            head.file = f'{head.id}.delta.z'
+            _write_compressed(Path(self.directory, head.file),
+                              json.dumps(delta).encode('utf8'))
+
+        self.versions.append(version)
+        dropped = self.versions[:-self.keep]
+        self.versions = self.versions[-self.keep:]
+        self._write_index()
+        if old_head:
+            old_head.unlink(missing_ok=True)
+        for old in dropped:
+            Path(self.directory, old.file).unlink(missing_ok=True)
+        return version
+
+    def read(self, version_id: int) -> bytes:
+        """Return the content of a version. Raises KeyError if unknown."""
+        ids = [version.id for version in self.versions]
+        if version_id not in ids:
+            raise KeyError(f'No version {version_id} of {self.path}')
+        head = self.versions[-1]
+        lines = _lines(_read_compressed(Path(self.directory, head.file)))
+        for version in reversed(self.versions[:-1]):
+            if version.id < version_id:
+                break
+            delta = json.loads(
+                _read_compressed(Path(self.directory, version.file)))
+            lines = apply_delta(lines, delta)
+        return '\n'.join(lines).encode(*ENCODING)
+
+    def restore(self, version_id: int) -> None:
+        """Back up the file and replace it with an earlier version."""
+        data = self.read(version_id)
+        self.backup()
+        with atomic_file(self.path, 'wb') as f_restored:
+            f_restored.write(data)
+
+
+def make_delta(base: list[str], target: list[str]) -> dict:
+    """Return the edits that turn the base lines into the target lines."""
+    if _is_sorted(base) and _is_sorted(target):
+        diff = sorted_diff(base, target)
+        return {'sorted': True, 'added': diff.added, 'removed': diff.removed}
+    matcher = difflib.SequenceMatcher(None, base, target, autojunk=False)
+    ops = []
+    for (tag, i1, i2, j1, j2) in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(target[j1:j2])
+    return {'sorted': False, 'ops': ops}
+
+
+def apply_delta(base: list[str], delta: dict) -> list[str]:
+    """Return the lines given by applying a delta to the base lines."""
+    if not delta['sorted']:
+        output = []
+        for op in delta['ops']:
+            if op and isinstance(op[0], int):
+                output.extend(base[op[0]:op[1]])
+            else:
+                output.extend(op)
+        return output
+
+    # Merge the kept base lines with the added lines, both sorted
+    (removed, added) = (delta['removed'], delta['added'])
+    output = []
+    (r, a) = (0, 0)
+    for line in base:
+        if r < len(removed) and removed[r] == line:
+            r += 1
+            continue
+        while a < len(added) and added[a] < line:
+            output.append(added[a])
+            a += 1
+        output.append(line)
+    output.extend(added[a:])
+    return output
+
+
+def _is_sorted(lines: list[str]) -> bool:
+    return all(lines[index] <= lines[index + 1]
+               for index in range(len(lines) - 1))
+
+
+def _lines(data: bytes) -> list[str]:
+    return data.decode(*ENCODING).split('\n')
+
+
+def _write_compressed(path: Path, data: bytes) -> None:
+    path.write_bytes(zlib.compress(data))
+
+
+def _read_compressed(path: Path) -> bytes:
+    return zlib.decompress(path.read_bytes())
@@ -0,0 +1,109 @@
+"""Look up a batch of EBU numbers or BBO usernames in one pass."""
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from members_files.process import Compare
+from members_files.validation import normalise_ebu
+
+# Entries may be pasted one per line or separated by commas, semicolons
+# or tabs, e.g. a column copied from a spreadsheet
+ENTRY_SEPARATORS = re.compile(r'[\s,;]+')
+
+
+@dataclass
+class LookupResult():
+    """What the three files hold for one entry of a batch."""
+    entry: str
+    ebu: str = ''
+    name: str = ''
+    status: str = ''  # from the membership file
+    bbo: str = ''
+    in_members: bool = False
+    in_names: bool = False
+    include_files: list[str] = field(default_factory=list)
+
+    @property
+    def found(self) -> bool:
+        return bool(self.in_members or self.in_names or self.include_files)
+
+
+def parse_entries(text: str) -> list[str]:
+    """Return the distinct entries in pasted text, in order."""
+    return list(dict.fromkeys(
+        entry for entry in ENTRY_SEPARATORS.split(text) if entry))
+
+
+class BulkLookup():
+    """
+    Resolve batches of entries against the indexes of a Compare.
+
+    The EBU numbers of each BBO username are indexed once, in time linear
+    in the size of the files; each entry is then found with a few dict
+    lookups, so a batch takes time linear in its size.
+
+    An entry may be an EBU number or a username; a username used by more
+    than one EBU number gives a result for each.
+    """
+    def __init__(self, comparison: Compare) -> None:
+        self.comparison = comparison
+        self.usernames = defaultdict(list)  # username: EBU numbers
+        for files in (comparison.members_ebu, comparison.members_bbo):
+            for (ebu, member) in files.items():
+                if member.bbo and ebu not in self.usernames[member.bbo]:
+                    self.usernames[member.bbo].append(ebu)
+
+    def lookup(self, entries: list[str]) -> list[LookupResult]:
+        output = []
+        for entry in entries:
+            output.extend(self._lookup(entry))
+        return output
+
+    def ebus(self, query: str) -> list[str]:
+        """Return the EBU numbers that query, a lower case EBU number or
+        username, refers to in the membership or bbo_names file."""
+        comparison = self.comparison
+        ebus = []
+        ebu = normalise_ebu(query)
+        if ebu and (ebu in comparison.members_ebu
+                    or ebu in comparison.members_bbo):
+            ebus.append(ebu)
+        ebus.extend(ebu for ebu in self.usernames.get(query, ())
+                    if ebu not in ebus)
+        return ebus
+
+    def include_files(self, username: str) -> list[str]:
+        """Return the include files that list username."""
+        lists = self.comparison.include_index.get(username, 0)
+        return [path for (index, path)
+                in enumerate(self.comparison.include_paths)
+                if lists & 1 << index]
+
+    def _lookup(self, entry: str) -> list[LookupResult]:
+        comparison = self.comparison
+        query = entry.strip().lower()
+        ebus = self.ebus(query)
+
+        if not ebus:
+            files = self.include_files(query)
+            return [LookupResult(entry, bbo=query if files else '',
+                                 include_files=files)]
+
+        output = []
+        for ebu in ebus:
+            member = comparison.members_ebu.get(ebu)
+            names_entry = comparison.members_bbo.get(ebu)
+            person = member or names_entry
+            bbo = (member.bbo if member and member.bbo
+                   else names_entry.bbo if names_entry else '')
+            output.append(LookupResult(
+                entry,
+                ebu,
+                f'{person.first_name} {person.last_name}'.strip(),
+                member.status if member else '',
+                bbo,
+                member is not None,
+                names_entry is not None,
+                self.include_files(bbo),
+            ))
+        return output
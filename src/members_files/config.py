@@ -1,8 +1,15 @@
 """Config for Phoenix Members Files."""
+import io
+import tkinter as tk
+from copy import deepcopy
+from pathlib import Path
 
 from psiconfig import TomlConfig
+from psi_toml.parser import TOMLDecodeError, TomlParser
 
 from  members_files.constants import CONFIG_PATH, USER_DATA_DIR
+from members_files.file_utils import write_text_atomic
+from members_files.rules import DEFAULT_RULES
 
 DEFAULT_CONFIG = {
     'data_directory': USER_DATA_DIR,
@@ -11,23 +18,165 @@ DEFAULT_CONFIG = {
         'frm_main': '500x600',
         'frm_config': '700x300',
     },
+    'rules': DEFAULT_RULES,
+    'schemas': [],  # membership export layouts besides the EBU club's
+    'memory_budget_mb': 0,  # compare out of core above this; 0 for never
+    'stall_threshold_ms': 0,  # log main loop stalls above this; 0 for off
+    'backup_versions': 10,  # versions kept of the include and names files
+    'upload_url': '',  # include list endpoint; '' for no upload
+    'upload_token': '',
+    'upload_batch_size': 500,  # usernames in each upload request
+    'upload_requests_per_second': 2.0,
 }
 
+# Delay after the last <Configure> event before geometry is written (ms)
+GEOMETRY_SAVE_DELAY = 500
+
+# Values that must be a list of dicts, in Python literal syntax
+LIST_FIELDS = ('rules', 'schemas')
+
+toml = TomlParser()
+
 
 def read_config(restore_defaults: bool = False) -> TomlConfig:
     """Return the config file."""
     return TomlConfig(
         path=CONFIG_PATH,
-        defaults=DEFAULT_CONFIG,
+        defaults=deepcopy(DEFAULT_CONFIG),
         restore_defaults=restore_defaults)
 
 
 def save_config(config: TomlConfig) -> TomlConfig | None:
-    result = config.save()
-    if result != config.STATUS_OK:
+    """Write config atomically and return it (None on failure)."""
+    try:
+        _write_config(config)
+    except OSError:
         return None
-    config = TomlConfig(CONFIG_PATH)
     return config
 
 
-config = read_config()
+def config_error(path: str | Path) -> str:
+    """
+    Return why the config file at path could not be read as written, or
+    '' if it was (or there is no file).
+
+    TomlConfig uses the defaults, with only a warning, for a file that
+    does not parse, and the parser reads some TOML it does not support
+    into the wrong shape.
+    """
+    try:
+        with open(path, encoding='utf-8') as f_config:
+            text = f_config.read()
+    except (FileNotFoundError, NotADirectoryError):
+        return ''
+    except (OSError, UnicodeDecodeError) as error:
+        return f'{path}: {error}'
+    try:
+        values = toml.load(io.StringIO(text))
+    except TOMLDecodeError as error:
+        return f'{path}: {error}'
+    for field in LIST_FIELDS:
+        value = values.get(field, [])
+        if (not isinstance(value, list)
+                or not all(isinstance(item, dict) for item in value)):
+            return (f"{path}: {field} must be a list of dicts on one line, "
+                    f"e.g. {field} = [{{'name': ...}}]")
+    return ''
+
+
+def _write_config(config: TomlConfig) -> None:
+    output = io.StringIO()
+    toml.dump(config.config, output)
+    write_text_atomic(config.path, output.getvalue(), encoding='utf-8')
+
+
+class ConfigService():
+    """
+    Hold the application config in memory and write it only when needed.
+
+    All frames share one instance so the TOML file is parsed once. Values
+    changed through `update` are tracked and written by `save`; window
+    geometry changes are coalesced and written once the window settles.
+
+    If the file could not be read as written, `load_error` says why and
+    it is never saved, as that would replace the user's settings with
+    the defaults.
+    """
+    def __init__(self, config: TomlConfig) -> None:
+        self.config = config
+        self.changed = set()
+        self._save_job = None
+        self._save_root = None
+        self.load_error = config_error(config.path)
+        if self.load_error:
+            print(f'*** {self.load_error}. The config will not be saved '
+                  'until it is corrected ***')
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self.config, name)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.changed)
+
+    def update(self, field: str, value: object) -> None:
+        """Set a config value, tracking it only if it differs."""
+        current = self.config.config.get(field)
+        if field in self.config.config and current == value:
+            return
+        self.config.update(field, value, force=True)
+        self.changed.add(field)
+
+    def window_geometry(self, key: str, default: str = '') -> str:
+        """Return the stored geometry for a window key."""
+        return self.config.geometry.get(key, default)
+
+    def save(self) -> bool:
+        """Write the config if anything has changed."""
+        self._cancel_save()
+        if not self.changed:
+            return True
+        if self.load_error:
+            return False
+        if save_config(self.config) is None:
+            return False
+        self.changed.clear()
+        return True
+
+    def window_resize(self, event: object, file: str) -> None:
+        """
+        Record a toplevel's geometry and schedule a debounced save.
+
+        Bind to `<Configure>`; events raised by child widgets and events
+        that leave the geometry unchanged are ignored.
+        """
+        widget = event.widget
+        if widget is not widget.winfo_toplevel():
+            return
+        key = Path(file).stem
+        window_geometry = widget.geometry()
+        if self.window_geometry(key) == window_geometry:
+            return
+        geometry = dict(self.config.geometry)
+        geometry[key] = window_geometry
+        self.update('geometry', geometry)
+        self._schedule_save(widget.nametowidget('.'))
+
+    def _schedule_save(self, root: object) -> None:
+        self._cancel_save()
+        self._save_root = root
+        self._save_job = root.after(GEOMETRY_SAVE_DELAY, self.save)
+
+    def _cancel_save(self) -> None:
+        if self._save_job is None:
+            return
+        try:
+            self._save_root.after_cancel(self._save_job)
+        except tk.TclError:  # root already destroyed
+            pass
+        self._save_job = None
+        self._save_root = None
+
+
+config_service = ConfigService(read_config())
+config = config_service.config
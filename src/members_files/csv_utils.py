@@ -1,5 +1,26 @@
+import bz2
 import csv
+import gzip
+import io
+import lzma
+import zipfile
 from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from xml.etree.ElementTree import ParseError
+
+from members_files.xlsx_utils import iter_xlsx_rows
+
+# Compressed formats that are decompressed as they are read
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zip')
+
+DECODE_CHUNK = 1 << 20
+
+# Errors raised when a file (or compressed archive) cannot be read; an
+# xlsx file without the worksheet it names raises KeyError
+READ_ERRORS = (OSError, EOFError, zipfile.BadZipFile, lzma.LZMAError,
+               ParseError, KeyError)
 
 
 def get_dict_from_csv_file(csv_path, key_field) -> tuple[dict, list]:
@@ -18,6 +39,58 @@ def get_dict_from_csv_file(csv_path, key_field) -> tuple[dict, list]:
     return (data_dict, fieldnames)
 
 
+def get_records_from_csv_file(csv_path, key_field) -> tuple[list, list]:
+    """ Return the rows after the title row as a list of
+        (line number, dict of fields: values) and the fieldnames.
+
+        The file may be csv (optionally compressed) or xlsx; rows are
+        streamed from the file rather than read into a list first."""
+    fieldnames = []
+    try:
+        records = list(iter_records_from_csv_file(
+            csv_path, key_field, fieldnames))
+        return (records, fieldnames)
+    except UnicodeDecodeError:
+        fieldnames.clear()
+        records = list(iter_records_from_csv_file(
+            csv_path, key_field, fieldnames, encoding='Windows-1252'))
+        return (records, fieldnames)
+    except FileNotFoundError:
+        print(f'File not found: {csv_path}')
+    return ([], [])
+
+
+def iter_records_from_csv_file(csv_path, key_field, fieldnames: list,
+                               encoding: str | None = None) -> Iterator:
+    """ Yield (line number, dict of fields: values) for the rows after the
+        title row. fieldnames is filled in when the title row is found.
+
+        Use csv_encoding first if the file may not be in the default
+        encoding, as decoding errors cannot be recovered part way."""
+    for (line, row) in iter_numbered_rows(csv_path, encoding):
+        if not fieldnames:
+            if key_field in row:
+                fieldnames.extend(row)
+            continue
+        if not row:
+            continue
+        yield (line, dict(zip(fieldnames, row)))
+
+
+def csv_encoding(path) -> str | None:
+    """ Return the encoding to read path with: None (the default) if it
+        decodes, otherwise Windows-1252. The file is read in chunks."""
+    if Path(path).suffix.lower() == '.xlsx':
+        return None
+    try:
+        with open_text_file(path) as f_csv:
+            while f_csv.read(DECODE_CHUNK):
+                pass
+    except UnicodeDecodeError:
+        return 'Windows-1252'
+    return None
+
+
 def _get_csv_fields(csv_list, key_field):
     """Return a dict of text: column and  column: text from the title row."""
     db_fields = {}
@@ -34,25 +107,71 @@ def _get_csv_fields(csv_list, key_field):
 
 def _get_csv_file_as_list(path) -> list[list]:
     """Return csv file as a list of lists."""
+    return [row for (line, row) in get_numbered_csv_rows(path)]
+
+
+@contextmanager
+def open_text_file(path, encoding: str | None = None):
+    """ Open a text file for reading, decompressing it on the fly if it is
+        a .gz, .bz2, .xz or .zip file (the first csv file in a zip archive,
+        or its first file if it holds no csv)."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.gz':
+        stream = gzip.open(path, 'rt', encoding=encoding, newline='')
+    elif suffix == '.bz2':
+        stream = bz2.open(path, 'rt', encoding=encoding, newline='')
+    elif suffix == '.xz':
+        stream = lzma.open(path, 'rt', encoding=encoding, newline='')
+    elif suffix == '.zip':
+        stream = _open_zip_member(path, encoding)
+    else:
+        stream = open(path, 'r', newline='', encoding=encoding)
+    with stream:
+        yield stream
+
+
+def _open_zip_member(path, encoding: str | None) -> io.TextIOWrapper:
+    archive = zipfile.ZipFile(path)
+    names = [info.filename for info in archive.infolist()
+             if not info.is_dir()]
+    csv_names = [name for name in names if name.lower().endswith('.csv')]
+    if not names:
+        archive.close()
+        raise FileNotFoundError(f'{path} is empty')
+    member = archive.open((csv_names or names)[0])
+    # The archive is closed when its last open member is closed
+    archive.close()
+    return io.TextIOWrapper(member, encoding=encoding, newline='')
+
+
+def get_numbered_csv_rows(path) -> list[tuple[int, list]]:
+    """Return csv file as a list of (line number, row)."""
     try:
-        with open(path, 'r', newline='') as f_csv:
-            return _list_from_csv(csv.reader(f_csv))
+        return list(iter_numbered_rows(path))
     except UnicodeDecodeError:
-        with open(path, 'r', newline='', encoding='Windows-1252') as f_csv:
-            return _list_from_csv(csv.reader(f_csv))
+        return list(iter_numbered_rows(path, encoding='Windows-1252'))
     except FileNotFoundError:
         print(f'File not found: {path}')
     return []
 
 
-def _list_from_csv(items: csv.reader) -> list[list]:
-    csv_list = []
-    for row in items:
-        for index, field in enumerate(row):
-            if ',' in field:
-                row[index] = row[index].replace(',', '')
-        csv_list.append(row)
-    return csv_list
+def iter_numbered_rows(path, encoding: str | None = None) -> Iterator:
+    """Yield (line number, row) from a csv or xlsx file."""
+    if Path(path).suffix.lower() == '.xlsx':
+        for (line, row) in iter_xlsx_rows(path):
+            yield (line, _strip_commas(row))
+        return
+    with open_text_file(path, encoding) as f_csv:
+        reader = csv.reader(f_csv)
+        for row in reader:
+            yield (reader.line_num, _strip_commas(row))
+
+
+def _strip_commas(row: list) -> list:
+    for index, field in enumerate(row):
+        if ',' in field:
+            row[index] = row[index].replace(',', '')
+    return row
 
 
 def write_csv_file(path, fieldnames, items):
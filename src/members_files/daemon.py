@@ -0,0 +1,257 @@
+"""
+Keep a comparison warm in a background process and answer queries.
+
+The service parses the membership, include and bbo_names files once and
+keeps the result in memory. A watcher thread re-runs the comparison as
+soon as any of the files (or the choice of files) changes, so queries
+from the thin client are answered from memory.
+
+Usage:
+    python -m members_files.daemon serve
+    python -m members_files.daemon report
+    python -m members_files.daemon lookup <EBU number or BBO username>
+    python -m members_files.daemon stop
+"""
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+
+from members_files.bulk_lookup import BulkLookup
+from members_files.config import config_service
+from members_files.constants import USER_DATA_DIR
+from members_files.data_files import source_files
+from members_files.external_join import get_comparison
+from members_files.pipeline import Pipeline, file_signature
+from members_files.process import Compare, SourceFiles
+
+SOCKET_NAME = 'members_files.sock'
+WATCH_INTERVAL = 2.0  # seconds
+CLIENT_TIMEOUT = 30.0  # seconds
+MAX_REQUEST = 1_000_000  # bytes
+
+
+def socket_path() -> Path:
+    """Return the path of the service's socket."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR', USER_DATA_DIR)
+    return Path(runtime_dir, SOCKET_NAME)
+
+
+class ComparisonCache():
+    """
+    A Compare that is rebuilt only when its input files change.
+
+    `sources` returns the files to compare; by default they are the files
+    last chosen in the main window. The rules, schemas and memory budget
+    are those of config, as in the report window. Only the pipeline
+    stages of the files that changed are run again, and the usernames
+    are indexed for lookups once for each comparison.
+
+    A comparison made out of core does not keep the files, so lookups
+    find nothing in it.
+    """
+    def __init__(self,
+                 sources: Callable[[], SourceFiles] = source_files,
+                 config: object = config_service,
+                 ) -> None:
+        self.sources = sources
+        self.config = config
+        self.comparison = None
+        self.bulk_lookup = None
+        self.signature = None
+        self.built_at = 0.0
+        self.build_seconds = 0.0
+        self.pipeline = Pipeline()
+        self._lock = threading.Lock()
+
+    def get(self) -> Compare:
+        """Return an up to date comparison."""
+        with self._lock:
+            self._refresh()
+            return self.comparison
+
+    def get_lookup(self) -> BulkLookup:
+        """Return the lookup index of an up to date comparison."""
+        with self._lock:
+            self._refresh()
+            return self.bulk_lookup
+
+    def _refresh(self) -> None:
+        sources = self.sources()
+        signature = tuple(file_signature(path) for path in sources.paths)
+        if signature == self.signature:
+            return
+        start = time.perf_counter()
+        config = self.config
+        self.comparison = get_comparison(
+            sources, config.rules, config.memory_budget_mb,
+            self.pipeline, config.schemas)
+        self.bulk_lookup = BulkLookup(self.comparison)
+        self.build_seconds = time.perf_counter() - start
+        self.signature = signature
+        self.built_at = time.time()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline(MAX_REQUEST)
+        try:
+            request = json.loads(line)
+            response = self.server.service.respond(request)
+        except (ValueError, KeyError, TypeError) as error:
+            response = {'ok': False, 'error': str(error)}
+        self.wfile.write(json.dumps(response).encode('utf8') + b'\n')
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ComparisonService():
+    """Serve queries about a ComparisonCache over a Unix socket."""
+    def __init__(self, path: Path | None = None,
+                 cache: ComparisonCache | None = None,
+                 watch_interval: float = WATCH_INTERVAL) -> None:
+        self.path = Path(path or socket_path())
+        self.cache = cache or ComparisonCache()
+        self.watch_interval = watch_interval
+        self.server = None
+        self._stopped = threading.Event()
+
+    def serve_forever(self) -> None:
+        """Warm the cache, start the watcher and serve until stopped."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+        self.server = _Server(str(self.path), _RequestHandler)
+        self.server.service = self
+        os.chmod(self.path, 0o600)
+        self.cache.get()
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self._stopped.set()
+            self.server.server_close()
+            self.path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        if self.server:
+            # shutdown() blocks until serve_forever returns
+            threading.Thread(target=self.server.shutdown).start()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.watch_interval):
+            self.cache.get()
+
+    def respond(self, request: dict) -> dict:
+        command = request['command']
+        if command == 'ping':
+            return {'ok': True}
+        if command == 'stop':
+            self.shutdown()
+            return {'ok': True}
+
+        if command == 'lookup':
+            return {'ok': True,
+                    'results': lookup(self.cache.get_lookup(),
+                                      request['query'])}
+
+        comparison = self.cache.get()
+        if command == 'report':
+            return {
+                'ok': True,
+                'built_at': self.cache.built_at,
+                'build_seconds': self.cache.build_seconds,
+                'timings': [asdict(timing) for timing in comparison.timings],
+                'missing_from_include': [
+                    asdict(member)
+                    for member in comparison.missing_from_include.values()],
+                'missing_from_bbo': [
+                    asdict(member)
+                    for member in comparison.missing_from_bbo.values()],
+                'duplicates': [
+                    asdict(member) for member in comparison.duplicates],
+                'results': {
+                    name: [asdict(member) for member in rows.values()]
+                    for (name, rows) in comparison.results.items()},
+                'errors': [str(error) for error in comparison.errors],
+            }
+        return {'ok': False, 'error': f'Unknown command: {command}'}
+
+
+def lookup(index: BulkLookup, query: str) -> list[dict]:
+    """
+    Return what the three files hold for an EBU number or username.
+
+    index is the BulkLookup of the comparison, so a query takes a few
+    dict lookups whatever the size of the files.
+    """
+    if not isinstance(query, str):
+        raise TypeError(f'query must be a string, not {query!r}')
+    query = query.strip().lower()
+    comparison = index.comparison
+    include = comparison.include_index
+    results = []
+    for ebu in sorted(index.ebus(query)):
+        member = comparison.members_ebu.get(ebu)
+        names_entry = comparison.members_bbo.get(ebu)
+        bbo = (member or names_entry).bbo
+        results.append({
+            'ebu': ebu,
+            'member': asdict(member) if member else None,
+            'bbo_names': asdict(names_entry) if names_entry else None,
+            'in_include': bbo in include,
+            'include_files': index.include_files(bbo),
+        })
+    if not results and query in include:
+        results.append({'ebu': '', 'member': None, 'bbo_names': None,
+                        'in_include': True,
+                        'include_files': index.include_files(query)})
+    return results
+
+
+def request(command: str, path: Path | None = None, **kwargs) -> dict:
+    """Send a command to the service and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(CLIENT_TIMEOUT)
+        client.connect(str(path or socket_path()))
+        message = json.dumps({'command': command, **kwargs})
+        client.sendall(message.encode('utf8') + b'\n')
+        with client.makefile('rb') as f_response:
+            return json.loads(f_response.readline())
+
+
+def main(args: list[str]) -> int:
+    if not args or args[0] not in ('serve', 'report', 'lookup', 'stop'):
+        print(__doc__)
+        return 1
+    command = args[0]
+    if command == 'serve':
+        ComparisonService().serve_forever()
+        return 0
+
+    kwargs = {}
+    if command == 'lookup':
+        if len(args) < 2:
+            print('lookup needs an EBU number or BBO username')
+            return 1
+        kwargs['query'] = args[1]
+    try:
+        response = request(command, **kwargs)
+    except OSError as error:
+        print(f'*** Service not available: {error} ***')
+        return 1
+    print(json.dumps(response, indent=2))
+    return 0 if response.get('ok') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -2,7 +2,8 @@
 import json
 from pathlib import Path
 
-from constants import USER_DATA_DIR, USER_DATA_FILE
+from members_files.constants import USER_DATA_DIR, USER_DATA_FILE
+from members_files.process import SourceFiles
 
 
 class JsonFile():
@@ -35,3 +36,16 @@ class DataFile(JsonFile):
     def __init__(self, content: dict = None):
         path = Path(USER_DATA_DIR, USER_DATA_FILE)
         super().__init__(path, content)
+
+
+def source_files() -> SourceFiles:
+    """Return the files last chosen in the main window."""
+    data_file = DataFile()
+    data_file.read()
+    content = data_file.content
+    return SourceFiles(
+        content.get('member_file', ''),
+        content.get('bbo_include_file', ''),
+        content.get('bbo_names_file', ''),
+        content.get('other_include_files', []),
+    )
@@ -0,0 +1,97 @@
+"""Line differences between an existing file and its replacement."""
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from members_files.file_utils import write_text_atomic
+
+SUMMARY_LINES = 20  # lines of each kind listed in a summary
+
+
+@dataclass
+class LineDiff():
+    """The lines a replacement adds to and removes from a file."""
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def summary(self, limit: int = SUMMARY_LINES) -> str:
+        """Return the changes as text, listing at most limit of each."""
+        if not self.changed:
+            return 'No changes'
+        output = []
+        for (sign, lines, title) in (('+', self.added, 'added'),
+                                     ('-', self.removed, 'removed')):
+            if not lines:
+                continue
+            output.append(f'{len(lines)} {title}:')
+            output.extend(f'  {sign} {line}' for line in lines[:limit])
+            if len(lines) > limit:
+                output.append(f'  ... and {len(lines) - limit} more')
+        return '\n'.join(output)
+
+
+def sorted_diff(old: list[str], new: list[str]) -> LineDiff:
+    """
+    Return the lines added and removed between two sorted lists.
+
+    The lists are merged in a single pass; repeated lines are counted,
+    so a line that appears twice in old and once in new is removed once.
+    """
+    diff = LineDiff()
+    (i, j) = (0, 0)
+    while i < len(old) and j < len(new):
+        if old[i] == new[j]:
+            i += 1
+            j += 1
+        elif old[i] < new[j]:
+            diff.removed.append(old[i])
+            i += 1
+        else:
+            diff.added.append(new[j])
+            j += 1
+    diff.removed.extend(old[i:])
+    diff.added.extend(new[j:])
+    return diff
+
+
+def read_lines(path: str | Path) -> list[str]:
+    """Return the non-blank lines of a text file, or [] if it is missing."""
+    try:
+        with open(path, 'r', encoding='utf8') as f_text:
+            return [line for line in f_text.read().splitlines() if line]
+    except FileNotFoundError:
+        return []
+
+
+def file_diff(path: str | Path, lines: list[str]) -> LineDiff:
+    """Return the difference between a file and the sorted lines."""
+    old = read_lines(path)
+    if any(old[index] > old[index + 1] for index in range(len(old) - 1)):
+        # Edited by hand; files written here are always sorted
+        old.sort()
+    return sorted_diff(old, lines)
+
+
+def write_lines_if_changed(path: str | Path, lines: list[str],
+                           before_write: Callable[[], object] | None = None,
+                           diff: LineDiff | None = None) -> bool:
+    """
+    Write the sorted lines to path, atomically, if they differ from it.
+
+    Return True if the file was written. An unchanged file is left alone
+    so its modification time is kept. before_write, e.g. a backup, is
+    called only if the file is about to be written. diff, if given, is
+    the file_diff already taken for these lines and is not recomputed.
+    """
+    if diff is None:
+        diff = file_diff(path, lines)
+    if not diff.changed:
+        return False
+    if before_write:
+        before_write()
+    write_text_atomic(path, '\n'.join(lines))
+    return True
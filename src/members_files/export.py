@@ -0,0 +1,213 @@
+"""
+Export the results of a comparison to CSV, XLSX or HTML.
+
+Rows are written one at a time as they are read from the comparison,
+so no copy of the results is built. The xlsx writer streams each sheet
+into the zip archive with inline strings rather than a shared strings
+table, which would have to be held in memory until the end.
+"""
+import csv
+import html
+import io
+import re
+import zipfile
+from collections.abc import Collection, Iterator
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from members_files.constants import APP_TITLE
+from members_files.file_utils import atomic_file
+from members_files.process import Compare, Member
+from members_files.xlsx_utils import MAIN_NS, PACKAGE_REL_NS, REL_NS
+
+EXPORT_COLUMNS = ('EBU', 'First name', 'Last name', 'BBO username', 'Status')
+
+EXPORT_FILE_TYPES = (
+    ('CSV file', '*.csv'),
+    ('Excel workbook', '*.xlsx'),
+    ('Web page', '*.html'),
+    ('All files', '*.*'),
+)
+
+# Characters that are not allowed in XML 1.0
+XML_INVALID_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+SHEET_NAME_INVALID_RE = re.compile(r'[\[\]:*?/\\]')
+MAX_SHEET_NAME = 31
+
+XML_DECLARATION = ('<?xml version="1.0" encoding="UTF-8" '
+                   'standalone="yes"?>\n')
+DOCUMENT_REL = ('http://schemas.openxmlformats.org/officeDocument/2006/'
+                'relationships/officeDocument')
+WORKSHEET_REL = ('http://schemas.openxmlformats.org/officeDocument/2006/'
+                 'relationships/worksheet')
+CONTENT_TYPES_NS = ('http://schemas.openxmlformats.org/package/2006/'
+                    'content-types')
+SPREADSHEET_TYPE = ('application/vnd.openxmlformats-officedocument.'
+                    'spreadsheetml')
+
+HTML_STYLE = """
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin-bottom: 2em; }
+th, td { border: 1px solid #bbb; padding: 0.2em 0.6em; text-align: left; }
+th { background: #eee; }
+"""
+
+Section = tuple[str, Collection[Member]]
+
+
+def export_sections(comparison: Compare) -> list[Section]:
+    """Return (title, members) for each result set of the comparison."""
+    sections = [(rule.title, comparison.results[rule.name].values())
+                for rule in comparison.rules]
+    sections.append(('Duplicates in bbo_names', comparison.duplicates))
+    return sections
+
+
+def export_comparison(comparison: Compare, path: str | Path) -> None:
+    """
+    Write the comparison's results to path.
+
+    The format is chosen by the file's suffix: .csv, .xlsx or .html.
+    Raises ValueError for any other suffix.
+    """
+    writers = {
+        '.csv': write_csv,
+        '.xlsx': write_xlsx,
+        '.html': write_html,
+        '.htm': write_html,
+    }
+    suffix = Path(path).suffix.lower()
+    if suffix not in writers:
+        raise ValueError(f'Cannot export to a {suffix or "plain"} file')
+    writers[suffix](path, export_sections(comparison))
+
+
+def _values(member: Member) -> tuple[str, ...]:
+    return (member.ebu, member.first_name, member.last_name, member.bbo,
+            member.status)
+
+
+def write_csv(path: str | Path, sections: list[Section]) -> None:
+    """Write all the sections to one csv file with a Section column."""
+    with atomic_file(path, 'w', newline='', encoding='utf8') as f_csv:
+        writer = csv.writer(f_csv)
+        writer.writerow(('Section', *EXPORT_COLUMNS))
+        for (title, members) in sections:
+            for member in members:
+                writer.writerow((title, *_values(member)))
+
+
+def write_html(path: str | Path, sections: list[Section],
+               title: str = APP_TITLE) -> None:
+    """Write the sections as tables in a self-contained web page."""
+    with atomic_file(path, 'w', encoding='utf8') as f_html:
+        f_html.write(
+            '<!DOCTYPE html>\n<html lang="en">\n<head>\n'
+            '<meta charset="utf-8">\n'
+            f'<title>{html.escape(title)}</title>\n'
+            f'<style>{HTML_STYLE}</style>\n</head>\n<body>\n'
+            f'<h1>{html.escape(title)}</h1>\n')
+        header = ''.join(f'<th>{html.escape(column)}</th>'
+                         for column in EXPORT_COLUMNS)
+        for (section, members) in sections:
+            f_html.write(
+                f'<h2>{html.escape(section)} ({len(members)})</h2>\n'
+                f'<table>\n<thead><tr>{header}</tr></thead>\n<tbody>\n')
+            for member in members:
+                cells = ''.join(f'<td>{html.escape(value)}</td>'
+                                for value in _values(member))
+                f_html.write(f'<tr>{cells}</tr>\n')
+            f_html.write('</tbody>\n</table>\n')
+        f_html.write('</body>\n</html>\n')
+
+
+def write_xlsx(path: str | Path, sections: list[Section]) -> None:
+    """Write each section to its own sheet of an xlsx workbook."""
+    names = _sheet_names([title for (title, members) in sections])
+    with atomic_file(path, 'wb') as f_xlsx:
+        with zipfile.ZipFile(f_xlsx, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for (index, (title, members)) in enumerate(sections, start=1):
+                with _xml_member(
+                        archive, f'xl/worksheets/sheet{index}.xml') as f_xml:
+                    for chunk in _sheet_xml(members):
+                        f_xml.write(chunk)
+            _write_xlsx_parts(archive, names)
+
+
+def _xml_member(archive: zipfile.ZipFile, name: str) -> io.TextIOWrapper:
+    return io.TextIOWrapper(
+        archive.open(name, 'w', force_zip64=True), encoding='utf8')
+
+
+def _sheet_xml(members: Collection[Member]) -> Iterator[str]:
+    yield f'{XML_DECLARATION}<worksheet xmlns="{MAIN_NS}"><sheetData>\n'
+    yield _row_xml(1, EXPORT_COLUMNS)
+    for (row, member) in enumerate(members, start=2):
+        yield _row_xml(row, _values(member))
+    yield '</sheetData></worksheet>\n'
+
+
+def _row_xml(row: int, values: tuple[str, ...]) -> str:
+    cells = ''.join(
+        f'<c r="{_column_letter(column)}{row}" t="inlineStr"><is><t>'
+        f'{escape(XML_INVALID_RE.sub("", value))}</t></is></c>'
+        for (column, value) in enumerate(values) if value)
+    return f'<row r="{row}">{cells}</row>\n'
+
+
+def _column_letter(index: int) -> str:
+    letters = ''
+    index += 1
+    while index:
+        (index, remainder) = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _sheet_names(titles: list[str]) -> list[str]:
+    """Return distinct sheet names that Excel will accept."""
+    names = []
+    for title in titles:
+        name = SHEET_NAME_INVALID_RE.sub('', title)[:MAX_SHEET_NAME]
+        name = name.strip("' ") or 'Sheet'
+        base = name
+        count = 1
+        while name.lower() in (existing.lower() for existing in names):
+            count += 1
+            suffix = f' ({count})'
+            name = base[:MAX_SHEET_NAME - len(suffix)] + suffix
+        names.append(name)
+    return names
+
+
+def _write_xlsx_parts(archive: zipfile.ZipFile, names: list[str]) -> None:
+    sheets = range(1, len(names) + 1)
+    overrides = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{index}.xml" '
+        f'ContentType="{SPREADSHEET_TYPE}.worksheet+xml"/>'
+        for index in sheets)
+    archive.writestr('[Content_Types].xml', (
+        f'{XML_DECLARATION}<Types xmlns="{CONTENT_TYPES_NS}">'
+        '<Default Extension="rels" ContentType='
+        '"application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        f'ContentType="{SPREADSHEET_TYPE}.sheet.main+xml"/>'
+        f'{overrides}</Types>'))
+    archive.writestr('_rels/.rels', (
+        f'{XML_DECLARATION}<Relationships xmlns="{PACKAGE_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{DOCUMENT_REL}" '
+        'Target="xl/workbook.xml"/></Relationships>'))
+    sheet_elements = ''.join(
+        f'<sheet name={quoteattr(name)} sheetId="{index}" r:id="rId{index}"/>'
+        for (index, name) in zip(sheets, names))
+    archive.writestr('xl/workbook.xml', (
+        f'{XML_DECLARATION}<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+        f'<sheets>{sheet_elements}</sheets></workbook>'))
+    relationships = ''.join(
+        f'<Relationship Id="rId{index}" Type="{WORKSHEET_REL}" '
+        f'Target="worksheets/sheet{index}.xml"/>'
+        for index in sheets)
+    archive.writestr('xl/_rels/workbook.xml.rels', (
+        f'{XML_DECLARATION}<Relationships xmlns="{PACKAGE_REL_NS}">'
+        f'{relationships}</Relationships>'))
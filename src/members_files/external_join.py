@@ -0,0 +1,262 @@
+"""
+Compare input files that are too large to hold in memory.
+
+The membership and bbo_names records are hash partitioned on EBU number
+into spill files in a temporary directory and each partition is joined
+in turn. The joined records are then partitioned again on BBO username
+so that each can be checked against its share of the include file;
+records without a username cannot match it, so they are spread over the
+partitions by EBU number instead. Only one partition is held in memory
+at a time.
+
+The results, errors and duplicates are the same, in the same order, as
+those of the in-memory Compare.
+"""
+import os
+import pickle
+import tempfile
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+
+from members_files.csv_utils import COMPRESSED_SUFFIXES
+from members_files.include_lists import include_paths, merge_include_files
+from members_files.pipeline import Pipeline
+from members_files.process import (
+    FILE_STAGES, Compare, display_record, duplicate_error, iter_bbo_names,
+    read_members)
+from members_files.rules import JoinedRecord
+
+# Rough bytes of Python objects for each byte of input file
+MEMORY_FACTOR = 10
+COMPRESSED_MEMORY_FACTOR = 50
+MIN_PARTITIONS = 2
+MAX_PARTITIONS = 64
+
+# Joined records are ordered as Compare._join yields them
+MEMBER_ORDER = 0
+NAMES_ORDER = 1
+INCLUDE_ORDER = 2
+
+
+def estimated_memory(paths: tuple[str, ...]) -> int:
+    """Return a rough estimate of the bytes needed to compare paths."""
+    total = 0
+    for path in paths:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        suffix = Path(path).suffix.lower()
+        if suffix in COMPRESSED_SUFFIXES or suffix == '.xlsx':
+            total += size * COMPRESSED_MEMORY_FACTOR
+        else:
+            total += size * MEMORY_FACTOR
+    return total
+
+
+def partition_count(estimate: int, budget: int) -> int:
+    """Return enough partitions for each to fit within budget."""
+    partitions = -(-estimate // max(budget, 1))
+    return min(max(partitions, MIN_PARTITIONS), MAX_PARTITIONS)
+
+
+def get_comparison(parent: object, rules: list[dict] | None = None,
+                   memory_budget_mb: int = 0,
+                   pipeline: Pipeline | None = None,
+                   schemas: list[dict] | None = None) -> Compare:
+    """
+    Return a Compare of the parent's files.
+
+    The files are joined out of core if they are not expected to fit
+    within memory_budget_mb; a budget of 0 means there is no limit.
+    The stages of pipeline that are still up to date are reused.
+    """
+    if memory_budget_mb:
+        paths = (parent.member_file.get(),
+                 *include_paths(parent),
+                 parent.bbo_names_file.get())
+        estimate = estimated_memory(paths)
+        budget = memory_budget_mb * 1_000_000
+        if estimate > budget:
+            return ExternalCompare(
+                parent, rules, partition_count(estimate, budget),
+                pipeline=pipeline, schemas=schemas)
+    return Compare(parent, rules, pipeline=pipeline, schemas=schemas)
+
+
+def _partition(key: str, partitions: int) -> int:
+    return zlib.crc32(key.encode('utf8')) % partitions
+
+
+class _Spill():
+    """Partitioned files of pickled records, read back in write order."""
+    def __init__(self, directory: str, name: str, partitions: int) -> None:
+        self.partitions = partitions
+        self.paths = [Path(directory, f'{name}-{index}.pickle')
+                      for index in range(partitions)]
+        self.files = [open(path, 'wb') for path in self.paths]
+
+    def add(self, key: str, record: tuple) -> None:
+        pickle.dump(record, self.files[_partition(key, self.partitions)],
+                    pickle.HIGHEST_PROTOCOL)
+
+    def close(self) -> None:
+        for f_spill in self.files:
+            f_spill.close()
+
+    def read(self, index: int) -> Iterator[tuple]:
+        with open(self.paths[index], 'rb') as f_spill:
+            while True:
+                try:
+                    yield pickle.load(f_spill)
+                except EOFError:
+                    return
+
+
+class ExternalCompare(Compare):
+    """
+    Compare that holds one partition of the input files at a time.
+
+    members_ebu, members_bbo, include_index and include_list are not kept
+    and are left empty. Only the rules and schemas are compiled in
+    pipeline stages; the join is run again each time. The in-memory
+    FILE_STAGES are removed from the pipeline, with their outputs, so a
+    pipeline shared with an earlier Compare does not keep them.
+    """
+    external = True
+
+    def __init__(self, parent: object, rules: list[dict] | None = None,
+                 partitions: int = MIN_PARTITIONS,
+                 directory: str | None = None,
+                 pipeline: Pipeline | None = None,
+                 schemas: list[dict] | None = None) -> None:
+        self.partitions = partitions
+        self.directory = directory  # for the spill files
+        super().__init__(parent, rules, pipeline=pipeline, schemas=schemas)
+
+    def _define_file_stages(self) -> None:
+        for name in FILE_STAGES:
+            self.pipeline.remove(name)
+
+    def _compare(self) -> None:
+        member_path = self.parent.member_file.get()
+        partitions = self.partitions
+        member_errors = []
+        other_errors = []
+        with tempfile.TemporaryDirectory(
+                prefix='members_files-', dir=self.directory) as directory:
+            members = _Spill(directory, 'members', partitions)
+            include = _Spill(directory, 'include', partitions)
+            names = _Spill(directory, 'names', partitions)
+            joined = _Spill(directory, 'joined', partitions)
+            try:
+                self._spill_members(member_path, members, member_errors)
+                self._spill_include(
+                    self.include_paths, include, other_errors)
+                self._spill_names(
+                    self.parent.bbo_names_file.get(), names, other_errors)
+                for spill in (members, include, names):
+                    spill.close()
+
+                duplicates = []
+                for index in range(partitions):
+                    self._join_on_ebu(
+                        member_path, members.read(index), names.read(index),
+                        joined, member_errors, duplicates)
+                joined.close()
+
+                results = {rule.name: [] for rule in self.rules}
+                for index in range(partitions):
+                    self._join_on_username(
+                        joined.read(index), include.read(index), results)
+            finally:
+                for spill in (members, include, names, joined):
+                    spill.close()
+
+        member_errors.sort(key=lambda error: error.line)
+        self.errors.extend(member_errors + other_errors)
+        for (order, pair) in sorted(duplicates, key=lambda item: item[0]):
+            self.duplicates.extend(pair)
+        self.results = {
+            name: {key: member for (order, key, member) in sorted(
+                entries, key=lambda entry: entry[0])}
+            for (name, entries) in results.items()}
+        self.missing_from_include = self.results['missing_from_include']
+        self.missing_from_bbo = self.results['missing_from_bbo']
+
+    def _spill_members(self, path: str, spill: _Spill,
+                       errors: list) -> None:
+        for (seq, (line, member)) in enumerate(
+                read_members(path, errors, self.schemas)):
+            spill.add(member.ebu, (seq, line, member))
+
+    def _spill_include(self, paths: list[str], spill: _Spill,
+                       errors: list) -> None:
+        for (seq, (name, lists)) in enumerate(
+                merge_include_files(paths, errors)):
+            spill.add(name, (seq, name, lists))
+
+    def _spill_names(self, path: str, spill: _Spill, errors: list) -> None:
+        for (seq, (line, member)) in enumerate(iter_bbo_names(path, errors)):
+            spill.add(member.ebu, (seq, member))
+
+    def _join_on_ebu(self, path: str, members: Iterator, names: Iterator,
+                     joined: _Spill, errors: list, duplicates: list) -> None:
+        """Join a partition of members and bbo_names on EBU number."""
+        output = {}  # ebu: (seq of first occurrence, member)
+        lines = {}
+        for (seq, line, member) in members:
+            if member.ebu in lines:
+                errors.append(duplicate_error(path, line, member.ebu, lines))
+            lines[member.ebu] = line
+            first = output[member.ebu][0] if member.ebu in output else seq
+            output[member.ebu] = (first, member)
+
+        names_output = {}
+        for (seq, names_entry) in names:
+            if names_entry.ebu in names_output:
+                duplicates.append(
+                    (seq, (names_entry, names_output[names_entry.ebu][1])))
+                first = names_output[names_entry.ebu][0]
+            else:
+                first = seq
+            names_output[names_entry.ebu] = (first, names_entry)
+
+        for (ebu, (seq, member)) in output.items():
+            names_entry = names_output.get(ebu, (0, None))[1]
+            bbo = member.bbo or (names_entry.bbo if names_entry else '')
+            joined.add(bbo or ebu, ((MEMBER_ORDER, seq), ebu, member,
+                                    names_entry, bbo))
+        for (ebu, (seq, names_entry)) in names_output.items():
+            if ebu not in output:
+                bbo = names_entry.bbo
+                joined.add(bbo or ebu, ((NAMES_ORDER, seq), ebu, None,
+                                        names_entry, bbo))
+
+    def _join_on_username(self, joined: Iterator, include: Iterator,
+                          results: dict) -> None:
+        """Check a partition of joined records against the include file."""
+        include_names = {}  # name: (seq, bitmask of include files)
+        for (seq, name, lists) in include:
+            include_names[name] = (seq, lists)
+
+        usernames = set()
+        for (order, key, member, names_entry, bbo) in joined:
+            usernames.add(bbo)
+            lists = include_names.get(bbo, (0, 0))[1]
+            self._add_results(order, JoinedRecord(
+                key, member, names_entry, bbo, bool(lists), lists), results)
+
+        for (name, (seq, lists)) in include_names.items():
+            if name not in usernames:
+                self._add_results((INCLUDE_ORDER, seq), JoinedRecord(
+                    f'bbo:{name}', None, None, name, True, lists), results)
+
+    def _add_results(self, order: tuple, record: JoinedRecord,
+                     results: dict) -> None:
+        """Add record, in order, to the results of the rules it meets."""
+        for rule in self.rules:
+            if rule.predicate(record):
+                results[rule.name].append(
+                    (order, record.key, display_record(record)))
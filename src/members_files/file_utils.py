@@ -0,0 +1,36 @@
+"""File helpers for Phoenix Members Files."""
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_file(path: str | Path, mode: str = 'w', **kwargs) -> Iterator:
+    """Open a file to write to path so that readers never see it partial.
+
+    The content goes to a temporary file in the same directory which
+    replaces the target in a single rename when the block exits without
+    an exception. Keyword arguments are passed on to open.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    (handle, temp_path) = tempfile.mkstemp(
+        dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(handle, mode, **kwargs) as f_temp:
+            yield f_temp
+            f_temp.flush()
+            os.fsync(f_temp.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def write_text_atomic(path: str | Path, text: str,
+                      encoding: str = 'utf8') -> None:
+    """Write text to path so that readers never see a partial file."""
+    with atomic_file(path, 'w', encoding=encoding) as f_text:
+        f_text.write(text)
@@ -1,15 +1,14 @@
 """ConfigFrame for Phoenix Members Files."""
 
 import tkinter as tk
-from tkinter import ttk, filedialog
+from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
 
 from psiutils.buttons import ButtonFrame, IconButton
 from psiutils.constants import PAD, Pad
-from psiutils.utilities import window_resize
 
 from members_files.constants import APP_TITLE
-from members_files.config import read_config, save_config
+from members_files.config import config_service
 import members_files.text as text
 
 
@@ -43,7 +42,7 @@ class ConfigFrame():
         # pylint: disable=no-member)
         self.root = tk.Toplevel(parent.root)
         self.parent = parent
-        self.config = read_config()
+        self.config = config_service
 
         # tk variables
         self.xxx = tk.StringVar(value=self.config.xxx)
@@ -73,14 +72,14 @@ class ConfigFrame():
         """
         # pylint: disable=no-member)
         root = self.root
-        root.geometry(self.config.geometry[Path(__file__).stem])
+        root.geometry(self.config.window_geometry(Path(__file__).stem))
         root.transient(self.parent.root)
         root.title(f'{APP_TITLE} - {text.CONFIG}')
 
         root.bind('<Control-x>', self._dismiss)
         root.bind('<Control-s>', self._save_config)
         root.bind('<Configure>',
-                  lambda event, arg=None: window_resize(self, __file__))
+                  lambda event: self.config.window_resize(event, __file__))
 
         root.rowconfigure(1, weight=1)
         root.columnconfigure(0, weight=1)
@@ -203,7 +202,11 @@ class ConfigFrame():
         """
         # To generate assignments from tk-vars run script: assignment-invert
         self.config.update('xxx', self.xxx.get())
-        save_config(self.config)
+        if not self.config.save():
+            messagebox.showerror(
+                '', f'The config was not saved.\n\n'
+                f'{self.config.load_error or self.config.path}',
+                parent=self.root)
         self._dismiss()
 
     def _dismiss(self, *args) -> None:
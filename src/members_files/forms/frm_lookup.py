@@ -0,0 +1,166 @@
+"""LookupFrame for Phoenix Members Files."""
+import tkinter as tk
+from tkinter import ttk
+from pathlib import Path
+
+from psiutils.constants import PAD
+from psiutils.buttons import ButtonFrame, IconButton
+
+from members_files.bulk_lookup import BulkLookup, LookupResult, parse_entries
+from members_files.config import config_service
+from members_files.constants import APP_TITLE, DEFAULT_GEOMETRY
+from members_files.external_join import get_comparison
+from members_files.pipeline import Pipeline
+from members_files.text import Text
+
+txt = Text()
+
+FRAME_TITLE = f'{APP_TITLE} - Bulk lookup'
+
+RESULT_COLUMNS = (
+    ('entry', 'Entry', 80),
+    ('ebu', 'EBU', 50),
+    ('name', 'Name', 100),
+    ('status', 'Status', 50),
+    ('username', 'username', 60),
+    ('bbo_names', 'bbo_names', 40),
+    ('include', 'Include', 100),
+)
+
+
+class LookupFrame():
+    """Look up a pasted list of EBU numbers or BBO usernames."""
+    def __init__(self, parent: tk.Frame,
+                 entries: list[str] | None = None) -> None:
+        self.root = tk.Toplevel(parent.root)
+        self.parent = parent
+        self.config = config_service
+        # Only the stages of files changed since the parent's last
+        # comparison are run again
+        config = self.config
+        self.comparison = get_comparison(
+            parent, config.rules, config.memory_budget_mb,
+            getattr(parent, 'pipeline', None) or Pipeline(), config.schemas)
+        self.lookup = BulkLookup(self.comparison)
+        self.entries_text = None
+        self.results_tree = None
+
+        # tk variables
+        self.summary = tk.StringVar()
+
+        self.show()
+        if entries:
+            self.entries_text.insert('1.0', '\n'.join(entries))
+            self._lookup()
+
+    def show(self) -> None:
+        # pylint: disable=no-member)
+        root = self.root
+        root.geometry(self.config.window_geometry(
+            Path(__file__).stem, DEFAULT_GEOMETRY))
+        root.transient(self.parent.root)
+        root.title(FRAME_TITLE)
+        root.bind('<Configure>',
+                  lambda event: self.config.window_resize(event, __file__))
+
+        root.bind('<Control-x>', self._dismiss)
+
+        root.rowconfigure(0, weight=1)
+        root.columnconfigure(0, weight=1)
+
+        main_frame = self._main_frame(root)
+        main_frame.grid(row=0, column=0, sticky=tk.NSEW, padx=PAD, pady=PAD)
+        self.button_frame = self._button_frame(root)
+        self.button_frame.grid(row=8, column=0, columnspan=9,
+                               sticky=tk.EW, padx=PAD, pady=PAD)
+
+        sizegrip = ttk.Sizegrip(root)
+        sizegrip.grid(sticky=tk.SE)
+
+    def _main_frame(self, master: tk.Frame) -> ttk.Frame:
+        frame = ttk.Frame(master)
+        frame.rowconfigure(3, weight=1)
+        frame.columnconfigure(0, weight=1)
+
+        row = 0
+        label = ttk.Label(
+            frame, text='EBU numbers or BBO usernames, one per line')
+        label.grid(row=row, column=0, sticky=tk.W, padx=PAD, pady=PAD)
+
+        row += 1
+        self.entries_text = tk.Text(frame, height=8, undo=True)
+        self.entries_text.grid(row=row, column=0, sticky=tk.EW)
+        self.entries_text.focus_set()
+
+        row += 1
+        label = ttk.Label(frame, textvariable=self.summary)
+        label.grid(row=row, column=0, sticky=tk.W, padx=PAD, pady=PAD)
+
+        row += 1
+        self.results_tree = self._get_results_tree(frame)
+        self.results_tree.grid(row=row, column=0, sticky=tk.NSEW)
+        return frame
+
+    def _button_frame(self, master: tk.Frame) -> tk.Frame:
+        frame = ButtonFrame(master, tk.HORIZONTAL)
+        frame.buttons = [
+            IconButton(frame, txt.LOOK_UP, 'search', self._lookup),
+            IconButton(frame, txt.CLEAR, 'clear', self._clear),
+            frame.icon_button('exit', self._dismiss),
+        ]
+        return frame
+
+    def _get_results_tree(self, master: tk.Frame) -> ttk.Treeview:
+        """Return  a tree widget."""
+        tree = ttk.Treeview(
+            master,
+            selectmode='browse',
+            height=15,
+            show='headings',
+            )
+
+        tree['columns'] = tuple(col[0] for col in RESULT_COLUMNS)
+        for (col_key, col_text, col_width) in RESULT_COLUMNS:
+            tree.heading(col_key, text=col_text)
+            tree.column(col_key, width=col_width, anchor=tk.W)
+        tree.tag_configure('not_found', foreground='red')
+        return tree
+
+    def _lookup(self, *args) -> None:
+        if self.comparison.external:
+            # An out of core comparison does not keep the files
+            self.summary.set('The files are too large to look up within '
+                             'the memory budget')
+            return
+        entries = parse_entries(self.entries_text.get('1.0', tk.END))
+        results = self.lookup.lookup(entries)
+        self.results_tree.delete(*self.results_tree.get_children())
+        for result in results:
+            self.results_tree.insert(
+                '', 'end', values=_result_values(result),
+                tags=() if result.found else ('not_found',))
+        missing = len({result.entry for result in results
+                       if not result.found})
+        self.summary.set(f'{len(entries)} entries, {missing} not found')
+
+    def _clear(self, *args) -> None:
+        self.entries_text.delete('1.0', tk.END)
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.summary.set('')
+
+    def _dismiss(self, *args) -> None:
+        self.root.destroy()
+
+
+def _result_values(result: LookupResult) -> tuple:
+    if not result.found:
+        return (result.entry, '', 'Not found', '', '', '', '')
+    return (
+        result.entry,
+        result.ebu,
+        result.name,
+        result.status or ('' if result.in_members else 'Not a member'),
+        result.bbo,
+        'Yes' if result.in_names else 'No',
+        ', '.join(Path(path).name for path in result.include_files) or 'No',
+    )
@@ -4,15 +4,15 @@ import tkinter as tk
 from tkinter import ttk, filedialog
 from pathlib import Path
 
-from psiutils.constants import (PAD, Pad, CSV_FILE_TYPES, DOWNLOADS_DIR,
-                                TXT_FILE_TYPES)
+from psiutils.constants import PAD, Pad, DOWNLOADS_DIR, TXT_FILE_TYPES
 from psiutils.buttons import ButtonFrame, IconButton
-from psiutils.utilities import window_resize
 
 from members_files.constants import APP_TITLE
-from members_files.config import read_config
+from members_files.config import config_service
 from members_files.text import Text
 from members_files.data_files import DataFile
+from members_files.pipeline import Pipeline
+from members_files.process import FileName
 
 from members_files.main_menu import MainMenu
 from members_files.forms.frm_report import ReportFrame
@@ -20,6 +20,11 @@ from members_files.forms.frm_report import ReportFrame
 txt = Text()
 FRAME_TITLE = APP_TITLE
 
+MEMBER_FILE_TYPES = (
+    ('Membership files', '*.csv *.csv.gz *.csv.bz2 *.csv.xz *.zip *.xlsx'),
+    ('All files', '*.*'),
+)
+
 
 class MainFrame():
     """
@@ -39,7 +44,10 @@ class MainFrame():
             None
         """
         self.root = root
-        self.config = read_config()
+        self.config = config_service
+        # Shared by the report and lookup windows, so unchanged files are
+        # not read again each time one opens
+        self.pipeline = Pipeline()
         self.data_file = DataFile()
         self.data_file.read()
 
@@ -58,18 +66,24 @@ class MainFrame():
         self.bbo_include_file = tk.StringVar(value=bbo_include_file)
         self.bbo_names_file = tk.StringVar(value=bbo_names_file)
 
+        # Further include files, one per tournament
+        self.other_include_files = FileName(
+            list(self.data_file.content.get('other_include_files', [])))
+        self.other_include_text = tk.StringVar(
+            value=self._other_include_text())
+
         self._show()
 
     def _show(self):
         # pylint: disable=no-member)
         root = self.root
-        root.geometry(self.config.geometry[Path(__file__).stem])
+        root.geometry(self.config.window_geometry(Path(__file__).stem))
         root.title(FRAME_TITLE)
 
         root.bind('<Control-x>', self._dismiss)
         root.bind('<Control-o>', self._process)
         root.bind('<Configure>',
-                  lambda event, arg=None: window_resize(self, __file__))
+                  lambda event: self.config.window_resize(event, __file__))
 
         main_menu = MainMenu(self)
         main_menu.create()
@@ -124,6 +138,21 @@ class MainFrame():
             frame, txt.OPEN, 'open', self._get_bbo_names_file)
         button.grid(row=row, column=2, padx=PAD, pady=Pad.S)
 
+        row += 1
+        label = ttk.Label(frame, text='Other include files')
+        label.grid(row=row, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+
+        label = ttk.Label(frame, textvariable=self.other_include_text)
+        label.grid(row=row, column=1, sticky=tk.EW)
+
+        button = IconButton(
+            frame, txt.OPEN, 'open', self._get_other_include_files)
+        button.grid(row=row, column=2, padx=PAD, pady=Pad.S)
+
+        button = IconButton(
+            frame, txt.CLEAR, 'clear', self._clear_other_include_files)
+        button.grid(row=row, column=3, padx=PAD, pady=Pad.S)
+
         return frame
 
     def _button_frame(self, master: tk.Frame) -> tk.Frame:
@@ -143,7 +172,7 @@ class MainFrame():
         member_file = filedialog.askopenfilename(
             initialdir=initialdir,
             initialfile=initialfile,
-            filetypes=CSV_FILE_TYPES,
+            filetypes=MEMBER_FILE_TYPES,
         )
         if member_file:
             self.member_file.set(member_file)
@@ -180,6 +209,33 @@ class MainFrame():
             self.data_file.content['bbo_names_file'] = bbo_names_file
             self.data_file.write()
 
+    def _get_other_include_files(self, *args) -> None:
+        initialdir = DOWNLOADS_DIR
+        if self.bbo_include_file.get():
+            initialdir = Path(self.bbo_include_file.get()).parent
+        include_files = filedialog.askopenfilenames(
+            initialdir=initialdir,
+            filetypes=TXT_FILE_TYPES,
+        )
+        if include_files:
+            paths = self.other_include_files.get()
+            paths.extend(path for path in include_files if path not in paths)
+            self._save_other_include_files()
+
+    def _clear_other_include_files(self, *args) -> None:
+        self.other_include_files.get().clear()
+        self._save_other_include_files()
+
+    def _save_other_include_files(self) -> None:
+        self.other_include_text.set(self._other_include_text())
+        self.data_file.content['other_include_files'] = (
+            self.other_include_files.get())
+        self.data_file.write()
+
+    def _other_include_text(self) -> str:
+        return ', '.join(
+            Path(path).name for path in self.other_include_files.get())
+
     def _process(self, *args) -> None:
         dlg = ReportFrame(self)
         self.root.wait_window(dlg.root)
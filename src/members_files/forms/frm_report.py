@@ -1,60 +1,118 @@
 """ReportFrame for Phoenix Members Files."""
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from pathlib import Path
 
 from psiutils.constants import PAD
 from psiutils.buttons import ButtonFrame, IconButton
-from psiutils.utilities import window_resize
 from psiutils.treeview import sort_treeview
 from psiutils.widgets import separator_frame
 from psiutils import text
 
 from members_files.constants import APP_TITLE, DEFAULT_GEOMETRY
-from members_files.config import read_config
-from members_files.process import Compare
+from members_files.config import config_service
+from members_files.backups import BackupStore
+from members_files.diff import LineDiff, file_diff, write_lines_if_changed
+from members_files.export import EXPORT_FILE_TYPES, export_comparison
+from members_files.external_join import get_comparison
+from members_files.include_upload import BackgroundUpload
+from members_files.pipeline import Pipeline
+from members_files.process import Member
+from members_files.rules import BUILTIN_RULES
+from members_files.matching import suggest_matches
+from members_files.search import SearchIndex
+from members_files.sorting import SortIndex
+from members_files.status_index import StatusIndex
+from members_files.text import Text
+
+txt = Text()
 
 FRAME_TITLE = f'{APP_TITLE} - Reports'
 
+# Results that have their own section rather than a tab
+BUILTIN_RESULTS = tuple(rule['name'] for rule in BUILTIN_RULES)
+
+# The rows of the status index, searched and sorted like a result
+ROSTER = 'roster'
+DEFAULT_STATUSES = ('Member',)
+UPLOAD_POLL_MS = 100  # how often a background upload is checked
+
 TREE_COLUMNS = (
     ('ebu', 'EBU', 50),
     ('name', 'Name', 100),
     ('username', 'username', 50),
 )
 
+ERROR_COLUMNS = (
+    ('file', 'File', 80),
+    ('line', 'Line', 30),
+    ('problem', 'Problem', 200),
+)
+
+SUGGESTION_COLUMNS = (
+    ('ebu', 'EBU', 50),
+    ('name', 'Name', 100),
+    ('candidate_ebu', 'bbo_names EBU', 50),
+    ('candidate_name', 'bbo_names name', 100),
+    ('candidate_username', 'bbo_names username', 50),
+    ('score', 'Score', 30),
+)
+
 
 class ReportFrame():
     def __init__(self, parent: tk.Frame) -> None:
         self.root = tk.Toplevel(parent.root)
         self.parent = parent
-        self.config = read_config()
-        self.comparison = Compare(self.parent)
+        self.config = config_service
+        self.comparison = None
+        # Reused by each comparison, and shared with the parent's windows
+        self.pipeline = getattr(parent, 'pipeline', None) or Pipeline()
+        self.roster = None  # StatusIndex, unless compared out of core
+        self.status_filter = {}  # status: tk.BooleanVar
+        self.search_indexes = {}
+        self.sort_indexes = {}
+        self.tree_rows = {}
+        self.tree_sort = {}
+        self.timings = tk.StringVar()
+        self._compare()
         self.include_tree = None
         self.names_tree = None
+        self.errors_tree = None
+        self.suggestions_tree = None
+        self.suggestions = []
+        self.rules_notebook = None
+        self.rule_trees = {}
         self.copy_include_button = None
         self.copy_bbo_button = None
+        self.upload = None  # BackgroundUpload in progress
+        self.accept_button = None
 
         duplicates = ''
         if self.comparison.duplicates:
             bbo_file = self.parent.bbo_names_file.get()
             duplicates = f'Duplicates found in {bbo_file}'
+        if self.comparison.errors:
+            count = len(self.comparison.errors)
+            duplicates = (f'{duplicates} '
+                          f'{count} problem(s) found in input files').strip()
 
         # tk variables
         self.duplicates = tk.StringVar(value=duplicates)
+        self.search = tk.StringVar()
+
+        self.search.trace_add('write', self._filter_trees)
 
         self.show()
 
     def show(self) -> None:
         # pylint: disable=no-member)
         root = self.root
-        try:
-            root.geometry(self.config.geometry[Path(__file__).stem])
-        except KeyError:
-            root.geometry(DEFAULT_GEOMETRY)
+        root.geometry(self.config.window_geometry(
+            Path(__file__).stem, DEFAULT_GEOMETRY))
         root.transient(self.parent.root)
         root.title(FRAME_TITLE)
         root.bind('<Configure>',
-                  lambda event, arg=None: window_resize(self, __file__))
+                  lambda event: self.config.window_resize(event, __file__))
 
         root.bind('<Control-x>', self._dismiss)
 
@@ -79,6 +137,15 @@ class ReportFrame():
             frame, textvariable=self.duplicates, style='red-fg.TLabel')
         label.grid(row=row, column=0, sticky=tk.W, padx=PAD, pady=PAD)
 
+        row += 1
+        self.errors_tree = self._get_errors_tree(frame)
+        self.errors_tree.grid(row=row, column=0, sticky=tk.NSEW)
+        self._populate_errors_tree()
+
+        row += 1
+        search_frame = self._search_frame(frame)
+        search_frame.grid(row=row, column=0, sticky=tk.EW)
+
         row += 1
         label = ttk.Label(frame, text='Missing from include')
         label.grid(row=row, column=0, sticky=tk.W, padx=PAD, pady=PAD)
@@ -114,55 +181,144 @@ class ReportFrame():
             row=row, column=1, padx=PAD, pady=PAD, sticky=tk.N)
         self.copy_bbo_button.disable()
         self._populate_names_tree()
+
+        row += 1
+        separator = separator_frame(frame, '')
+        separator.grid(row=row, column=0, columnspan=2,
+                       sticky=tk.EW, padx=PAD)
+
+        row += 1
+        label = ttk.Label(frame, text='Possible matches in bbo_names')
+        label.grid(row=row, column=0, sticky=tk.W, padx=PAD, pady=PAD)
+
+        row += 1
+        self.suggestions_tree = self._get_suggestions_tree(frame)
+        self.suggestions_tree.grid(row=row, column=0, sticky=tk.NSEW)
+
+        self.accept_button = IconButton(
+            frame, text.ACCEPT, 'check', self._accept_suggestion, True)
+        self.accept_button.grid(
+            row=row, column=1, padx=PAD, pady=PAD, sticky=tk.N)
+        self.accept_button.disable()
+        self._populate_suggestions_tree()
+
+        row += 1
+        self.rules_notebook = self._rules_notebook(frame)
+        self.rules_notebook.grid(row=row, column=0, sticky=tk.NSEW,
+                                 pady=PAD)
+        self._populate_rule_trees()
+
+        row += 1
+        label = ttk.Label(frame, textvariable=self.timings)
+        label.grid(row=row, column=0, sticky=tk.W, padx=PAD)
+        return frame
+
+    def _rules_notebook(self, master: tk.Frame) -> ttk.Notebook:
+        """Return a notebook with a tab for each rule declared in config."""
+        notebook = ttk.Notebook(master)
+        for rule in self.comparison.rules:
+            if rule.name in BUILTIN_RESULTS:
+                continue
+            tree = self._get_result_tree(notebook, height=8)
+            notebook.add(tree, text=rule.title)
+            self.rule_trees[rule.name] = tree
+        return notebook
+
+    def _search_frame(self, master: tk.Frame) -> ttk.Frame:
+        frame = ttk.Frame(master)
+        frame.columnconfigure(1, weight=1)
+
+        label = ttk.Label(frame, text='Search')
+        label.grid(row=0, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+
+        entry = ttk.Entry(frame, textvariable=self.search)
+        entry.grid(row=0, column=1, sticky=tk.EW)
+
+        if self.roster:
+            label = ttk.Label(frame, text='Statuses')
+            label.grid(row=1, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+            status_frame = self._status_frame(frame)
+            status_frame.grid(row=1, column=1, sticky=tk.W)
         return frame
 
+    def _status_frame(self, master: tk.Frame) -> ttk.Frame:
+        """Return a check button for each status in the membership file."""
+        frame = ttk.Frame(master)
+        for (column, status) in enumerate(self.roster.statuses):
+            var = tk.BooleanVar(value=status in DEFAULT_STATUSES)
+            var.trace_add('write', self._status_filter_changed)
+            self.status_filter[status] = var
+            check_button = ttk.Checkbutton(
+                frame, text=status or '(blank)', variable=var)
+            check_button.grid(row=0, column=column, padx=PAD)
+        return frame
+
+    def _status_filter_changed(self, *args) -> None:
+        self._populate_include_tree()
+        self._populate_names_tree()
+
     def _button_frame(self, master: tk.Frame) -> tk.Frame:
         frame = ButtonFrame(master, tk.HORIZONTAL)
         frame.buttons = [
+            IconButton(frame, txt.EXPORT, 'download', self._export),
             frame.icon_button('exit', self._dismiss),
         ]
         frame.enable(False)
         return frame
 
-    def _get_include_tree(self, master: tk.Frame) -> ttk.Treeview:
+    def _get_errors_tree(self, master: tk.Frame) -> ttk.Treeview:
         """Return  a tree widget."""
         tree = ttk.Treeview(
             master,
             selectmode='browse',
-            height=15,
+            height=4,
             show='headings',
             )
 
-        col_list = tuple(col[0] for col in TREE_COLUMNS)
-
-        tree['columns'] = col_list
-        for col in TREE_COLUMNS:
-            (col_key, col_text, col_width) = (col[0], col[1], col[2])
-            tree.heading(col_key, text=col_text,
-                         command=lambda c=col_key:
-                         sort_treeview(tree, c, False))
+        tree['columns'] = tuple(col[0] for col in ERROR_COLUMNS)
+        for (col_key, col_text, col_width) in ERROR_COLUMNS:
+            tree.heading(col_key, text=col_text)
             tree.column(col_key, width=col_width, anchor=tk.W)
         return tree
 
+    def _populate_errors_tree(self) -> None:
+        """Show the problems found in the input files (hidden if none)."""
+        self.errors_tree.delete(*self.errors_tree.get_children())
+        for error in self.comparison.errors:
+            values = (
+                Path(error.path).name,
+                error.line or '',
+                error.message)
+            self.errors_tree.insert('', 'end', values=values)
+        if self.comparison.errors:
+            self.errors_tree.grid()
+        else:
+            self.errors_tree.grid_remove()
+
+    def _get_include_tree(self, master: tk.Frame) -> ttk.Treeview:
+        """Return  a tree widget."""
+        return self._get_result_tree(master)
+
     def _populate_include_tree(self) -> None:
-        self.include_tree.delete(*self.include_tree.get_children())
-        if len(self.comparison.missing_from_include) > 0:
-            self.copy_include_button.enable()
-        for item in self.comparison.missing_from_include.values():
+        self._clear_tree(self.include_tree)
+        # Out of core comparisons do not keep the files to rewrite them from
+        self.copy_include_button.enable(
+            bool(self.comparison.missing_from_include)
+            and not self.comparison.external
+            and self._filter_is_default()
+            and not self.upload)
+        (result, rows) = self._status_rows(
+            'missing_from_include', 'in_main_include')
+        for (key, item) in rows.items():
             values = (
                 item.ebu,
                 f'{item.first_name} {item.last_name}',
                 item.bbo)
-            self.include_tree.insert('', 'end', values=values)
+            self.include_tree.insert('', 'end', iid=key, values=values)
+        self.tree_rows[self.include_tree] = (result, list(rows))
+        self._filter_tree(self.include_tree)
 
     def _copy_include(self, *args):
-        dlg = messagebox.askyesno(
-            '',
-            'Overwrite include file?'
-        )
-        if not dlg:
-            return
-
         include = []
         for member in self.comparison.members_bbo.values():
             status = ''
@@ -172,17 +328,62 @@ class ReportFrame():
                 include.append(member.bbo)
 
         path = self.parent.bbo_include_file.get()
-        with open(path, 'w', encoding='utf8') as f_include:
-            f_include.write('\n'.join(sorted(include)))
-        self.comparison = Compare(self.parent)
+        include.sort()
+        diff = self._confirm_overwrite(path, include, 'include')
+        if diff is None:
+            return
+        if not self.config.upload_url:
+            self._write_include(path, include, diff)
+            return
+
+        # The file is written only once the endpoint has the changes, so
+        # a failed upload is sent again by the next copy
+        self.copy_include_button.disable()
+        self.upload = BackgroundUpload(diff, self.config).start()
+        self.root.after(UPLOAD_POLL_MS, self._upload_finished,
+                        path, include, diff)
+
+    def _upload_finished(self, path: str, include: list[str],
+                         diff: LineDiff) -> None:
+        """Write the include file once its changes have been uploaded."""
+        upload = self.upload
+        if not upload.done:
+            self.root.after(UPLOAD_POLL_MS, self._upload_finished,
+                            path, include, diff)
+            return
+        self.upload = None
+        if upload.error:
+            messagebox.showerror(
+                '', f'The include list was not uploaded, so the include '
+                f'file has not been changed.\n\n{upload.error}',
+                parent=self.root)
+            self._populate_include_tree()
+            return
+        self._write_include(path, include, diff)
+        if upload.result:
+            messagebox.showinfo(
+                '', f'Include list uploaded: {upload.result.added} added, '
+                f'{upload.result.removed} removed.', parent=self.root)
+
+    def _write_include(self, path: str, include: list[str],
+                       diff: LineDiff) -> None:
+        self._write_lines(path, include, diff)
+        self._compare()
+        self._populate_errors_tree()
         self._populate_include_tree()
+        self._populate_rule_trees()
 
     def _get_names_tree(self, master: tk.Frame) -> ttk.Treeview:
         """Return  a tree widget."""
+        return self._get_result_tree(master)
+
+    def _get_result_tree(self, master: tk.Frame,
+                         height: int = 15) -> ttk.Treeview:
+        """Return  a tree widget for a set of members."""
         tree = ttk.Treeview(
             master,
             selectmode='browse',
-            height=15,
+            height=height,
             show='headings',
             )
 
@@ -193,47 +394,283 @@ class ReportFrame():
             (col_key, col_text, col_width) = (col[0], col[1], col[2])
             tree.heading(col_key, text=col_text,
                          command=lambda c=col_key:
-                         sort_treeview(tree, c, False))
+                         self._sort_tree(tree, c))
             tree.column(col_key, width=col_width, anchor=tk.W)
         return tree
 
+    def _populate_rule_trees(self) -> None:
+        for (name, tree) in self.rule_trees.items():
+            self._clear_tree(tree)
+            rows = self.comparison.results.get(name, {})
+            for (key, item) in rows.items():
+                values = (
+                    item.ebu,
+                    f'{item.first_name} {item.last_name}'.strip(),
+                    item.bbo)
+                tree.insert('', 'end', iid=key, values=values)
+            title = next(rule.title for rule in self.comparison.rules
+                         if rule.name == name)
+            self.rules_notebook.tab(tree, text=f'{title} ({len(rows)})')
+            self.tree_rows[tree] = (name, list(rows))
+            self._filter_tree(tree)
+        if self.rule_trees:
+            self.rules_notebook.grid()
+        else:
+            self.rules_notebook.grid_remove()
+
     def _populate_names_tree(self) -> None:
-        self.names_tree.delete(*self.names_tree.get_children())
-        if len(self.comparison.missing_from_bbo) > 0:
-            self.copy_bbo_button.enable()
-        for item in self.comparison.missing_from_bbo.values():
+        self._clear_tree(self.names_tree)
+        self.copy_bbo_button.enable(
+            bool(self.comparison.missing_from_bbo)
+            and not self.comparison.external
+            and self._filter_is_default())
+        (result, rows) = self._status_rows('missing_from_bbo', 'in_names')
+        for (key, item) in rows.items():
             values = (
                 item.ebu,
                 f'{item.first_name} {item.last_name}',
                 item.bbo)
-            self.names_tree.insert('', 'end', values=values)
+            self.names_tree.insert('', 'end', iid=key, values=values)
+        self.tree_rows[self.names_tree] = (result, list(rows))
+        self._filter_tree(self.names_tree)
+
+    def _filter_is_default(self) -> bool:
+        """
+        Return True if the status filter selects DEFAULT_STATUSES.
+
+        Copying always writes the members with those statuses, so the
+        copy buttons are disabled while the trees show any others.
+        """
+        return all(var.get() == (status in DEFAULT_STATUSES)
+                   for (status, var) in self.status_filter.items())
+
+    def _status_rows(self, result: str, flag: str) -> tuple[str, dict]:
+        """
+        Return the result the rows are indexed in and the rows with a
+        BBO username for which flag is false, with a selected status.
+
+        With only Member selected these are the rows of result.
+        """
+        if not self.roster:
+            return (result, self.comparison.results[result])
+        statuses = [status for (status, var) in self.status_filter.items()
+                    if var.get()]
+        if not self.status_filter:
+            statuses = DEFAULT_STATUSES
+        roster = self.roster
+        bits = (roster.status_bits(statuses)
+                & roster.flag('has_bbo')
+                & roster.flag(flag, False))
+        return (ROSTER, roster.select(bits))
 
     def _copy_names(self, *args):
-        dlg = messagebox.askyesno(
-            '',
-            'Overwrite bbo_names file?'
-        )
-        if not dlg:
-            return
-
         combined = {
             **self.comparison.missing_from_bbo,
             **self.comparison.members_bbo
             }
-        names = [(f'{member.bbo},'
-                  f'{member.first_name},'
-                  f'{member.last_name},'
-                  f'{member.ebu}')
-                 for member in combined.values()]
-
         path = self.parent.bbo_names_file.get()
-        with open(path, 'w', encoding='utf8') as f_include:
-            f_include.write('\n'.join(sorted(names)))
-        self.comparison = Compare(self.parent)
+        lines = _names_lines(combined)
+        diff = self._confirm_overwrite(path, lines, 'bbo_names')
+        if diff is None:
+            return
+        self._write_names(combined, lines, diff)
+
+    def _confirm_overwrite(self, path: str, lines: list[str],
+                           name: str) -> LineDiff | None:
+        """
+        Show what would change in the file and ask to go ahead.
+
+        Return the changes if they are to be written, otherwise None.
+        """
+        diff = file_diff(path, lines)
+        if not diff.changed:
+            messagebox.showinfo(
+                '', f'The {name} file is already up to date.',
+                parent=self.root)
+            return None
+        if not messagebox.askyesno(
+                '', f'Overwrite {name} file?\n\n{diff.summary()}',
+                parent=self.root):
+            return None
+        return diff
+
+    def _write_lines(self, path: str, lines: list[str],
+                     diff: LineDiff | None = None) -> bool:
+        """Back up the file and write the lines to it, if they change it."""
+        store = BackupStore(path, keep=self.config.backup_versions)
+        return write_lines_if_changed(path, lines, store.backup, diff)
+
+    def _write_names(self, members: dict, lines: list[str] | None = None,
+                     diff: LineDiff | None = None) -> None:
+        path = self.parent.bbo_names_file.get()
+        if lines is None:
+            lines = _names_lines(members)
+        if not self._write_lines(path, lines, diff):
+            return
+        self._compare()
+        self._populate_errors_tree()
         self._populate_names_tree()
+        self._populate_rule_trees()
+        self._populate_suggestions_tree()
+
+    def _get_suggestions_tree(self, master: tk.Frame) -> ttk.Treeview:
+        """Return  a tree widget."""
+        tree = ttk.Treeview(
+            master,
+            selectmode='browse',
+            height=8,
+            show='headings',
+            )
+
+        tree['columns'] = tuple(col[0] for col in SUGGESTION_COLUMNS)
+        for (col_key, col_text, col_width) in SUGGESTION_COLUMNS:
+            tree.heading(col_key, text=col_text,
+                         command=lambda c=col_key:
+                         sort_treeview(tree, c, False))
+            tree.column(col_key, width=col_width, anchor=tk.W)
+        tree.bind('<<TreeviewSelect>>', self._suggestion_selected)
+        tree.bind('<Double-1>', self._accept_suggestion)
+        return tree
+
+    def _populate_suggestions_tree(self) -> None:
+        self.suggestions_tree.delete(*self.suggestions_tree.get_children())
+        self.accept_button.disable()
+        self.suggestions = suggest_matches(
+            self.comparison.missing_from_bbo,
+            self.comparison.members_bbo,
+            self.comparison.members_ebu,
+        )
+        for index, suggestion in enumerate(self.suggestions):
+            (member, candidate) = (suggestion.member, suggestion.candidate)
+            values = (
+                member.ebu,
+                f'{member.first_name} {member.last_name}',
+                candidate.ebu,
+                f'{candidate.first_name} {candidate.last_name}',
+                candidate.bbo,
+                f'{suggestion.score:.2f}')
+            self.suggestions_tree.insert(
+                '', 'end', iid=str(index), values=values)
+
+    def _suggestion_selected(self, *args) -> None:
+        self.accept_button.enable(bool(self.suggestions_tree.selection())
+                                  and not self.comparison.external)
+
+    def _accept_suggestion(self, *args) -> None:
+        """Replace the selected bbo_names entry with the member's details."""
+        selection = self.suggestions_tree.selection()
+        if not selection:
+            return
+        suggestion = self.suggestions[int(selection[0])]
+        (member, candidate) = (suggestion.member, suggestion.candidate)
+
+        names = dict(self.comparison.members_bbo)
+        del names[candidate.ebu]
+        names[member.ebu] = Member(
+            member.ebu,
+            member.first_name,
+            member.last_name,
+            member.bbo or candidate.bbo,
+            '',
+        )
+        self._write_names(names)
+
+    def _compare(self) -> None:
+        """Run the comparison and index its results for searching.
+
+        Only the stages whose files have changed since the last run, and
+        those downstream of them, are run again."""
+        self.comparison = get_comparison(
+            self.parent, self.config.rules, self.config.memory_budget_mb,
+            self.pipeline, self.config.schemas)
+        if self.comparison.external:
+            # The stages these depend on are not kept out of core
+            self.pipeline.remove('roster')
+            self.pipeline.remove('indexes')
+            self.roster = None
+            indexes = _result_indexes(self.comparison.results)
+        else:
+            self.pipeline.define('roster', StatusIndex, inputs=('joined',))
+            self.pipeline.define(
+                'indexes',
+                lambda results, roster: _result_indexes(
+                    {**results, ROSTER: roster.rows()}),
+                inputs=('compare', 'roster'))
+            self.roster = self.pipeline.get('roster')
+            indexes = self.pipeline.get('indexes')
+        (self.search_indexes, self.sort_indexes) = indexes
+        self.timings.set(f'Timings: {self.pipeline.timings_text()}')
+
+    def _sort_tree(self, tree: ttk.Treeview, column: str) -> None:
+        """Sort tree by column, reversing the order on a repeated click."""
+        reverse = False
+        if tree in self.tree_sort and self.tree_sort[tree][0] == column:
+            reverse = not self.tree_sort[tree][1]
+        self.tree_sort[tree] = (column, reverse)
+        self._filter_tree(tree)
+
+    def _filter_trees(self, *args) -> None:
+        for tree in self.tree_rows:
+            self._filter_tree(tree)
+
+    def _clear_tree(self, tree: ttk.Treeview) -> None:
+        """Delete the rows of tree, including those the filter hid."""
+        (_, keys) = self.tree_rows.get(tree, (None, []))
+        # Rows detached by _filter_tree are not among the children
+        tree.set_children('', *keys)
+        tree.delete(*tree.get_children())
+
+    def _filter_tree(self, tree: ttk.Treeview) -> None:
+        """Show the rows of tree that match the search text, in order."""
+        (result, keys) = self.tree_rows[tree]
+        if tree in self.tree_sort:
+            # The index may hold more rows than the tree, e.g. the roster
+            shown = set(keys)
+            keys = [key for key in self.sort_indexes[result].order(
+                *self.tree_sort[tree]) if key in shown]
+        query = self.search.get()
+        if query.strip():
+            matches = self.search_indexes[result].search(query)
+            keys = [key for key in keys if key in matches]
+        tree.set_children('', *keys)
+
+    def _export(self, *args) -> None:
+        """Export the results to a csv, xlsx or html file."""
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            defaultextension='.csv',
+            filetypes=EXPORT_FILE_TYPES,
+        )
+        if not path:
+            return
+        try:
+            export_comparison(self.comparison, path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror(
+                '', f'Export failed: {error}', parent=self.root)
 
     def _process(self, *args) -> None:
         ...
 
     def _dismiss(self, *args) -> None:
+        if self.upload:
+            messagebox.showinfo(
+                '', 'Wait for the include list upload to finish.',
+                parent=self.root)
+            return
         self.parent.root.destroy()
+
+
+def _result_indexes(results: dict) -> tuple[dict, dict]:
+    """Return search and sort indexes of the rows of each result."""
+    return ({result: SearchIndex(rows) for (result, rows) in results.items()},
+            {result: SortIndex(rows) for (result, rows) in results.items()})
+
+
+def _names_lines(members: dict) -> list[str]:
+    """Return the sorted lines of a bbo_names file for members."""
+    return sorted(f'{member.bbo},'
+                  f'{member.first_name},'
+                  f'{member.last_name},'
+                  f'{member.ebu}'
+                  for member in members.values())
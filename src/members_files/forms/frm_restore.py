@@ -0,0 +1,153 @@
+"""RestoreFrame for Phoenix Members Files."""
+import tkinter as tk
+from tkinter import ttk, messagebox
+from pathlib import Path
+
+from psiutils.constants import PAD
+from psiutils.buttons import ButtonFrame, IconButton
+
+from members_files.backups import BackupStore
+from members_files.config import config_service
+from members_files.constants import APP_TITLE, DEFAULT_GEOMETRY
+from members_files.include_lists import include_paths
+from members_files.text import Text
+
+txt = Text()
+
+FRAME_TITLE = f'{APP_TITLE} - Restore a backup'
+
+VERSION_COLUMNS = (
+    ('time', 'Backed up', 140),
+    ('size', 'Size (bytes)', 80),
+)
+
+
+class RestoreFrame():
+    """Restore an earlier version of an include or bbo_names file."""
+    def __init__(self, parent: tk.Frame) -> None:
+        self.root = tk.Toplevel(parent.root)
+        self.parent = parent
+        self.config = config_service
+        self.paths = [path for path in (*include_paths(parent),
+                                        parent.bbo_names_file.get())
+                      if path]
+        self.store = None
+        self.versions_tree = None
+        self.restore_button = None
+
+        # tk variables
+        self.file = tk.StringVar(value=self.paths[0] if self.paths else '')
+
+        self.file.trace_add('write', self._populate_versions_tree)
+
+        self.show()
+
+    def show(self) -> None:
+        # pylint: disable=no-member)
+        root = self.root
+        root.geometry(self.config.window_geometry(
+            Path(__file__).stem, DEFAULT_GEOMETRY))
+        root.transient(self.parent.root)
+        root.title(FRAME_TITLE)
+        root.bind('<Configure>',
+                  lambda event: self.config.window_resize(event, __file__))
+
+        root.bind('<Control-x>', self._dismiss)
+
+        root.rowconfigure(0, weight=1)
+        root.columnconfigure(0, weight=1)
+
+        main_frame = self._main_frame(root)
+        main_frame.grid(row=0, column=0, sticky=tk.NSEW, padx=PAD, pady=PAD)
+        self.button_frame = self._button_frame(root)
+        self.button_frame.grid(row=8, column=0, columnspan=9,
+                               sticky=tk.EW, padx=PAD, pady=PAD)
+
+        sizegrip = ttk.Sizegrip(root)
+        sizegrip.grid(sticky=tk.SE)
+
+    def _main_frame(self, master: tk.Frame) -> ttk.Frame:
+        frame = ttk.Frame(master)
+        frame.rowconfigure(1, weight=1)
+        frame.columnconfigure(1, weight=1)
+
+        row = 0
+        label = ttk.Label(frame, text='File')
+        label.grid(row=row, column=0, sticky=tk.E, padx=PAD, pady=PAD)
+
+        combobox = ttk.Combobox(frame, textvariable=self.file,
+                                values=self.paths, state='readonly')
+        combobox.grid(row=row, column=1, sticky=tk.EW)
+
+        row += 1
+        self.versions_tree = self._get_versions_tree(frame)
+        self.versions_tree.grid(row=row, column=0, columnspan=2,
+                                sticky=tk.NSEW, pady=PAD)
+        self._populate_versions_tree()
+        return frame
+
+    def _button_frame(self, master: tk.Frame) -> tk.Frame:
+        frame = ButtonFrame(master, tk.HORIZONTAL)
+        self.restore_button = IconButton(
+            frame, txt.RESTORE, 'restore', self._restore, True)
+        frame.buttons = [
+            self.restore_button,
+            frame.icon_button('exit', self._dismiss),
+        ]
+        self.restore_button.disable()
+        return frame
+
+    def _get_versions_tree(self, master: tk.Frame) -> ttk.Treeview:
+        """Return  a tree widget."""
+        tree = ttk.Treeview(
+            master,
+            selectmode='browse',
+            height=10,
+            show='headings',
+            )
+
+        tree['columns'] = tuple(col[0] for col in VERSION_COLUMNS)
+        for (col_key, col_text, col_width) in VERSION_COLUMNS:
+            tree.heading(col_key, text=col_text)
+            tree.column(col_key, width=col_width, anchor=tk.W)
+        tree.bind('<<TreeviewSelect>>', self._version_selected)
+        return tree
+
+    def _populate_versions_tree(self, *args) -> None:
+        self.versions_tree.delete(*self.versions_tree.get_children())
+        if self.restore_button:
+            self.restore_button.disable()
+        if not self.file.get():
+            return
+        self.store = BackupStore(
+            self.file.get(), keep=self.config.backup_versions)
+        for version in reversed(self.store.versions):
+            values = (version.time.replace('T', ' '), version.size)
+            self.versions_tree.insert(
+                '', 'end', iid=str(version.id), values=values)
+
+    def _version_selected(self, *args) -> None:
+        self.restore_button.enable(bool(self.versions_tree.selection()))
+
+    def _restore(self, *args) -> None:
+        selection = self.versions_tree.selection()
+        if not selection:
+            return
+        version_time = self.versions_tree.set(selection[0], 'time')
+        dlg = messagebox.askyesno(
+            '',
+            f'Replace {Path(self.file.get()).name} with the version '
+            f'backed up at {version_time}?',
+            parent=self.root,
+        )
+        if not dlg:
+            return
+        try:
+            self.store.restore(int(selection[0]))
+        except (OSError, KeyError, ValueError) as error:
+            messagebox.showerror(
+                '', f'Restore failed: {error}', parent=self.root)
+        self._populate_versions_tree()
+
+    def _dismiss(self, *args) -> None:
+        self.root.destroy()
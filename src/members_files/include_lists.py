@@ -0,0 +1,79 @@
+"""
+Merge several BBO include files into one index.
+
+Each include file is sorted on its own and the sorted files are merged
+as streams, so the combined list is never concatenated and re-sorted.
+Every username in the index carries a bitmask of the include files it
+appears in: bit i is set for the i-th file.
+"""
+import heapq
+from collections.abc import Iterator
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+
+from members_files.validation import RowError
+
+
+def include_paths(parent: object) -> list[str]:
+    """
+    Return the parent's include file followed by any others.
+
+    `other_include_files` is optional; its `get` returns a list of paths.
+    """
+    paths = [parent.bbo_include_file.get()]
+    others = getattr(parent, 'other_include_files', None)
+    if others is not None:
+        paths.extend(path for path in others.get() if path not in paths)
+    return paths
+
+
+def list_rules(paths: list[str]) -> list[dict]:
+    """Return a rule for the members missing from each include file."""
+    if len(paths) < 2:
+        return []
+    return [
+        {
+            'name': f'missing_from_include_{index + 1}',
+            'title': f'Missing from {Path(path).name}',
+            'status': ['Member'],
+            'has_bbo': True,
+            'missing_from_list': index,
+        }
+        for (index, path) in enumerate(paths)]
+
+
+def iter_include(path: str, errors: list) -> Iterator[str]:
+    """Yield the lower case usernames in an include file."""
+    try:
+        with open(path, 'r', encoding='utf8') as f_include:
+            for name in f_include:
+                yield name.rstrip('\n').lower()
+    except (OSError, UnicodeDecodeError) as error:
+        errors.append(RowError(path, 0, str(error)))
+
+
+def iter_sorted_names(path: str, errors: list) -> Iterator[str]:
+    """Yield the distinct usernames in an include file in sorted order."""
+    previous = None
+    for name in sorted(iter_include(path, errors)):
+        if name and name != previous:
+            yield name
+        previous = name
+
+
+def _tagged(names: Iterator[str], bit: int) -> Iterator[tuple[str, int]]:
+    for name in names:
+        yield (name, bit)
+
+
+def merge_include_files(paths: list[str],
+                        errors: list) -> Iterator[tuple[str, int]]:
+    """Yield (username, bitmask of files) in username order."""
+    streams = [_tagged(iter_sorted_names(path, errors), 1 << index)
+               for (index, path) in enumerate(paths)]
+    for (name, group) in groupby(heapq.merge(*streams), key=itemgetter(0)):
+        mask = 0
+        for (_, bit) in group:
+            mask |= bit
+        yield (name, mask)
@@ -0,0 +1,330 @@
+"""
+Upload changes to the include list to a BBO-style HTTP endpoint.
+
+Only the difference between the old and new include file is sent, as
+batches of JSON deltas POSTed to the endpoint:
+    {"add": ["username", ...], "remove": ["username", ...]}
+Every batch goes over one kept-alive connection, no faster than
+`requests_per_second`. A batch that fails with a connection error, 429
+or a 5xx status is retried with exponential backoff, honouring a
+Retry-After header; a batch that is refused (any other 4xx status) or
+still fails after `retries` raises UploadError, and the batches after
+it are not sent. Adding a name that is listed, or removing one that is
+not, changes nothing, so a failed upload can simply be sent again.
+`BackgroundUpload` runs an upload on a worker thread for a window.
+
+A stand-in for the endpoint keeps the list in memory, so an upload can
+be tried without BBO:
+    python -m members_files.include_upload serve [port]
+then set `upload_url` in the config to http://127.0.0.1:<port>/include.
+"""
+import http.client
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from members_files.diff import LineDiff
+
+BATCH_SIZE = 500  # usernames in each request
+REQUESTS_PER_SECOND = 2.0
+RETRIES = 3
+BACKOFF = 0.5  # seconds before the first retry; doubled for each one
+TIMEOUT = 10.0  # seconds
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+STAND_IN_PORT = 8765
+
+
+class UploadError(Exception):
+    """The endpoint refused a batch or could not be reached."""
+
+
+@dataclass
+class UploadResult():
+    added: int = 0
+    removed: int = 0
+    requests: int = 0  # including retries
+
+
+def delta_batches(diff: LineDiff,
+                  batch_size: int = BATCH_SIZE) -> list[dict]:
+    """Return the additions and removals in batches of batch_size."""
+    changes = ([('add', name) for name in diff.added]
+               + [('remove', name) for name in diff.removed])
+    output = []
+    for start in range(0, len(changes), batch_size):
+        batch = {'add': [], 'remove': []}
+        for (action, name) in changes[start:start + batch_size]:
+            batch[action].append(name)
+        output.append(batch)
+    return output
+
+
+class RateLimiter():
+    """Space calls to wait() at least 1/per_second apart."""
+    def __init__(self, per_second: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.interval = 1 / per_second if per_second > 0 else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+
+    def wait(self) -> None:
+        now = self.clock()
+        if now < self._next:
+            self.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+class IncludeUploader():
+    """Send include list deltas to url over a reused connection."""
+    def __init__(self, url: str, token: str = '',
+                 batch_size: int = BATCH_SIZE,
+                 requests_per_second: float = REQUESTS_PER_SECOND,
+                 retries: int = RETRIES, backoff: float = BACKOFF,
+                 timeout: float = TIMEOUT,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f'Invalid upload url: {url!r}')
+        self.parts = parts
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path = f'{self.path}?{parts.query}'
+        self.token = token
+        self.batch_size = max(batch_size, 1)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.sleep = sleep
+        self.limiter = RateLimiter(requests_per_second, sleep=sleep)
+        self._connection = None
+
+    def __enter__(self) -> 'IncludeUploader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def upload(self, diff: LineDiff) -> UploadResult:
+        """Send the changes in diff; raise UploadError if a batch fails."""
+        result = UploadResult()
+        for batch in delta_batches(diff, self.batch_size):
+            self._send(json.dumps(batch).encode('utf8'), result)
+            result.added += len(batch['add'])
+            result.removed += len(batch['remove'])
+        return result
+
+    def _send(self, body: bytes, result: UploadResult) -> None:
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            result.requests += 1
+            try:
+                (status, reason, retry_after) = self._post(body)
+            except (OSError, http.client.HTTPException) as error:
+                # The server may have closed a kept-alive connection
+                self.close()
+                (status, reason, retry_after) = (None, str(error), None)
+            if status is not None and 200 <= status < 300:
+                return
+            if status is not None and status not in RETRY_STATUSES:
+                raise UploadError(f'Upload refused: {status} {reason}')
+            if attempt == self.retries:
+                break
+            self.sleep(retry_after if retry_after is not None else delay)
+            delay *= 2
+        if status is not None:
+            reason = f'{status} {reason}'
+        raise UploadError(
+            f'Upload failed after {self.retries + 1} attempts: {reason}')
+
+    def _post(self, body: bytes) -> tuple[int, str, float | None]:
+        connection = self._get_connection()
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        connection.request('POST', self.path, body, headers)
+        response = connection.getresponse()
+        # The body must be read before the connection can be reused
+        response.read()
+        if response.will_close:
+            self.close()
+        return (response.status, response.reason,
+                _retry_after(response.getheader('Retry-After')))
+
+    def _get_connection(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            connection_class = (http.client.HTTPSConnection
+                                if self.parts.scheme == 'https'
+                                else http.client.HTTPConnection)
+            self._connection = connection_class(
+                self.parts.hostname, self.parts.port, timeout=self.timeout)
+        return self._connection
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Return the seconds of a Retry-After header (dates are ignored)."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def upload_include(diff: LineDiff, config: object) -> UploadResult | None:
+    """Upload diff to the configured endpoint; None if there is none."""
+    if not config.upload_url or not diff.changed:
+        return None
+    with IncludeUploader(
+            config.upload_url, config.upload_token,
+            config.upload_batch_size,
+            config.upload_requests_per_second) as uploader:
+        return uploader.upload(diff)
+
+
+class BackgroundUpload():
+    """
+    upload_include run on a worker thread, so that slow requests,
+    retries and rate limiting do not freeze a window.
+
+    Tk may only be used from its own thread, so the window polls `done`
+    with after() and then reads `result` or `error`.
+    """
+    def __init__(self, diff: LineDiff, config: object) -> None:
+        self.result = None  # UploadResult, or None if nothing was sent
+        self.error = None  # UploadError or ValueError if it failed
+        self._done = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(diff, config), name='include-upload',
+            daemon=True)
+
+    def start(self) -> 'BackgroundUpload':
+        self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for the upload to finish; return done."""
+        return self._done.wait(timeout)
+
+    def _run(self, diff: LineDiff, config: object) -> None:
+        try:
+            self.result = upload_include(diff, config)
+        except (UploadError, ValueError) as error:
+            self.error = error
+        finally:
+            self._done.set()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep connections alive
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            names = sorted(self.server.names)
+        self._reply(200, {'include': names})
+
+    def do_POST(self) -> None:
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        with server.lock:
+            server.requests += 1
+            if server.token and self.headers.get(
+                    'Authorization') != f'Bearer {server.token}':
+                self._reply(401, {'error': 'bad token'})
+                return
+            if server.failures:
+                server.failures -= 1
+                self._reply(503, {'error': 'try again'},
+                            {'Retry-After': '0'})
+                return
+            try:
+                delta = json.loads(body)
+                added = [str(name) for name in delta.get('add', [])]
+                removed = [str(name) for name in delta.get('remove', [])]
+            except (ValueError, AttributeError, TypeError):
+                self._reply(400, {'error': 'invalid delta'})
+                return
+            server.names.update(added)
+            server.names.difference_update(removed)
+            server.batches.append(delta)
+            size = len(server.names)
+        self._reply(200, {'size': size})
+
+    def _reply(self, status: int, content: dict,
+               headers: dict | None = None) -> None:
+        data = json.dumps(content).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for (name, value) in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    An in-memory include list endpoint for trying uploads offline.
+
+    POST applies a delta to `names` and GET returns them. The next
+    `failures` POSTs are answered 503, to exercise retries. `requests`
+    and `connections` count what the server has received.
+    """
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, names: list[str] | None = None,
+                 token: str = '', failures: int = 0) -> None:
+        super().__init__(('127.0.0.1', port), _StandInHandler)
+        self.names = set(names or [])
+        self.token = token
+        self.failures = failures
+        self.requests = 0
+        self.connections = 0
+        self.batches = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        (host, port) = self.server_address[:2]
+        return f'http://{host}:{port}/include'
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] != 'serve':
+        sys.exit('Usage: python -m members_files.include_upload '
+                 'serve [port]')
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else STAND_IN_PORT
+    with StandInServer(port) as server:
+        print(f'Serving the include list at {server.url}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,8 @@ from members_files.config import config
 from members_files.text import Text
 
 from members_files.forms.frm_config import ConfigFrame
+from members_files.forms.frm_lookup import LookupFrame
+from members_files.forms.frm_restore import RestoreFrame
 
 txt = Text(1)
 
@@ -35,6 +37,9 @@ class MainMenu():
 
     def _file_menu_items(self) -> list:
         return [
+            MenuItem(f'Bulk lookup{txt.ELLIPSIS}', self._show_lookup_frame),
+            MenuItem(f'Restore a backup{txt.ELLIPSIS}',
+                     self._show_restore_frame),
             MenuItem(txt.EXIT, self._dismiss),
         ]
 
@@ -43,6 +48,16 @@ class MainMenu():
         dlg = ConfigFrame(self)
         self.root.wait_window(dlg.root)
 
+    def _show_lookup_frame(self):
+        """Display the bulk lookup frame."""
+        dlg = LookupFrame(self.parent)
+        self.root.wait_window(dlg.root)
+
+    def _show_restore_frame(self):
+        """Display the restore frame."""
+        dlg = RestoreFrame(self.parent)
+        self.root.wait_window(dlg.root)
+
     def _help_menu_items(self) -> list:
         return [
             MenuItem(f'On line help{txt.ELLIPSIS}', self._show_help),
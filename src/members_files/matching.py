@@ -0,0 +1,169 @@
+"""Suggest bbo_names entries for members that could not be matched."""
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+from members_files.process import Member
+
+# Blocks larger than this are too unselective to be worth scoring
+MAX_BLOCK_SIZE = 50
+MIN_SCORE = 0.6
+MAX_SUGGESTIONS = 3
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+
+@dataclass
+class Suggestion():
+    """A bbo_names entry that may be the same person as a member."""
+    member: Member
+    candidate: Member
+    score: float
+
+
+def soundex(name: str) -> str:
+    """Return the Soundex code for name ('' if it has no letters)."""
+    letters = [char for char in name.lower() if char.isalpha()]
+    if not letters:
+        return ''
+    code = [letters[0].upper()]
+    previous = SOUNDEX_CODES.get(letters[0], '')
+    for char in letters[1:]:
+        digit = SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code.append(digit)
+        if char not in 'hw':
+            previous = digit
+    return ''.join(code)[:4].ljust(4, '0')
+
+
+def _normalise(text: str) -> str:
+    return ''.join(char for char in text.lower() if char.isalnum())
+
+
+def _deletions(text: str) -> set[str]:
+    """Return text with each single character removed (and text itself)."""
+    variants = {text}
+    for index in range(len(text)):
+        variants.add(text[:index] + text[index+1:])
+    return variants
+
+
+def _block_keys(member: Member) -> set[tuple]:
+    """Return the blocking keys for a member or bbo_names entry."""
+    first = _normalise(member.first_name)
+    last = _normalise(member.last_name)
+    keys = set()
+    if last:
+        keys.add(('name', soundex(last), first[:1]))
+    if first:
+        # Catches first and last names entered the wrong way round
+        keys.add(('name', soundex(first), last[:1]))
+    if member.ebu:
+        keys.update(('ebu', variant) for variant in _deletions(member.ebu))
+    username = _normalise(member.bbo)
+    if len(username) >= 4:
+        keys.add(('bbo', username[:4]))
+        keys.add(('bbo', username[-4:]))
+    return keys
+
+
+def _similarity(text_a: str, text_b: str) -> float:
+    if not text_a or not text_b:
+        return 0.0
+    return SequenceMatcher(None, text_a, text_b).ratio()
+
+
+def _ebu_similarity(ebu_a: str, ebu_b: str) -> float:
+    if not ebu_a or not ebu_b:
+        return 0.0
+    if ebu_a == ebu_b:
+        return 1.0
+    if _deletions(ebu_a) & _deletions(ebu_b):
+        return 0.8
+    return 0.0
+
+
+def score(member: Member, candidate: Member) -> float:
+    """Return a 0-1 likelihood that candidate is the same person."""
+    name = _similarity(
+        _normalise(f'{member.first_name}{member.last_name}'),
+        _normalise(f'{candidate.first_name}{candidate.last_name}'))
+    swapped = _similarity(
+        _normalise(f'{member.last_name}{member.first_name}'),
+        _normalise(f'{candidate.first_name}{candidate.last_name}'))
+    ebu = _ebu_similarity(member.ebu, candidate.ebu)
+    username = _similarity(member.bbo, candidate.bbo)
+    return round(
+        0.5 * max(name, swapped) + 0.3 * ebu + 0.2 * username, 3)
+
+
+class SuggestionIndex():
+    """
+    A blocking index over bbo_names entries.
+
+    Each entry is filed under a handful of cheap keys (Soundex of the
+    surname with the first initial, single-digit deletions of the EBU
+    number and the ends of the BBO username). A member is only scored
+    against entries sharing at least one key, so suggesting matches for
+    every unmatched member is roughly linear in the size of the files.
+    """
+    def __init__(self, candidates: list[Member]) -> None:
+        self.candidates = list(candidates)
+        self.blocks = defaultdict(list)
+        for index, candidate in enumerate(self.candidates):
+            for key in _block_keys(candidate):
+                self.blocks[key].append(index)
+
+    def suggest(self, member: Member,
+                limit: int = MAX_SUGGESTIONS,
+                min_score: float = MIN_SCORE) -> list[Suggestion]:
+        """Return the best scoring candidates for member."""
+        indexes = set()
+        for key in _block_keys(member):
+            block = self.blocks.get(key, [])
+            if len(block) <= MAX_BLOCK_SIZE:
+                indexes.update(block)
+
+        suggestions = []
+        for index in indexes:
+            candidate = self.candidates[index]
+            match_score = score(member, candidate)
+            if match_score >= min_score:
+                suggestions.append(Suggestion(member, candidate, match_score))
+        suggestions.sort(key=lambda item: (-item.score, item.candidate.ebu))
+        return suggestions[:limit]
+
+
+def suggest_matches(unmatched: dict[str, Member],
+                    bbo_names: dict[str, Member],
+                    members: dict[str, Member] | None = None,
+                    ) -> list[Suggestion]:
+    """
+    Return suggested bbo_names entries for each unmatched member.
+
+    Entries whose EBU number already belongs to a member of the same
+    surname are correctly linked and are not offered as candidates.
+    """
+    if members is None:
+        members = {}
+    candidates = []
+    for ebu, candidate in bbo_names.items():
+        linked = members.get(ebu)
+        if linked and (_normalise(linked.last_name)
+                       == _normalise(candidate.last_name)):
+            continue
+        candidates.append(candidate)
+
+    index = SuggestionIndex(candidates)
+    suggestions = []
+    for member in unmatched.values():
+        suggestions.extend(index.suggest(member))
+    return suggestions
@@ -1,9 +1,14 @@
 """Module caller for Phoenix Members Files."""
-import tkinter as tk
+import sys
+from tkinter import filedialog
 
-from data_files import DataFile
 from forms.frm_config import ConfigFrame
+from forms.frm_lookup import LookupFrame
 from forms.frm_report import ReportFrame
+from members_files.config import config_service
+from members_files.data_files import source_files
+from members_files.export import EXPORT_FILE_TYPES, export_comparison
+from members_files.external_join import get_comparison
 
 
 class ModuleCaller():
@@ -31,6 +36,11 @@ class ModuleCaller():
 
     Supported Modules:
         - config: Opens the ConfigFrame dialog.
+        - report: Opens the ReportFrame dialog.
+        - export: Exports the report to the file given as the next
+          argument, or chosen in a save dialog.
+        - lookup: Opens the LookupFrame dialog, looking up any further
+          arguments as EBU numbers or BBO usernames.
         - main: No action, but included for completeness.
         """
     def __init__(self, root, module) -> None:
@@ -53,6 +63,8 @@ class ModuleCaller():
         modules = {
             'config': self._config,
             'report': self._report,
+            'export': self._export,
+            'lookup': self._lookup,
             }
 
         self.invalid = False
@@ -85,26 +97,55 @@ class ModuleCaller():
 
     def _report(self) -> None:
         """
-        Open the configuration dialog and wait until it is closed.
-
-        Creates an instance of ConfigFrame and waits for its window to close
-        before continuing.
+        Open the report on the files last chosen in the main window and
+        wait until it is closed.
         """
-        self.data_file = DataFile()
-        self.data_file.read()
-
-        member_file = ''
-        bbo_include_file = ''
-        bbo_names_file = ''
-        if 'member_file' in self.data_file.content:
-            member_file = self.data_file.content['member_file']
-        if 'bbo_include_file' in self.data_file.content:
-            bbo_include_file = self.data_file.content['bbo_include_file']
-        if 'bbo_names_file' in self.data_file.content:
-            bbo_names_file = self.data_file.content['bbo_names_file']
-
-        self.member_file = tk.StringVar(value=member_file)
-        self.bbo_include_file = tk.StringVar(value=bbo_include_file)
-        self.bbo_names_file = tk.StringVar(value=bbo_names_file)
+        self._set_source_files()
         dlg = ReportFrame(self)
         self.root.wait_window(dlg.root)
+
+    def _lookup(self) -> None:
+        """
+        Open the bulk lookup dialog on the files last chosen in the main
+        window and wait until it is closed.
+        """
+        self._set_source_files()
+        dlg = LookupFrame(self, sys.argv[2:])
+        self.root.wait_window(dlg.root)
+
+    def _set_source_files(self) -> None:
+        """Give the dialogs the files last chosen in the main window."""
+        sources = source_files()
+        self.member_file = sources.member_file
+        self.bbo_include_file = sources.bbo_include_file
+        self.bbo_names_file = sources.bbo_names_file
+        self.other_include_files = sources.other_include_files
+
+    def _export(self) -> None:
+        """
+        Export the report on the files last chosen in the main window.
+
+        The format is given by the suffix of the output file: .csv, .xlsx
+        or .html.
+        """
+        if len(sys.argv) > 2:
+            path = sys.argv[2]
+        else:
+            path = filedialog.asksaveasfilename(
+                parent=self.root,
+                defaultextension='.csv',
+                filetypes=EXPORT_FILE_TYPES,
+            )
+        if not path:
+            return
+
+        comparison = get_comparison(
+            source_files(), config_service.rules,
+            config_service.memory_budget_mb,
+            schemas=config_service.schemas)
+        try:
+            export_comparison(comparison, path)
+        except (OSError, ValueError) as error:
+            print(f'*** Export failed: {error} ***')
+            return
+        print(f'Report exported to {path}')
@@ -0,0 +1,188 @@
+"""
+Read a bbo_names file incrementally when it has only grown.
+
+The fields parsed from each line are cached with the byte offset they
+were read up to and a hash of the file up to that offset. If the file
+still starts with the same bytes, only the lines appended since are
+parsed; otherwise the whole file is parsed again. Verifying the prefix
+means hashing it, which is much cheaper than parsing it.
+
+The cache holds only strings and ints, in a column per field, and is
+written with marshal: loading it and building the records from it takes
+a fraction of the time that unpickling the records would, which is
+slower than parsing the file.
+
+Small files are parsed in full without a cache. Every line is decoded
+on its own, by `parse_lines`, so an undecodable line is reported
+against its line number rather than ending the read.
+"""
+import hashlib
+import marshal
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+
+from members_files.constants import USER_DATA_DIR
+from members_files.file_utils import atomic_file
+from members_files.validation import RowError
+
+CACHE_DIR = Path(USER_DATA_DIR, 'cache')
+CACHE_VERSION = 2
+MIN_CACHED_SIZE = 1 << 20  # bytes
+HASH_CHUNK = 1 << 20
+
+
+# parse_line(path, line number, text, errors) returns a tuple of str
+# fields, or None for a blank or invalid line
+LineParser = Callable[[str, int, str, list], tuple | None]
+
+
+def read_bbo_names(path: str, parse_line: LineParser,
+                   build: Callable[..., object], errors: list,
+                   cache_dir: str | Path = CACHE_DIR,
+                   min_size: int = MIN_CACHED_SIZE) -> list[tuple]:
+    """Return (line number, build(*fields)) for the valid lines of a
+    bbo_names file, adding problems to errors."""
+    try:
+        with open(path, 'rb') as f_names:
+            size = f_names.seek(0, 2)
+            f_names.seek(0)
+            if size < min_size:
+                (lines, columns) = _parse(
+                    path, f_names.read(), 0, parse_line, errors)
+            else:
+                (lines, columns) = _read_incrementally(
+                    path, f_names, parse_line, Path(cache_dir), errors)
+    except OSError as error:
+        errors.append(RowError(path, 0, str(error)))
+        return []
+    if not lines:
+        return []
+    return list(zip(lines, map(build, *columns)))
+
+
+def parse_lines(path: str, raw_lines: Iterable[bytes], line: int,
+                parse_line: LineParser,
+                errors: list) -> Iterator[tuple[int, tuple]]:
+    """Yield (line number, fields) for the valid lines of raw_lines, the
+    first of which is line + 1, decoding each line on its own."""
+    for (number, raw) in enumerate(raw_lines, start=line + 1):
+        try:
+            item = raw.decode('utf8')
+        except UnicodeDecodeError as error:
+            errors.append(RowError(path, number, str(error)))
+            continue
+        fields = parse_line(path, number, item, errors)
+        if fields:
+            yield (number, fields)
+
+
+def _read_incrementally(path: str, f_names, parse_line: LineParser,
+                        cache_dir: Path,
+                        errors: list) -> tuple[list, list]:
+    cache_path = _cache_path(cache_dir, path)
+    cache = _load(cache_path)
+    digest = hashlib.sha256()
+    (lines, columns) = ([], [])
+    cached_errors = []
+    (offset, line) = (0, 0)
+    if cache and _prefix_matches(f_names, cache['offset'],
+                                 cache['prefix_sha256'], digest):
+        (lines, columns) = (cache['lines'], cache['columns'])
+        cached_errors = [RowError(path, number, message)
+                         for (number, message) in cache['errors']]
+        (offset, line) = (cache['offset'], cache['line'])
+    else:
+        digest = hashlib.sha256()
+        f_names.seek(0)
+
+    tail = f_names.read()
+    # Only whole lines are cached; a last line without a newline may
+    # still be being written
+    complete = tail.rfind(b'\n') + 1
+    digest.update(tail[:complete])
+    tail_errors = []
+    (new_lines, new_columns) = _parse(
+        path, tail[:complete], line, parse_line, tail_errors)
+    new_line = line + tail[:complete].count(b'\n')
+    partial_errors = []
+    (partial_lines, partial_columns) = _parse(
+        path, tail[complete:], new_line, parse_line, partial_errors)
+
+    lines.extend(new_lines)
+    columns = _extend(columns, new_columns)
+    cached_errors.extend(tail_errors)
+    if complete:
+        _save(cache_path, {
+            'version': CACHE_VERSION,
+            'path': str(path),
+            'offset': offset + complete,
+            'line': new_line,
+            'prefix_sha256': digest.hexdigest(),
+            'lines': lines,
+            'columns': columns,
+            'errors': [(error.line, error.message)
+                       for error in cached_errors],
+        })
+    errors.extend(cached_errors + partial_errors)
+    return (lines + partial_lines, _extend(columns, partial_columns))
+
+
+def _parse(path: str, data: bytes, line: int, parse_line: LineParser,
+           errors: list) -> tuple[list[int], list[list]]:
+    """Return the line numbers of the valid lines in data, the first of
+    which is line + 1, and a column of their values for each field."""
+    raw_lines = data.split(b'\n')
+    if raw_lines[-1] == b'':
+        raw_lines.pop()
+    parsed = list(parse_lines(path, raw_lines, line, parse_line, errors))
+    columns = zip(*(fields for (number, fields) in parsed))
+    return ([number for (number, fields) in parsed],
+            [list(column) for column in columns])
+
+
+def _extend(columns: list[list], new_columns: list[list]) -> list[list]:
+    """Add the values of new_columns to columns; either may be empty."""
+    if not columns:
+        return new_columns
+    for (column, values) in zip(columns, new_columns):
+        column.extend(values)
+    return columns
+
+
+def _prefix_matches(f_names, offset: int, prefix_sha256: str,
+                    digest) -> bool:
+    """Hash the first offset bytes into digest and compare them."""
+    remaining = offset
+    while remaining:
+        chunk = f_names.read(min(remaining, HASH_CHUNK))
+        if not chunk:
+            return False
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest.hexdigest() == prefix_sha256
+
+
+def _cache_path(cache_dir: Path, path: str) -> Path:
+    resolved = str(Path(path).resolve())
+    digest = hashlib.sha256(resolved.encode('utf8')).hexdigest()
+    return Path(cache_dir, f'bbo_names-{digest[:16]}.marshal')
+
+
+def _load(cache_path: Path) -> dict | None:
+    try:
+        with open(cache_path, 'rb') as f_cache:
+            # marshal.load reads the file in small pieces
+            cache = marshal.loads(f_cache.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return None
+    return cache
+
+
+def _save(cache_path: Path, cache: dict) -> None:
+    try:
+        with atomic_file(cache_path, 'wb') as f_cache:
+            f_cache.write(marshal.dumps(cache))
+    except OSError:
+        pass  # the cache is only an optimisation
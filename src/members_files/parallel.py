@@ -0,0 +1,43 @@
+"""
+Run independent tasks on threads when the interpreter has no GIL.
+
+On a free-threaded build of CPython the input files can be parsed at
+the same time on a thread pool, and the results shared without the
+pickling a process pool would need. With the GIL, threads would only
+add overhead to this CPU bound work, so the tasks run one after another.
+"""
+import os
+import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar('T')
+
+
+def gil_enabled() -> bool:
+    """Return True unless this is a free-threaded build running without
+    the GIL."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    if is_gil_enabled is None:
+        return True
+    return is_gil_enabled()
+
+
+def run_all(tasks: list[Callable[[], T]],
+            parallel: bool | None = None) -> list[T]:
+    """
+    Return the results of the tasks in order.
+
+    The tasks run on a thread pool if parallel is True, or if it is None
+    and the GIL is disabled; otherwise they run in turn.
+    """
+    if parallel is None:
+        parallel = not gil_enabled()
+    workers = min(len(tasks), os.cpu_count() or 1)
+    if not parallel or workers < 2:
+        return [task() for task in tasks]
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix='parse') as pool:
+        futures = [pool.submit(task) for task in tasks]
+        return [future.result() for future in futures]
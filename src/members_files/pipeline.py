@@ -0,0 +1,134 @@
+"""
+Named stages whose outputs are kept until their inputs change.
+
+Each stage has a key, e.g. the signatures of the files it reads or the
+options it depends on, and the stages whose outputs it takes. Its
+fingerprint is its key with the fingerprints of those stages, so a
+change to one file or option re-runs only the stages downstream of it;
+the others return the output they gave last time.
+
+The time each stage took since `start_run`, or that its output was
+reused, is kept in `timings`.
+"""
+import os
+import threading
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+from members_files import logger
+from members_files.parallel import run_all
+
+
+@dataclass
+class StageTiming():
+    """How long a stage took, or that its output was reused."""
+    name: str
+    seconds: float
+    cached: bool
+
+    def __str__(self) -> str:
+        if self.cached:
+            return f'{self.name} (cached)'
+        return f'{self.name} {self.seconds:.3f}s'
+
+
+@dataclass
+class Stage():
+    """A step of a pipeline: run(*outputs of inputs) returns its output."""
+    name: str
+    run: Callable
+    inputs: tuple[str, ...] = ()
+    key: Callable[[], Hashable] | None = None
+
+
+def file_signature(path: str) -> tuple:
+    """Return a value that changes when the file at path changes."""
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return (path, None, None)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+class Pipeline():
+    """
+    Stages run on demand and memoised on their fingerprints.
+
+    Stages may be defined again, e.g. with a different key function; an
+    output is reused only if the fingerprint is unchanged. Outputs are
+    shared between runs and must not be changed by their users.
+    """
+    def __init__(self) -> None:
+        self.stages = {}  # name: Stage
+        self.timings = []  # StageTiming of each stage since start_run
+        self._memo = {}  # name: (fingerprint, output)
+        self._lock = threading.Lock()
+
+    def define(self, name: str, run: Callable, inputs: tuple[str, ...] = (),
+               key: Callable[[], Hashable] | None = None) -> None:
+        self.stages[name] = Stage(name, run, tuple(inputs), key)
+
+    def remove(self, name: str) -> None:
+        """Forget a stage and its output, if it is defined."""
+        self.stages.pop(name, None)
+        self._memo.pop(name, None)
+
+    def start_run(self) -> None:
+        """Forget the timings of the last run."""
+        self.timings = []
+
+    def run(self, names: list[str], parallel: bool | None = None) -> list:
+        """
+        Return the outputs of the stages in names, in order.
+
+        The stages in names (and those they depend on) may run at the
+        same time on threads, see `parallel.run_all`, so they should not
+        share stale inputs.
+        """
+        return run_all([lambda name=name: self.get(name) for name in names],
+                       parallel)
+
+    def get(self, name: str) -> object:
+        """Return the output of a stage, running it if it is stale."""
+        (fingerprint, output) = self._get(name)
+        return output
+
+    def fingerprint(self, name: str) -> tuple:
+        """Return the fingerprint of a stage without running it."""
+        stage = self.stages[name]
+        return (stage.key() if stage.key else None,
+                *(self.fingerprint(item) for item in stage.inputs))
+
+    def is_stale(self, name: str) -> bool:
+        memo = self._memo.get(name)
+        return memo is None or memo[0] != self.fingerprint(name)
+
+    def clear(self) -> None:
+        self._memo = {}
+
+    def timings_text(self) -> str:
+        return ', '.join(str(timing) for timing in self.timings)
+
+    def _get(self, name: str) -> tuple:
+        stage = self.stages[name]
+        upstream = [self._get(item) for item in stage.inputs]
+        fingerprint = (stage.key() if stage.key else None,
+                       *(item[0] for item in upstream))
+        memo = self._memo.get(name)
+        if memo is not None and memo[0] == fingerprint:
+            self._record(StageTiming(name, 0.0, True))
+            return memo
+
+        start = time.perf_counter()
+        output = stage.run(*(item[1] for item in upstream))
+        seconds = time.perf_counter() - start
+        self._memo[name] = (fingerprint, output)
+        self._record(StageTiming(name, seconds, False))
+        logger.debug('Pipeline stage', stage=name, seconds=seconds)
+        return (fingerprint, output)
+
+    def _record(self, timing: StageTiming) -> None:
+        with self._lock:
+            if all(item.name != timing.name for item in self.timings):
+                self.timings.append(timing)
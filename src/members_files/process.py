@@ -1,7 +1,27 @@
 """Compare BBO membership files."""
+import json
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
+from functools import partial
+from typing import TypeVar
 
-from members_files.csv_utils import get_dict_from_csv_file
+from members_files.constants import CONFIG_PATH
+from members_files.csv_utils import (
+    READ_ERRORS, csv_encoding, iter_numbered_rows)
+from members_files.include_lists import (
+    include_paths, list_rules, merge_include_files)
+from members_files.names_cache import parse_lines, read_bbo_names
+from members_files.pipeline import Pipeline, StageTiming, file_signature
+from members_files.validation import RowError, normalise_ebu
+from members_files.rules import (BUILTIN_RULES, JoinedRecord, Rule,
+                                 compile_rules)
+from members_files.schemas import (
+    BUILTIN_SCHEMAS, Schema, compile_schemas, is_title_row, match_schema)
+
+T = TypeVar('T')
+
+# Stages that read the files and join them in memory
+FILE_STAGES = ('members', 'include', 'bbo_names', 'joined', 'compare')
 
 
 @dataclass
@@ -14,78 +34,350 @@ class Member():
     status: str
 
 
+class FileName():
+    """A fixed file name (or list of them) with the `get` method of the tk
+    variables."""
+    def __init__(self, value: str | list[str]) -> None:
+        self.value = value
+
+    def get(self) -> str | list[str]:
+        return self.value
+
+
+class SourceFiles():
+    """The files to compare, for use where there are no tk variables."""
+    def __init__(self, member_file: str, bbo_include_file: str,
+                 bbo_names_file: str,
+                 other_include_files: list[str] | None = None) -> None:
+        self.member_file = FileName(member_file)
+        self.bbo_include_file = FileName(bbo_include_file)
+        self.bbo_names_file = FileName(bbo_names_file)
+        self.other_include_files = FileName(list(other_include_files or []))
+
+    @property
+    def paths(self) -> tuple[str, ...]:
+        return (self.member_file.get(),
+                *include_paths(self),
+                self.bbo_names_file.get())
+
+
 class Compare():
-    def __init__(self, parent: object) -> None:
+    """
+    Compare the membership file with the BBO include and bbo_names files.
+
+    The three files are joined into one record per person and every rule
+    is evaluated in a single pass over the joined records. The built-in
+    rules give `missing_from_include` and `missing_from_bbo`; further
+    rules declared in the config give their own entries in `results`.
+
+    If there is more than one include file, each gets a rule reporting
+    the members missing from it.
+
+    The files are parsed at the same time on a free-threaded interpreter;
+    parallel forces this on (True) or off (False).
+
+    schemas declares layouts of membership file besides the built-in
+    ones; see `members_files.schemas`.
+
+    Each file is read, and the rules compiled and evaluated, in a stage
+    of a Pipeline. Given the pipeline of an earlier comparison, only the
+    stages whose files or options have changed are run again; `timings`
+    gives the time each stage took.
+    """
+    external = False  # True if the files were joined out of core
+
+    def __init__(self, parent: object, rules: list[dict] | None = None,
+                 parallel: bool | None = None,
+                 pipeline: Pipeline | None = None,
+                 schemas: list[dict] | None = None) -> None:
         self.parent = parent
+        self.parallel = parallel
+        self.pipeline = pipeline or Pipeline()
         self.missing_from_include = {}
         self.missing_from_bbo = {}
         self.members_ebu = {}  # dict of members from members' database
         self.members_bbo = {}  # fist of members from bb_names file
+        self.include_paths = include_paths(parent)
+        self.include_index = {}  # username: bitmask of include files
+        self.include_list = []  # usernames in any include file, sorted
         self.bbo_names = []
         self.duplicates = []
+        self.errors = []  # list of RowError found in the input files
+        self._define_stages(
+            list(rules or []) + list_rules(self.include_paths),
+            list(schemas or []))
+        self.pipeline.start_run()
+        (self.rules, rule_errors) = self.pipeline.get('rules')
+        (self.schemas, schema_errors) = self.pipeline.get('schemas')
+        self.errors.extend(rule_errors + schema_errors)
+        self.results = {}  # rule name: {key: Member}
         self._compare()
 
+    @property
+    def timings(self) -> list[StageTiming]:
+        return self.pipeline.timings
+
+    def _define_stages(self, specs: list[dict],
+                       schema_specs: list[dict]) -> None:
+        """Define the stages of the comparison in its pipeline."""
+        define = self.pipeline.define
+        define('rules', lambda: self._compile_rules(specs),
+               key=lambda: json.dumps(specs, sort_keys=True, default=str))
+        define('schemas',
+               lambda: _config_errors(compile_schemas(schema_specs)),
+               key=lambda: json.dumps(
+                   schema_specs, sort_keys=True, default=str))
+        self._define_file_stages()
+
+    def _define_file_stages(self) -> None:
+        """Define the FILE_STAGES, which read and join the files."""
+        member_path = self.parent.member_file.get()
+        names_path = self.parent.bbo_names_file.get()
+        paths = self.include_paths
+        define = self.pipeline.define
+        define('members',
+               lambda schemas: _with_errors(
+                   partial(self._get_members, schemas=schemas[0]),
+                   member_path),
+               inputs=('schemas',),
+               key=lambda: file_signature(member_path))
+        define('include',
+               lambda: _with_errors(self._get_include_index, paths),
+               key=lambda: tuple(file_signature(path) for path in paths))
+        define('bbo_names',
+               lambda: _with_errors(self._get_bbo_names, names_path),
+               key=lambda: file_signature(names_path))
+        define('joined', self._joined,
+               inputs=('members', 'include', 'bbo_names'))
+        define('compare', self._evaluate, inputs=('rules', 'joined'))
+
     def _compare(self) -> None:
-        (members, members_fields) = get_dict_from_csv_file(
-            self.parent.member_file.get(), 'EBU')
-        del members_fields
-        for item in members.values():
-            if item['EBU'] == 'EBU':
+        # The files are independent, so they can be read at once
+        (members, include, names) = self.pipeline.run(
+            ['members', 'include', 'bbo_names'], self.parallel)
+        (self.members_ebu, member_errors) = members
+        (self.include_index, include_errors) = include
+        ((self.members_bbo, duplicates), names_errors) = names
+        self.duplicates.extend(duplicates)
+        self.errors.extend(member_errors + include_errors + names_errors)
+        self.include_list = list(self.include_index)
+
+        self.results = self.pipeline.get('compare')
+        self.missing_from_include = self.results['missing_from_include']
+        self.missing_from_bbo = self.results['missing_from_bbo']
+
+    def _compile_rules(self, specs: list[dict]) -> tuple[list[Rule], list]:
+        return _config_errors(compile_rules(BUILTIN_RULES + list(specs)))
+
+    def _joined(self, members: tuple, include: tuple,
+                names: tuple) -> list[JoinedRecord]:
+        return list(self._join(members[0], names[0][0], include[0]))
+
+    def _evaluate(self, rules: tuple, joined: list[JoinedRecord]) -> dict:
+        """Return the results of every rule for the joined records."""
+        results = {rule.name: {} for rule in rules[0]}
+        evaluate_rules(rules[0], joined, results)
+        return results
+
+    def _join(self, members_ebu: dict, members_bbo: dict,
+              include: dict) -> Iterator[JoinedRecord]:
+        """Yield a record for everyone in any of the three files."""
+        usernames = set()
+        for (ebu, member) in members_ebu.items():
+            names_entry = members_bbo.get(ebu)
+            bbo = member.bbo or (names_entry.bbo if names_entry else '')
+            usernames.add(bbo)
+            lists = include.get(bbo, 0)
+            yield JoinedRecord(
+                ebu, member, names_entry, bbo, bool(lists), lists)
+
+        for (ebu, names_entry) in members_bbo.items():
+            if ebu in members_ebu:
                 continue
-            member = Member(
-                str(int(item['EBU'])),
-                item['FIRSTNAME'],
-                item['SURNAME'],
-                item['BBOUSERNAME'].lower(),
-                item['STATUS'],
-            )
-
-            self.members_ebu[member.ebu] = member
-
-        include_list = self._get_include_list(
-            self.parent.bbo_include_file.get())
-
-        self.members_bbo = self._get_bbo_names(
-            self.parent.bbo_names_file.get())
-
-        for ebu, member in self.members_ebu.items():
-            if member.bbo and member.status == 'Member':
-                if member.bbo not in include_list:
-                    self.missing_from_include[ebu] = self.members_ebu[ebu]
-                if member.ebu not in self.members_bbo:
-                    self.missing_from_bbo[ebu] = self.members_ebu[ebu]
-
-    def _get_include_list(self, path: str) -> list:
-        with open(path, 'r', encoding='utf8') as f_include:
-            data = f_include.read().split('\n')
-            return [name.lower() for name in data]
-
-    def _get_bbo_names(self, path: str) -> dict:
+            bbo = names_entry.bbo
+            usernames.add(bbo)
+            lists = include.get(bbo, 0)
+            yield JoinedRecord(
+                ebu, None, names_entry, bbo, bool(lists), lists)
+
+        for (name, lists) in include.items():
+            if name not in usernames:
+                yield JoinedRecord(
+                    f'bbo:{name}', None, None, name, True, lists)
+
+    def _get_members(self, path: str, errors: list,
+                     schemas: list[Schema]) -> dict:
+        """Return valid rows of the membership file keyed on EBU number."""
+        output = {}
+        lines = {}
+        for (line, member) in read_members(path, errors, schemas):
+            if member.ebu in lines:
+                errors.append(
+                    duplicate_error(path, line, member.ebu, lines))
+            lines[member.ebu] = line
+            output[member.ebu] = member
+        return output
+
+    def _get_include_index(self, paths: list[str],
+                           errors: list) -> dict[str, int]:
+        """Return the usernames in the include files, merged in order."""
+        return dict(merge_include_files(paths, errors))
+
+    def _get_bbo_names(self, path: str, errors: list) -> tuple[dict, list]:
+        """Return valid lines of the bbo_names file keyed on EBU number,
+        and the members found more than once."""
         output = {}
-        with open(path, 'r', encoding='utf8') as f_names:
-            bbo_names = f_names.read().strip('\n').split('\n')
-
-        for item in bbo_names:
-
-            record = item.split(',')
-            record = [field.strip() for field in record]
-            member = Member(
-                str(int(record[3])),
-                record[1],
-                record[2],
-                record[0].lower(),
-                '',
-            )
+        duplicates = []
+        count = 0
+        for (line, member) in read_bbo_names(
+                path, _bbo_names_fields, Member, errors):
+            count += 1
             if member.ebu in output:
-                self.duplicates.append(member)
+                duplicates.append(member)
                 dup_member = output[member.ebu]
-                self.duplicates.append(dup_member)
+                duplicates.append(dup_member)
 
             output[member.ebu] = member
 
-        if self.duplicates:
-            for member in sorted(self.duplicates, key=lambda x: x.last_name):
+        if duplicates:
+            for member in sorted(duplicates, key=lambda x: x.last_name):
                 print(member)
-            print(f'{len(bbo_names)=}')
+            print(f'{count=}')
             print(f'{len(output)=}')
-        return output
+        return (output, duplicates)
+
+
+def _with_errors(read: Callable[[object, list], T], source: object,
+                 ) -> tuple[T, list]:
+    """Return the output of read and the errors it found in source."""
+    errors = []
+    return (read(source, errors), errors)
+
+
+def _config_errors(compiled: tuple[list, list[str]]) -> tuple[list, list]:
+    """Return what was compiled from the config, and its problems as
+    RowErrors."""
+    (items, errors) = compiled
+    return (items,
+            [RowError(str(CONFIG_PATH), 0, error) for error in errors])
+
+
+def read_members(path: str, errors: list,
+                 schemas: list[Schema] = BUILTIN_SCHEMAS,
+                 ) -> Iterator[tuple[int, Member]]:
+    """
+    Yield (line number, Member) from the membership file as it is read.
+
+    The file is not held in memory; its encoding is found first, as a
+    decoding error cannot be recovered part way. A file that is missing
+    or cannot be read has no rows and is added to errors.
+    """
+    try:
+        rows = iter_numbered_rows(path, csv_encoding(path))
+        yield from iter_members(path, rows, errors, schemas)
+    except FileNotFoundError:
+        errors.append(RowError(path, 0, 'File not found'))
+    except READ_ERRORS as error:
+        errors.append(RowError(path, 0, str(error)))
+
+
+def iter_members(path: str, rows: Iterator, errors: list,
+                 schemas: list[Schema] = BUILTIN_SCHEMAS,
+                 ) -> Iterator[tuple[int, Member]]:
+    """
+    Yield (line number, Member) for the valid membership records.
+
+    rows are the (line number, row) of an export in one of the layouts of
+    schemas. Invalid rows, and a missing title row or columns, are added
+    to errors.
+    """
+    extract = None
+    for (line, row) in rows:
+        if extract is None:
+            if is_title_row(row, schemas):
+                (schema, missing) = match_schema(row, schemas)
+                if not schema:
+                    errors.append(RowError(
+                        path, 0, f'Missing columns: {", ".join(missing)}'))
+                    return
+                extract = schema.extractor(row)
+            continue
+        if not row:
+            continue
+        (ebu_text, first_name, last_name, bbo, status) = extract(row)
+        if not ebu_text.strip():
+            continue
+        ebu = normalise_ebu(ebu_text)
+        if ebu is None:
+            message = f'Invalid EBU number {ebu_text!r}'
+            errors.append(RowError(path, line, message))
+            continue
+        yield (line, Member(ebu, first_name, last_name, bbo.lower(), status))
+
+    if extract is None:
+        errors.append(
+            RowError(path, 0, 'No title row with an EBU column found'))
+
+
+def duplicate_error(path: str, line: int, ebu: str,
+                    lines: dict) -> RowError:
+    return RowError(path, line,
+                    f'Duplicate EBU number {ebu} '
+                    f'(also on line {lines[ebu]})')
+
+
+def iter_bbo_names(path: str, errors: list) -> Iterator[tuple[int, Member]]:
+    """
+    Yield (line number, Member) for the valid lines of a bbo_names file.
+
+    The file is streamed, but its lines are decoded and parsed as
+    `read_bbo_names` does, so both give the same entries and errors.
+    """
+    try:
+        with open(path, 'rb') as f_names:
+            # Split on b'\n' only, as read_bbo_names does
+            raw_lines = (raw.removesuffix(b'\n') for raw in f_names)
+            for (line, fields) in parse_lines(
+                    path, raw_lines, 0, _bbo_names_fields, errors):
+                yield (line, Member(*fields))
+    except OSError as error:
+        errors.append(RowError(path, 0, str(error)))
+
+
+def _bbo_names_fields(path: str, line: int, item: str,
+                      errors: list) -> tuple[str, ...] | None:
+    """Return the Member fields of a bbo_names line, or None."""
+    if not item.strip():
+        return None
+
+    record = item.split(',')
+    record = [field.strip() for field in record]
+    if len(record) < 4:
+        errors.append(
+            RowError(path, line, f'Expected 4 fields, found {len(record)}'))
+        return None
+    ebu = normalise_ebu(record[3])
+    if ebu is None:
+        errors.append(
+            RowError(path, line, f'Invalid EBU number {record[3]!r}'))
+        return None
+    return (ebu, record[1], record[2], record[0].lower(), '')
+
+
+def evaluate_rules(rules: list[Rule], records: Iterator[JoinedRecord],
+                   results: dict) -> None:
+    """Add the display of each record to the results of every rule it
+    satisfies."""
+    for record in records:
+        for rule in rules:
+            if rule.predicate(record):
+                results[rule.name][record.key] = display_record(record)
+
+
+def display_record(record: JoinedRecord) -> Member:
+    """Return the best description of a joined record for a report."""
+    if record.member:
+        return record.member
+    if record.names_entry:
+        return record.names_entry
+    return Member('', '', '', record.bbo, '')
@@ -10,6 +10,8 @@ from psiutils.widgets import get_styles
 from psiutils.utilities import display_icon
 
 from constants import ICON_FILE
+from members_files.config import config_service
+from members_files.stall_monitor import start_stall_monitor
 from module_caller import ModuleCaller
 
 from forms.frm_main import MainFrame
@@ -32,4 +34,9 @@ class Root():
         if not dlg or dlg.invalid:
             MainFrame(root)
 
+        monitor = start_stall_monitor(
+            root, config_service.stall_threshold_ms)
         root.mainloop()
+        if monitor:
+            monitor.stop()
+        config_service.save()
@@ -0,0 +1,173 @@
+"""
+Comparison rules compiled from their declarations in the config.
+
+Rules are declared as a list of dicts, in Python literal syntax and on
+one line, which is what the config's TOML parser accepts (it rejects
+[[rules]] tables and inline tables), e.g.
+    rules = [{'name': 'lapsed', 'status': ['Lapsed'], 'in_names': True}]
+Each key other than name and title is one of CONDITIONS.
+"""
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from members_files.process import Member
+
+
+@dataclass
+class JoinedRecord():
+    """What the three input files hold for one person."""
+    key: str
+    member: 'Member | None'  # from the membership file
+    names_entry: 'Member | None'  # from the bbo_names file
+    bbo: str  # username looked up in the include files
+    in_include: bool  # in any include file
+    include_lists: int = 0  # bit i is set if in the i-th include file
+
+
+@dataclass
+class Rule():
+    """A named question asked of every joined record."""
+    name: str
+    title: str
+    predicate: Callable[[JoinedRecord], bool]
+
+
+def _has_member(value: bool) -> Callable:
+    return lambda record: (record.member is not None) == value
+
+
+def _status(statuses: list[str] | str) -> Callable:
+    if isinstance(statuses, str):
+        statuses = [statuses]
+    statuses = frozenset(statuses)
+    return lambda record: (record.member is not None
+                           and record.member.status in statuses)
+
+
+def _has_bbo(value: bool) -> Callable:
+    return lambda record: bool(record.member and record.member.bbo) == value
+
+
+def _in_include(value: bool) -> Callable:
+    return lambda record: record.in_include == value
+
+
+def _in_main_include(value: bool) -> Callable:
+    return lambda record: bool(record.include_lists & 1) == value
+
+
+def _in_names(value: bool) -> Callable:
+    return lambda record: (record.names_entry is not None) == value
+
+
+def _missing_from_list(index: int) -> Callable:
+    bit = 1 << int(index)
+    return lambda record: not record.include_lists & bit
+
+
+def _bbo_mismatch(value: bool) -> Callable:
+    def predicate(record: JoinedRecord) -> bool:
+        mismatch = bool(
+            record.member and record.names_entry
+            and record.member.bbo and record.names_entry.bbo
+            and record.member.bbo != record.names_entry.bbo)
+        return mismatch == value
+    return predicate
+
+
+# Conditions a rule may declare, each compiled into a predicate
+CONDITIONS = {
+    'has_member': _has_member,
+    'status': _status,
+    'has_bbo': _has_bbo,
+    'in_include': _in_include,
+    'in_main_include': _in_main_include,
+    'in_names': _in_names,
+    'missing_from_list': _missing_from_list,
+    'bbo_mismatch': _bbo_mismatch,
+}
+
+# The reports the application has always produced. The include file
+# they refer to is the main one, which the report rewrites and uploads
+BUILTIN_RULES = [
+    {
+        'name': 'missing_from_include',
+        'title': 'Missing from include',
+        'status': ['Member'],
+        'has_bbo': True,
+        'in_main_include': False,
+    },
+    {
+        'name': 'missing_from_bbo',
+        'title': 'Missing from bbo_names',
+        'status': ['Member'],
+        'has_bbo': True,
+        'in_names': False,
+    },
+]
+
+# Further rules offered in a new config file
+DEFAULT_RULES = [
+    {
+        'name': 'lapsed_in_include',
+        'title': 'Lapsed members in include',
+        'status': ['Lapsed'],
+        'in_include': True,
+    },
+    {
+        'name': 'include_without_member',
+        'title': 'Include entries with no member',
+        'has_member': False,
+        'in_include': True,
+    },
+    {
+        'name': 'bbo_mismatch',
+        'title': 'BBO username differs in bbo_names',
+        'bbo_mismatch': True,
+    },
+]
+
+
+def compile_rule(spec: dict) -> Rule:
+    """
+    Return a Rule whose predicate is true when all its conditions hold.
+
+    Raises ValueError if the declaration has no name or uses an unknown
+    condition.
+    """
+    spec = dict(spec)
+    name = spec.pop('name', '')
+    if not name:
+        raise ValueError(f'Rule has no name: {spec}')
+    title = spec.pop('title', name)
+    unknown = [key for key in spec if key not in CONDITIONS]
+    if unknown:
+        raise ValueError(
+            f'Rule {name}: unknown condition(s) {", ".join(unknown)}')
+
+    predicates = tuple(CONDITIONS[key](value) for (key, value) in spec.items())
+
+    def predicate(record: JoinedRecord) -> bool:
+        return all(test(record) for test in predicates)
+    return Rule(name, title, predicate)
+
+
+def compile_rules(specs: list[dict]) -> tuple[list[Rule], list[str]]:
+    """Return the valid rules and a message for each invalid one."""
+    rules = []
+    errors = []
+    names = set()
+    for spec in specs:
+        try:
+            rule = compile_rule(spec)
+        except (ValueError, TypeError, AttributeError) as error:
+            errors.append(str(error))
+            continue
+        if rule.name in names:
+            errors.append(f'Rule {rule.name} is declared more than once')
+            continue
+        names.add(rule.name)
+        rules.append(rule)
+    return (rules, errors)
@@ -0,0 +1,127 @@
+"""
+The layouts of membership exports, recognised by their title rows.
+
+A schema names the column that holds each Member field. The title row
+of an export is found by its EBU column and the first schema whose
+columns it has is used. The schema compiles an extractor for that title
+row, which takes just the Member fields from each row by position;
+compiled extractors are cached on the title row, so every file with
+the same layout shares one.
+
+Further layouts can be declared in the config as a list of dicts, in
+Python literal syntax and on one line, which is what the config's TOML
+parser accepts (it rejects [[schemas]] tables and inline tables), e.g.
+    schemas = [{'name': 'league', 'ebu': 'Member No', 'status': 'Status'}]
+A field without a column, here the names and bbo, is left blank.
+"""
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+
+# The Member fields in the order Member takes them
+MEMBER_ATTRIBUTES = ('ebu', 'first_name', 'last_name', 'bbo', 'status')
+
+# extract(row) returns the values of MEMBER_ATTRIBUTES
+Extractor = Callable[[list[str]], tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class Schema():
+    """The column titles of the Member fields in one export layout."""
+    name: str
+    columns: tuple[str, ...]  # in MEMBER_ATTRIBUTES order; '' if absent
+
+    @property
+    def key(self) -> str:
+        return self.columns[0]
+
+    def missing(self, title_row: list[str]) -> list[str]:
+        """Return the columns of the schema that title_row lacks."""
+        return [column for column in self.columns
+                if column and column not in title_row]
+
+    def extractor(self, title_row: list[str]) -> Extractor:
+        return _compile(self.columns, tuple(title_row))
+
+
+BUILTIN_SCHEMAS = [
+    Schema('ebu_club', ('EBU', 'FIRSTNAME', 'SURNAME', 'BBOUSERNAME',
+                        'STATUS')),
+]
+
+
+@lru_cache(maxsize=64)
+def _compile(columns: tuple[str, ...],
+             title_row: tuple[str, ...]) -> Extractor:
+    # An absent column reads a blank after the last column, so every
+    # row has to be padded; otherwise only short rows are
+    blank = len(title_row)
+    positions = [title_row.index(column) if column else blank
+                 for column in columns]
+    width = max(positions) + 1
+    getter = itemgetter(*positions)
+
+    def extract(row: list[str]) -> tuple[str, ...]:
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        return getter(row)
+    return extract
+
+
+def compile_schema(spec: dict) -> Schema:
+    """
+    Return the Schema declared in the config.
+
+    Raises ValueError if the declaration has no name or EBU column, or
+    has a key that is not a Member field.
+    """
+    spec = dict(spec)
+    name = spec.pop('name', '')
+    if not name:
+        raise ValueError(f'Schema has no name: {spec}')
+    unknown = [key for key in spec if key not in MEMBER_ATTRIBUTES]
+    if unknown:
+        raise ValueError(
+            f'Schema {name}: unknown field(s) {", ".join(unknown)}')
+    if not spec.get('ebu'):
+        raise ValueError(f'Schema {name} has no ebu column')
+    return Schema(name, tuple(str(spec.get(attribute, ''))
+                              for attribute in MEMBER_ATTRIBUTES))
+
+
+def compile_schemas(specs: list[dict]) -> tuple[list[Schema], list[str]]:
+    """Return the built-in schemas followed by the valid declared ones,
+    and a message for each invalid one."""
+    schemas = list(BUILTIN_SCHEMAS)
+    errors = []
+    for spec in specs:
+        try:
+            schemas.append(compile_schema(spec))
+        except (ValueError, TypeError, AttributeError) as error:
+            errors.append(str(error))
+    return (schemas, errors)
+
+
+def is_title_row(row: list[str], schemas: list[Schema]) -> bool:
+    return any(schema.key in row for schema in schemas)
+
+
+def match_schema(title_row: list[str],
+                 schemas: list[Schema]) -> tuple[Schema | None, list[str]]:
+    """
+    Return the first schema whose columns are all in title_row.
+
+    If there is none, return None and the columns missing for the schema
+    that comes closest.
+    """
+    missing = None
+    for schema in schemas:
+        if schema.key not in title_row:
+            continue
+        schema_missing = schema.missing(title_row)
+        if not schema_missing:
+            return (schema, [])
+        if missing is None or len(schema_missing) < len(missing):
+            missing = schema_missing
+    return (None, missing or [])
@@ -0,0 +1,66 @@
+"""In-memory search over report rows."""
+from collections import defaultdict
+
+from members_files.process import Member
+
+GRAM_LENGTH = 3
+
+
+def _grams(text: str, length: int = GRAM_LENGTH) -> set[str]:
+    return {text[index:index+length]
+            for index in range(len(text) - length + 1)}
+
+
+class SearchIndex():
+    """
+    Find rows by EBU number, name or BBO username as the user types.
+
+    A word matches a row if it is a substring of one of the row's
+    fields, whatever its length, so the results only narrow as the user
+    types. Each row is indexed once by the trigrams of its fields and by
+    every shorter substring. A word of three or more characters is
+    answered by intersecting trigram postings and checking the few
+    remaining rows; a shorter one is looked up directly. Multiple words
+    must all match.
+    """
+    def __init__(self, rows: dict[str, Member]) -> None:
+        self.text = {}
+        self.grams = defaultdict(set)
+        self.short = defaultdict(set)  # substrings shorter than a gram
+        for key, member in rows.items():
+            fields = [member.ebu, member.first_name, member.last_name,
+                      member.bbo]
+            fields = [field.lower() for field in fields if field]
+            self.text[key] = '\x00'.join(fields)
+            for field in fields:
+                for gram in _grams(field):
+                    self.grams[gram].add(key)
+                for length in range(1, GRAM_LENGTH):
+                    for gram in _grams(field, length):
+                        self.short[gram].add(key)
+
+    def search(self, query: str) -> set[str]:
+        """Return the keys of rows matching every word in query."""
+        matches = None
+        for term in query.lower().split():
+            keys = self._search_term(term)
+            matches = keys if matches is None else matches & keys
+            if not matches:
+                return set()
+        if matches is None:
+            return set(self.text)
+        return matches
+
+    def _search_term(self, term: str) -> set[str]:
+        if len(term) < GRAM_LENGTH:
+            return set(self.short.get(term, ()))
+
+        postings = sorted(
+            (self.grams.get(gram, set()) for gram in _grams(term)),
+            key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+        return {key for key in candidates if term in self.text[key]}
@@ -0,0 +1,287 @@
+"""
+Publish the indexes of a comparison in shared memory for worker processes.
+
+A process pool given a Compare would pickle its dictionaries into every
+worker. Instead the membership, bbo_names and include indexes are
+written once into a `multiprocessing.shared_memory` block; workers
+attach to it by name and read the arrays in place, so memory does not
+grow with the number of workers.
+
+The block holds a 4 byte length and a JSON header giving the offset of
+each array, then the arrays, each aligned to 8 bytes and in native byte
+order:
+
+- a member index is a sorted array of EBU numbers (uint64) and, for the
+  other Member fields, a string column each;
+- the include index is a string column of the sorted usernames and an
+  array of their bitmasks (uint64);
+- a string column is an array of n + 1 offsets (uint64) into a blob of
+  the utf8 strings.
+"""
+import json
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from itertools import repeat
+from multiprocessing import shared_memory
+
+from members_files.bulk_lookup import BulkLookup
+from members_files.process import Compare, Member
+
+ALIGN = 8
+HEADER_LENGTH = struct.Struct('<I')
+MEMBER_COLUMNS = ('first_name', 'last_name', 'bbo', 'status')
+INDEXES = ('members_ebu', 'members_bbo')
+
+
+class _Strings(Sequence):
+    """A string column read in place."""
+    def __init__(self, offsets: memoryview, blob: memoryview) -> None:
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]],
+                   'utf8')
+
+
+class SharedMembers(Mapping):
+    """A read only dict of Member keyed on EBU number, in EBU order."""
+    def __init__(self, ebus: memoryview, columns: list[_Strings]) -> None:
+        self.ebus = ebus
+        self.columns = columns
+
+    def _index(self, ebu: object) -> int:
+        """Return the position of ebu, or -1 if it is not present."""
+        if not (isinstance(ebu, str) and ebu.isascii() and ebu.isdigit()
+                and ebu == str(int(ebu))):
+            return -1
+        number = int(ebu)
+        index = bisect_left(self.ebus, number)
+        if index < len(self.ebus) and self.ebus[index] == number:
+            return index
+        return -1
+
+    def __getitem__(self, ebu: str) -> Member:
+        index = self._index(ebu)
+        if index < 0:
+            raise KeyError(ebu)
+        return Member(ebu, *(column[index] for column in self.columns))
+
+    def __contains__(self, ebu: object) -> bool:
+        return self._index(ebu) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (str(ebu) for ebu in self.ebus)
+
+    def __len__(self) -> int:
+        return len(self.ebus)
+
+
+class SharedInclude(Mapping):
+    """A read only dict of include file bitmask keyed on username."""
+    def __init__(self, names: _Strings, masks: memoryview) -> None:
+        self.names = names
+        self.masks = masks
+
+    def _index(self, name: object) -> int:
+        if not isinstance(name, str):
+            return -1
+        index = bisect_left(self.names, name)
+        if index < len(self.names) and self.names[index] == name:
+            return index
+        return -1
+
+    def __getitem__(self, name: str) -> int:
+        index = self._index(name)
+        if index < 0:
+            raise KeyError(name)
+        return self.masks[index]
+
+    def __contains__(self, name: object) -> bool:
+        return self._index(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class SharedIndexes():
+    """
+    The members_ebu, members_bbo and include_index of a comparison in
+    shared memory.
+
+    Create them with `publish` in one process and `attach` to them by
+    `name` in others. They have the attributes that read-only queries
+    use from a Compare, and `bulk_lookup` indexes their usernames for
+    `daemon.lookup` once in each process. The publisher should `close`
+    them last, which frees the memory.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory,
+                 owner: bool = False) -> None:
+        self.shm = shm
+        self.name = shm.name
+        self.owner = owner
+        self._views = []
+        (length,) = HEADER_LENGTH.unpack_from(shm.buf)
+        header = json.loads(bytes(
+            shm.buf[HEADER_LENGTH.size:HEADER_LENGTH.size + length]))
+        self._start = _padded(HEADER_LENGTH.size + length)
+        self.include_paths = header['include_paths']
+        arrays = header['arrays']
+        for name in INDEXES:
+            setattr(self, name, SharedMembers(
+                self._array(arrays[f'{name}.ebu']),
+                [self._strings(arrays, f'{name}.{column}')
+                 for column in MEMBER_COLUMNS]))
+        self.include_index = SharedInclude(
+            self._strings(arrays, 'include.names'),
+            self._array(arrays['include.masks']))
+
+    @classmethod
+    def publish(cls, comparison: Compare) -> 'SharedIndexes':
+        """Copy the indexes of comparison into a new shared block."""
+        arrays = {}
+        for name in INDEXES:
+            members = sorted(getattr(comparison, name).values(),
+                             key=lambda member: int(member.ebu))
+            arrays[f'{name}.ebu'] = _uint64(
+                int(member.ebu) for member in members)
+            for column in MEMBER_COLUMNS:
+                _add_strings(arrays, f'{name}.{column}',
+                             [getattr(member, column) for member in members])
+        include = sorted(comparison.include_index.items())
+        _add_strings(arrays, 'include.names', [name for (name, _) in include])
+        arrays['include.masks'] = _uint64(mask for (_, mask) in include)
+
+        # Offsets are from the first array, which follows the header
+        layout = {}
+        size = 0
+        for (name, data) in arrays.items():
+            layout[name] = (size, len(data))
+            size += _padded(len(data))
+        header = json.dumps({
+            'include_paths': list(comparison.include_paths),
+            'arrays': layout,
+        }).encode('utf8')
+        start = _padded(HEADER_LENGTH.size + len(header))
+
+        shm = shared_memory.SharedMemory(create=True, size=start + size + 1)
+        HEADER_LENGTH.pack_into(shm.buf, 0, len(header))
+        shm.buf[HEADER_LENGTH.size:HEADER_LENGTH.size + len(header)] = header
+        for (name, data) in arrays.items():
+            offset = start + layout[name][0]
+            shm.buf[offset:offset + len(data)] = data
+        return cls(shm, owner=True)
+
+    @cached_property
+    def bulk_lookup(self) -> BulkLookup:
+        return BulkLookup(self)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedIndexes':
+        """Return the indexes published under name."""
+        return cls(_attach(name))
+
+    def close(self) -> None:
+        """Detach, and free the block if this process published it."""
+        for view in self._views:
+            view.release()
+        self._views = []
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> 'SharedIndexes':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _view(self, location: list[int]) -> memoryview:
+        (offset, size) = location
+        offset += self._start
+        view = self.shm.buf[offset:offset + size]
+        self._views.append(view)
+        return view
+
+    def _array(self, location: list[int]) -> memoryview:
+        view = self._view(location)
+        array_view = view.cast('Q')
+        # Released before the view it was cast from
+        self._views.insert(0, array_view)
+        return array_view
+
+    def _strings(self, arrays: dict, name: str) -> _Strings:
+        return _Strings(self._array(arrays[f'{name}.offsets']),
+                        self._view(arrays[f'{name}.blob']))
+
+
+def map_in_workers(function: Callable[[SharedIndexes, object], object],
+                   items: list, indexes: SharedIndexes,
+                   processes: int | None = None) -> list:
+    """
+    Return function(indexes, item) for each item, run in a process pool.
+
+    Each worker attaches to the indexes once; only the name of the block
+    is sent to it. function must be defined at the top level of a module
+    so that it can be pickled.
+    """
+    with ProcessPoolExecutor(max_workers=processes,
+                             initializer=_attach_worker,
+                             initargs=(indexes.name,)) as pool:
+        return list(pool.map(_call, repeat(function), items))
+
+
+_worker_indexes = None  # the indexes attached to in a worker process
+
+
+def _attach_worker(name: str) -> None:
+    global _worker_indexes  # pylint: disable=global-statement
+    _worker_indexes = SharedIndexes.attach(name)
+
+
+def _call(function: Callable, item: object) -> object:
+    return function(_worker_indexes, item)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block without letting this process free it on exit."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Before Python 3.13 the block is always tracked, but the workers
+        # of map_in_workers share the publisher's resource tracker, which
+        # frees it only if the publisher does not
+        return shared_memory.SharedMemory(name)
+
+
+def _uint64(values: Iterator[int]) -> bytes:
+    try:
+        return array('Q', values).tobytes()
+    except OverflowError as error:
+        raise ValueError(f'Value too large to share: {error}') from error
+
+
+def _add_strings(arrays: dict, name: str, strings: list[str]) -> None:
+    offsets = array('Q', [0])
+    blob = bytearray()
+    for string in strings:
+        blob += string.encode('utf8')
+        offsets.append(len(blob))
+    arrays[f'{name}.offsets'] = offsets.tobytes()
+    arrays[f'{name}.blob'] = bytes(blob)
+
+
+def _padded(size: int) -> int:
+    return size + -size % ALIGN
@@ -0,0 +1,46 @@
+"""Presorted column orders for report rows."""
+from members_files.process import Member
+
+
+def _ebu_key(member: Member) -> tuple:
+    # Numeric EBU numbers first, in numeric order, then anything else
+    if member.ebu.isdigit():
+        return (0, int(member.ebu), '')
+    return (1, 0, member.ebu)
+
+
+def _name_key(member: Member) -> tuple:
+    return (member.last_name.lower(), member.first_name.lower(), member.ebu)
+
+
+def _username_key(member: Member) -> tuple:
+    return (member.bbo.lower(), member.ebu)
+
+
+SORT_KEYS = {
+    'ebu': _ebu_key,
+    'name': _name_key,
+    'username': _username_key,
+}
+
+
+class SortIndex():
+    """
+    Row keys in sorted order for each report column.
+
+    The orders are computed once from the result model, so re-sorting a
+    view only needs the precomputed list (reversed if required) rather
+    than reading and comparing the cells held by the widget.
+    """
+    def __init__(self, rows: dict[str, Member]) -> None:
+        self.orders = {
+            column: sorted(rows, key=lambda row, key=key: key(rows[row]))
+            for (column, key) in SORT_KEYS.items()
+        }
+
+    def order(self, column: str, reverse: bool = False) -> list[str]:
+        """Return the row keys sorted by column."""
+        keys = self.orders[column]
+        if reverse:
+            return keys[::-1]
+        return keys
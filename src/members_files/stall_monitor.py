@@ -0,0 +1,120 @@
+"""
+Watch the Tk main loop for stalls.
+
+A callback is scheduled with `after()` every `interval_ms`; the delay
+between when it was due and when it ran is the main loop's latency. A
+watcher thread samples the main thread's stack while a callback is
+overdue, so a stall is logged with where the main thread was blocked,
+not where it was when it recovered. A histogram of latencies is logged
+when the monitor stops.
+
+The monitor is opt-in: set `stall_threshold_ms` in the config.
+"""
+import sys
+import threading
+import time
+import tkinter as tk
+import traceback
+from bisect import bisect_left
+
+from members_files import logger
+
+INTERVAL_MS = 50
+# Upper bounds of the histogram buckets; the last bucket is open ended
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class StallMonitor():
+    """Log stalls of a Tk root's main loop longer than threshold_ms."""
+    def __init__(self, root: object, threshold_ms: int,
+                 interval_ms: int = INTERVAL_MS) -> None:
+        self.root = root
+        self.threshold = threshold_ms / 1000
+        self.interval_ms = interval_ms
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.stalls = 0
+        self.worst_ms = 0.0
+        self._main_thread = threading.get_ident()
+        self._due = None  # when the next callback should run
+        self._sample = None  # main thread stack taken during a stall
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._after_id = None
+        self._watcher = None
+
+    def start(self) -> 'StallMonitor':
+        self._schedule(time.perf_counter())
+        self._watcher = threading.Thread(
+            target=self._watch, name='stall-monitor', daemon=True)
+        self._watcher.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching and log the latency histogram."""
+        self._stopped.set()
+        if self._after_id:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass  # the root has already been destroyed
+            self._after_id = None
+        logger.info('Main loop latency', stalls=self.stalls,
+                    worst_ms=round(self.worst_ms),
+                    histogram=self.histogram_text())
+
+    def _schedule(self, now: float) -> None:
+        with self._lock:
+            self._due = now + self.interval_ms / 1000
+            self._sample = None
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            latency = max(now - self._due, 0.0)
+            sample = self._sample
+        self.record(latency * 1000, sample)
+        if not self._stopped.is_set():
+            self._schedule(now)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval_ms / 1000):
+            self.check(time.perf_counter())
+
+    def check(self, now: float) -> None:
+        """Sample the main thread's stack if the callback is overdue."""
+        with self._lock:
+            if (self._due is None or self._sample is not None
+                    or now - self._due < self.threshold):
+                return
+        frame = sys._current_frames().get(self._main_thread)
+        if frame is None:
+            return
+        sample = ''.join(traceback.format_stack(frame))
+        with self._lock:
+            self._sample = sample
+
+    def record(self, latency_ms: float, sample: str | None = None) -> None:
+        """Add a latency to the histogram and log it if it is a stall."""
+        self.histogram[bisect_left(BUCKETS_MS, latency_ms)] += 1
+        self.worst_ms = max(self.worst_ms, latency_ms)
+        if latency_ms < self.threshold * 1000:
+            return
+        self.stalls += 1
+        logger.warning('Main loop stalled', stalled_ms=round(latency_ms),
+                       stack=sample or 'not sampled')
+
+    def histogram_text(self) -> str:
+        labels = [f'<={bound}ms' for bound in BUCKETS_MS]
+        labels.append(f'>{BUCKETS_MS[-1]}ms')
+        return ', '.join(f'{label}: {count}'
+                         for (label, count) in zip(labels, self.histogram)
+                         if count)
+
+
+def start_stall_monitor(root: object,
+                        threshold_ms: int) -> StallMonitor | None:
+    """Return a running StallMonitor, or None if threshold_ms is 0."""
+    if not threshold_ms:
+        return None
+    return StallMonitor(root, threshold_ms).start()
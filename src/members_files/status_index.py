@@ -0,0 +1,81 @@
+"""
+Bitsets over the joined roster for filtering the report by status.
+
+Everyone in any of the files is given a row number. Each membership
+status, and each flag such as `has_bbo`, is an int with the bits of its
+rows set, so a filter combining them is a few bitwise operations and
+the report can change its filter without comparing the files again.
+"""
+from collections import defaultdict
+from collections.abc import Iterable
+
+from members_files.process import Member, display_record
+from members_files.rules import CONDITIONS, JoinedRecord
+
+# Conditions of the rules kept as bitsets, each for the value True
+FLAGS = ('has_member', 'has_bbo', 'in_include', 'in_main_include',
+         'in_names')
+
+
+class StatusIndex():
+    """
+    The people in a comparison, with a bitset of rows for each status
+    of the membership file and for each of FLAGS.
+
+    People who are not in the membership file have no status.
+    """
+    def __init__(self, records: Iterable[JoinedRecord]) -> None:
+        self.keys = []
+        self.members = []  # the Member shown for each row
+        status_rows = defaultdict(list)
+        flag_rows = {flag: [] for flag in FLAGS}
+        predicates = {flag: CONDITIONS[flag](True) for flag in FLAGS}
+        for (row, record) in enumerate(records):
+            self.keys.append(record.key)
+            self.members.append(display_record(record))
+            if record.member:
+                status_rows[record.member.status].append(row)
+            for (flag, predicate) in predicates.items():
+                if predicate(record):
+                    flag_rows[flag].append(row)
+
+        size = len(self.keys)
+        self.all = (1 << size) - 1
+        self.statuses = {status: _bitset(rows, size)
+                         for (status, rows) in sorted(status_rows.items())}
+        self.flags = {flag: _bitset(rows, size)
+                      for (flag, rows) in flag_rows.items()}
+
+    def status_bits(self, statuses: Iterable[str]) -> int:
+        """Return the rows with any of the statuses."""
+        bits = 0
+        for status in statuses:
+            bits |= self.statuses.get(status, 0)
+        return bits
+
+    def flag(self, name: str, value: bool = True) -> int:
+        """Return the rows for which the flag has value."""
+        bits = self.flags[name]
+        return bits if value else self.all & ~bits
+
+    def select(self, bits: int) -> dict[str, Member]:
+        """Return the rows in bits, in roster order, keyed as results."""
+        return {self.keys[row]: self.members[row] for row in _rows(bits)}
+
+    def rows(self) -> dict[str, Member]:
+        return self.select(self.all)
+
+
+def _bitset(rows: list[int], size: int) -> int:
+    """Return an int with the bits of rows set."""
+    data = bytearray((size + 7) // 8)
+    for row in rows:
+        data[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(data, 'little')
+
+
+def _rows(bits: int) -> list[int]:
+    """Return the positions of the set bits, lowest first."""
+    # Reversed binary digits put bit 0 first
+    digits = bin(bits)[:1:-1]
+    return [row for (row, digit) in enumerate(digits) if digit == '1']
@@ -1,28 +1,11 @@
+from members_files.data_files import source_files
 
-from data_files import DataFile
-
-class StringVar():
-    def __init__(self, value: str) -> None:
-        self._value = value
-
-    def get(self) -> str:
-        return self._value
 
 class Parent():
+    """The files last chosen in the main window, without a window."""
     def __init__(self) -> None:
-        self.data_file = DataFile()
-        self.data_file.read()
-
-        member_file = ''
-        bbo_include_file = ''
-        bbo_names_file = ''
-        if 'member_file' in self.data_file.content:
-            member_file = self.data_file.content['member_file']
-        if 'bbo_include_file' in self.data_file.content:
-            bbo_include_file = self.data_file.content['bbo_include_file']
-        if 'bbo_names_file' in self.data_file.content:
-            bbo_names_file = self.data_file.content['bbo_names_file']
-
-        self.member_file = StringVar(value=member_file)
-        self.bbo_include_file = StringVar(value=bbo_include_file)
-        self.bbo_names_file = StringVar(value=bbo_names_file)
+        sources = source_files()
+        self.member_file = sources.member_file
+        self.bbo_include_file = sources.bbo_include_file
+        self.bbo_names_file = sources.bbo_names_file
+        self.other_include_files = sources.other_include_files
@@ -14,6 +14,8 @@ from psiutils.text import Text as PsiText
 
 
 strings = {
+    'EXPORT': 'Export',
+    'LOOK_UP': 'Look up',
 }
 
 
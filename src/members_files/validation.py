@@ -0,0 +1,31 @@
+"""Validate and normalise rows read from the input files."""
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class RowError():
+    """A problem found in an input file (line 0 refers to the whole file)."""
+    path: str
+    line: int
+    message: str
+
+    def __str__(self) -> str:
+        if self.line:
+            return f'{Path(self.path).name}, line {self.line}: {self.message}'
+        return f'{Path(self.path).name}: {self.message}'
+
+
+def normalise_ebu(value: str) -> str | None:
+    """
+    Return an EBU number without spaces or leading zeros.
+
+    Returns None if value is not a whole number. A trailing '.0', as left
+    by spreadsheets that store the number as a float, is accepted.
+    """
+    value = value.strip().replace(' ', '')
+    if value.endswith('.0'):
+        value = value[:-2]
+    if not value.isascii() or not value.isdigit():
+        return None
+    return str(int(value))
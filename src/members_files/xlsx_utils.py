@@ -0,0 +1,133 @@
+"""Stream rows out of an .xlsx workbook without a spreadsheet library.
+
+An .xlsx file is a zip archive of XML parts. The first worksheet is
+parsed incrementally and each row is discarded once it has been
+yielded, so memory use does not grow with the number of rows. Only the
+shared strings table is held in memory.
+"""
+import posixpath
+import re
+import zipfile
+from collections.abc import Iterator
+from xml.etree.ElementTree import iterparse
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = ('http://schemas.openxmlformats.org/officeDocument/2006/'
+          'relationships')
+PACKAGE_REL_NS = ('http://schemas.openxmlformats.org/package/2006/'
+                  'relationships')
+
+SHEET_DATA = f'{{{MAIN_NS}}}sheetData'
+ROW = f'{{{MAIN_NS}}}row'
+CELL = f'{{{MAIN_NS}}}c'
+VALUE = f'{{{MAIN_NS}}}v'
+INLINE_STRING = f'{{{MAIN_NS}}}is'
+TEXT = f'{{{MAIN_NS}}}t'
+SHARED_STRING = f'{{{MAIN_NS}}}si'
+SHEET = f'{{{MAIN_NS}}}sheet'
+RELATIONSHIP = f'{{{PACKAGE_REL_NS}}}Relationship'
+
+DEFAULT_SHEET = 'xl/worksheets/sheet1.xml'
+CELL_REF_RE = re.compile(r'([A-Z]+)(\d+)')
+
+
+def iter_xlsx_rows(path) -> Iterator[tuple[int, list[str]]]:
+    """Yield (row number, cell values as text) for the first worksheet."""
+    with zipfile.ZipFile(path) as archive:
+        shared_strings = _shared_strings(archive)
+        with archive.open(_first_sheet(archive)) as f_sheet:
+            yield from _sheet_rows(f_sheet, shared_strings)
+
+
+def _sheet_rows(f_sheet, shared_strings: list[str]) -> Iterator[tuple]:
+    row_number = 0
+    sheet_data = None
+    for (event, element) in iterparse(f_sheet, events=('start', 'end')):
+        if event == 'start':
+            if element.tag == SHEET_DATA:
+                sheet_data = element
+            continue
+        if element.tag != ROW:
+            continue
+        row_number = int(element.get('r', row_number + 1))
+        row = []
+        for cell in element.iter(CELL):
+            column = _column_index(cell.get('r', ''), len(row))
+            if column > len(row):
+                row.extend([''] * (column - len(row)))
+            row.append(_cell_text(cell, shared_strings))
+        # Drop the parsed row so the tree never holds more than one
+        if sheet_data is not None:
+            sheet_data.clear()
+        else:
+            element.clear()
+        while row and not row[-1]:
+            row.pop()
+        yield (row_number, row)
+
+
+def _cell_text(cell, shared_strings: list[str]) -> str:
+    cell_type = cell.get('t', 'n')
+    if cell_type == 'inlineStr':
+        inline = cell.find(INLINE_STRING)
+        return '' if inline is None else _text(inline)
+    value = cell.findtext(VALUE, '')
+    if cell_type == 's' and value:
+        return shared_strings[int(value)]
+    if cell_type == 'b':
+        return 'TRUE' if value == '1' else 'FALSE'
+    if cell_type == 'n' and value.endswith('.0'):
+        # Whole numbers such as EBU numbers are often stored as floats
+        return value[:-2]
+    return value
+
+
+def _text(element) -> str:
+    """Return the text of all <t> runs inside element."""
+    return ''.join(node.text or '' for node in element.iter(TEXT))
+
+
+def _column_index(reference: str, default: int) -> int:
+    match = CELL_REF_RE.match(reference)
+    if not match:
+        return default
+    index = 0
+    for char in match.group(1):
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    try:
+        f_strings = archive.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    with f_strings:
+        for (event, element) in iterparse(f_strings, events=('end',)):
+            if element.tag == SHARED_STRING:
+                strings.append(_text(element))
+                element.clear()
+    return strings
+
+
+def _first_sheet(archive: zipfile.ZipFile) -> str:
+    """Return the archive name of the workbook's first worksheet."""
+    try:
+        with archive.open('xl/workbook.xml') as f_workbook:
+            relation = None
+            for (event, element) in iterparse(f_workbook, events=('end',)):
+                if element.tag == SHEET:
+                    relation = element.get(f'{{{REL_NS}}}id')
+                    break
+        with archive.open('xl/_rels/workbook.xml.rels') as f_rels:
+            for (event, element) in iterparse(f_rels, events=('end',)):
+                if (element.tag == RELATIONSHIP
+                        and element.get('Id') == relation):
+                    target = element.get('Target', '')
+                    if target.startswith('/'):
+                        return target[1:]
+                    return posixpath.normpath(posixpath.join('xl', target))
+    except KeyError:
+        pass
+    return DEFAULT_SHEET
@@ -0,0 +1,68 @@
+import random
+import shutil
+from pathlib import Path
+
+from benchmarks.anonymise import (
+    Pseudonyms, anonymise_lines, anonymise_members)
+from members_files.process import Compare, SourceFiles
+from members_files.rules import DEFAULT_RULES
+
+from tests.test_process import DATA_DIR
+
+MEMBERS = (
+    '"Club export, 2026"\r\n'
+    '\r\n'
+    'EBU,FIRSTNAME,SURNAME,BBOUSERNAME,STATUS\r\n'
+    '00123,Jane,"Smith, Jr",JSmith,Member\r\n'
+    'abc,Bad,Row,bad,Member\r\n'
+    '"456",Peter,"O""Brien",pjones,"Member"\r\n'
+    '789,Lapsed,Person,lapsed,Lapsed\r\n'
+    ',No,Number,nonum,Member\r\n'
+)
+
+
+def _counts(sources: SourceFiles) -> tuple:
+    comparison = Compare(sources, DEFAULT_RULES)
+    return (
+        len(comparison.members_ebu),
+        len(comparison.members_bbo),
+        {name: len(rows) for (name, rows) in comparison.results.items()},
+        len(comparison.errors),
+        len(comparison.duplicates),
+    )
+
+
+def test_anonymise_keeps_comparison(tmp_path):
+    source = Path(tmp_path, 'source')
+    output = Path(tmp_path, 'output')
+    source.mkdir()
+    output.mkdir()
+    Path(source, 'members.csv').write_bytes(MEMBERS.encode('utf8'))
+    for name in ('include.txt', 'bbo_names.txt'):
+        shutil.copy(Path(DATA_DIR, name), source)
+    sources = SourceFiles(*(str(Path(source, name)) for name in (
+        'members.csv', 'include.txt', 'bbo_names.txt')))
+    outputs = SourceFiles(*(str(Path(output, name)) for name in (
+        'members.csv', 'include.txt', 'bbo_names.txt')))
+
+    pseudonyms = Pseudonyms(random.Random(1))
+    anonymise_members(Path(sources.member_file.get()),
+                      Path(outputs.member_file.get()), pseudonyms)
+    anonymise_lines(Path(sources.bbo_include_file.get()),
+                    Path(outputs.bbo_include_file.get()), pseudonyms, False)
+    anonymise_lines(Path(sources.bbo_names_file.get()),
+                    Path(outputs.bbo_names_file.get()), pseudonyms, True)
+
+    assert _counts(outputs) == _counts(sources)
+    members = Path(outputs.member_file.get()).read_bytes()
+    assert len(members) == len(MEMBERS)
+    assert members.count(b'"') == MEMBERS.count('"')
+    assert b'Smith' not in members and b'00' in members
+
+
+def test_ebu_pseudonyms_keep_their_length():
+    pseudonyms = Pseudonyms(random.Random(0))
+    numbers = [str(number) for number in range(10, 100)]
+
+    # Every two digit number is used, so the last ones are hard to draw
+    assert sorted(pseudonyms.ebu(number) for number in numbers) == numbers
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from members_files.backups import BackupStore, apply_delta, make_delta
+
+
+def test_delta_round_trip():
+    for (base, target) in (
+            (['alf', 'bob', 'cat'], ['alf', 'ann', 'cat', 'dan']),
+            (['zed', 'alf', ''], ['alf', 'zed', 'bob', ''])):
+        assert apply_delta(base, make_delta(base, target)) == target
+    assert make_delta(['a', 'b'], ['a', 'c'])['sorted']
+
+
+def test_backup_and_restore(tmp_path):
+    path = Path(tmp_path, 'include.txt')
+    backups = Path(tmp_path, 'backups')
+    contents = [b'alf\nbob', b'alf\nbob\ncat', b'zed\r\nalf\n', b'bob']
+    for content in contents:
+        path.write_bytes(content)
+        BackupStore(path, backups, keep=3).backup()
+
+    store = BackupStore(path, backups, keep=3)
+    assert [version.id for version in store.versions] == [2, 3, 4]
+    assert store.backup() is None
+    for (version, content) in zip(store.versions, contents[1:]):
+        assert store.read(version.id) == content
+    # One full copy, the older versions as deltas, and the index
+    assert len(list(store.directory.iterdir())) == 4
+
+    store.restore(2)
+    assert path.read_bytes() == b'alf\nbob\ncat'
+    assert [version.id for version in store.versions] == [2, 3, 4]
@@ -0,0 +1,29 @@
+from members_files.bulk_lookup import BulkLookup, parse_entries
+from members_files.process import Compare
+
+from tests.test_process import Parent
+
+
+def test_parse_entries():
+    assert parse_entries('JSmith\n 456, 789;\tjsmith\n\n00123') == [
+        'JSmith', '456', '789', 'jsmith', '00123']
+
+
+def test_bulk_lookup():
+    comparison = Compare(Parent())
+    results = BulkLookup(comparison).lookup(
+        ['JSmith', '00456', 'someoneelse', 'lapsed', 'nobody'])
+
+    assert [(result.entry, result.ebu, result.name, result.status)
+            for result in results] == [
+        ('JSmith', '123', 'Jane Smith', 'Member'),
+        ('00456', '456', 'Peter Jones', 'Member'),
+        ('someoneelse', '', '', ''),
+        ('lapsed', '789', 'Lapsed Person', 'Lapsed'),
+        ('nobody', '', '', ''),
+    ]
+    assert [(result.in_names, len(result.include_files))
+            for result in results] == [
+        (True, 1), (False, 0), (False, 1), (True, 0), (False, 0)]
+    assert [result.found for result in results] == [
+        True, True, True, True, False]
@@ -1,6 +1,14 @@
+from copy import deepcopy
 from pathlib import Path
 
-from  members_files.config import read_config
+from psiconfig import TomlConfig
+
+from  members_files.config import (
+    read_config, config_error, ConfigService, DEFAULT_CONFIG)
+
+
+def read_toml(path):
+    return TomlConfig(path=path)
 
 
 def test_config_no_directory(mocker):
@@ -34,3 +42,109 @@ def test_config_save(mocker):
     config = read_config()
 
     assert config.xxx == 6
+
+
+class FakeRoot():
+    def __init__(self, geometry='500x600+10+10'):
+        self._geometry = geometry
+        self.jobs = {}
+        self.cancelled = 0
+
+    def winfo_toplevel(self):
+        return self
+
+    def nametowidget(self, name):
+        return self
+
+    def geometry(self):
+        return self._geometry
+
+    def after(self, delay, callback):
+        job = f'after#{len(self.jobs)}'
+        self.jobs[job] = callback
+        return job
+
+    def after_cancel(self, job):
+        self.cancelled += 1
+        del self.jobs[job]
+
+
+class FakeEvent():
+    def __init__(self, widget):
+        self.widget = widget
+
+
+def _service(tmp_path, text=None):
+    if text is not None:
+        Path(tmp_path, 'config.toml').write_text(text)
+    config = TomlConfig(
+        path=Path(tmp_path, 'config.toml'), defaults=deepcopy(DEFAULT_CONFIG))
+    return ConfigService(config)
+
+
+def test_config_service_tracks_changes(tmp_path):
+    service = _service(tmp_path)
+    service.update('xxx', '')
+    assert not service.dirty
+
+    service.update('xxx', 'abc')
+    assert service.changed == {'xxx'}
+    assert service.save()
+    assert not service.dirty
+    assert read_toml(service.path).xxx == 'abc'
+    assert [path.name for path in tmp_path.iterdir()] == ['config.toml']
+
+
+def test_config_service_save_unchanged_does_not_write(tmp_path):
+    service = _service(tmp_path)
+    assert service.save()
+    assert not Path(tmp_path, 'config.toml').exists()
+
+
+def test_config_service_resize_is_debounced(tmp_path):
+    service = _service(tmp_path)
+    root = FakeRoot()
+    for size in range(500, 520):
+        root._geometry = f'{size}x600+10+10'
+        service.window_resize(FakeEvent(root), 'frm_main.py')
+        service.window_resize(FakeEvent(root), 'frm_main.py')
+
+    assert len(root.jobs) == 1
+    assert not Path(tmp_path, 'config.toml').exists()
+
+    list(root.jobs.values())[0]()
+    assert read_toml(service.path).geometry['frm_main'] == '519x600+10+10'
+
+
+def test_config_service_keeps_unreadable_file(tmp_path):
+    text = "[[schemas]]\nname = 'league'\nebu = 'Member No'\n"
+    service = _service(tmp_path, text)
+    assert service.load_error
+
+    root = FakeRoot()
+    service.window_resize(FakeEvent(root), 'frm_main.py')
+    list(root.jobs.values())[0]()
+    service.update('xxx', 'abc')
+
+    assert not service.save()
+    assert Path(tmp_path, 'config.toml').read_text() == text
+
+
+def test_config_error_inline_table(tmp_path):
+    path = Path(tmp_path, 'config.toml')
+    path.write_text("schemas = [{name = 'league', ebu = 'Member No'}]\n")
+    assert 'schemas' in config_error(path)
+
+
+def test_config_documented_syntax(tmp_path):
+    text = ("rules = [{'name': 'lapsed', 'status': ['Lapsed'], "
+            "'in_names': True}]\n"
+            "schemas = [{'name': 'league', 'ebu': 'Member No', "
+            "'status': 'Status'}]\n")
+    service = _service(tmp_path, text)
+
+    assert not service.load_error
+    assert service.rules == [
+        {'name': 'lapsed', 'status': ['Lapsed'], 'in_names': True}]
+    assert service.schemas[0]['ebu'] == 'Member No'
+    assert config_error(Path(tmp_path, 'missing.toml')) == ''
@@ -0,0 +1,38 @@
+import gzip
+import zipfile
+from pathlib import Path
+
+from members_files.csv_utils import get_records_from_csv_file
+
+CSV_TEXT = 'Export\nEBU,SURNAME\n1,Bront\xeb\n2,"Smith, Jr"\n'
+
+
+def _records(path):
+    (records, fieldnames) = get_records_from_csv_file(path, 'EBU')
+    return ([(line, item['SURNAME']) for (line, item) in records],
+            fieldnames)
+
+
+def test_read_plain_windows_1252(tmp_path):
+    path = Path(tmp_path, 'members.csv')
+    path.write_bytes(CSV_TEXT.encode('Windows-1252'))
+
+    assert _records(path) == (
+        [(3, 'Bront\xeb'), (4, 'Smith Jr')], ['EBU', 'SURNAME'])
+
+
+def test_read_gzip(tmp_path):
+    path = Path(tmp_path, 'members.csv.gz')
+    path.write_bytes(gzip.compress(CSV_TEXT.encode('Windows-1252')))
+
+    assert _records(path) == (
+        [(3, 'Bront\xeb'), (4, 'Smith Jr')], ['EBU', 'SURNAME'])
+
+
+def test_read_zip_picks_csv_member(tmp_path):
+    path = Path(tmp_path, 'members.zip')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('readme.txt', 'not this one')
+        archive.writestr('export/members.csv', CSV_TEXT.encode('utf8'))
+
+    assert _records(path)[0] == [(3, 'Bront\xeb'), (4, 'Smith Jr')]
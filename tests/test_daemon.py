@@ -0,0 +1,87 @@
+import shutil
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from members_files.daemon import (ComparisonCache, ComparisonService,
+                                  request)
+from members_files.process import SourceFiles
+from members_files.rules import DEFAULT_RULES
+
+DATA_DIR = Path(Path(__file__).parent, 'test_data', 'compare')
+
+
+@pytest.fixture
+def service(tmp_path):
+    for name in ('members.csv', 'include.txt', 'bbo_names.txt'):
+        shutil.copy(Path(DATA_DIR, name), tmp_path)
+    sources = SourceFiles(
+        str(Path(tmp_path, 'members.csv')),
+        str(Path(tmp_path, 'include.txt')),
+        str(Path(tmp_path, 'bbo_names.txt')),
+    )
+    config = SimpleNamespace(
+        rules=DEFAULT_RULES, schemas=[], memory_budget_mb=0)
+    service = ComparisonService(
+        Path(tmp_path, 'test.sock'), ComparisonCache(lambda: sources, config))
+    thread = threading.Thread(target=service.serve_forever, daemon=True)
+    thread.start()
+    while service.server is None or not service.path.exists():
+        time.sleep(0.01)
+    yield service
+    request('stop', service.path)
+    thread.join(5)
+
+
+def test_report(service):
+    response = request('report', service.path)
+
+    assert response['ok']
+    assert [item['ebu'] for item in response['missing_from_include']] == [
+        '456']
+    assert len(response['errors']) == 3
+    # Configured rules are evaluated
+    assert [item['bbo'] for item in response['results'][
+        'include_without_member']] == ['someoneelse']
+
+
+def test_lookup(service):
+    response = request('lookup', service.path, query='JSmith')
+
+    assert response['results'] == [{
+        'ebu': '123',
+        'member': {'ebu': '123', 'first_name': 'Jane', 'last_name': 'Smith',
+                   'bbo': 'jsmith', 'status': 'Member'},
+        'bbo_names': {'ebu': '123', 'first_name': 'Jane',
+                      'last_name': 'Smith', 'bbo': 'jsmith', 'status': ''},
+        'in_include': True,
+        'include_files': [service.cache.sources().bbo_include_file.get()],
+    }]
+
+
+def test_lookup_needs_a_string(service):
+    response = request('lookup', service.path, query=123)
+
+    assert not response['ok']
+    assert 'string' in response['error']
+
+
+def test_changed_file_is_reread(service):
+    first = service.cache.get()
+    index = service.cache.get_lookup()
+    assert service.cache.get() is first
+    assert service.cache.get_lookup() is index
+
+    include = Path(service.cache.sources().bbo_include_file.get())
+    include.write_text('jsmith\npjones\nextra')
+    response = request('report', service.path)
+
+    assert response['missing_from_include'] == []
+    assert service.cache.get() is not first
+    assert service.cache.get_lookup().comparison is service.cache.get()
+    # Only the include file and what depends on it were read again
+    assert {timing['name'] for timing in response['timings']
+            if not timing['cached']} == {'include', 'joined', 'compare'}
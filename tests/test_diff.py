@@ -0,0 +1,41 @@
+import os
+from pathlib import Path
+
+from members_files.diff import (
+    LineDiff, file_diff, sorted_diff, write_lines_if_changed)
+
+
+def test_sorted_diff():
+    diff = sorted_diff(['a', 'b', 'b', 'd'], ['a', 'b', 'c', 'd', 'e'])
+
+    assert diff.added == ['c', 'e']
+    assert diff.removed == ['b']
+    assert '+ c' in diff.summary()
+    assert not sorted_diff(['a'], ['a']).changed
+
+
+def test_file_diff_unsorted_file(tmp_path):
+    path = Path(tmp_path, 'include.txt')
+    path.write_text('zed\nalf\n\n', encoding='utf8')
+
+    assert not file_diff(path, ['alf', 'zed']).changed
+    assert file_diff(Path(tmp_path, 'missing.txt'), ['alf']).added == ['alf']
+
+
+def test_write_lines_if_changed(tmp_path):
+    path = Path(tmp_path, 'include.txt')
+    path.write_text('alf\nbob', encoding='utf8')
+    os.utime(path, ns=(0, 0))
+
+    assert not write_lines_if_changed(path, ['alf', 'bob'])
+    assert path.stat().st_mtime_ns == 0
+
+    assert write_lines_if_changed(path, ['alf', 'cat'])
+    assert path.read_text(encoding='utf8') == 'alf\ncat'
+    assert list(tmp_path.iterdir()) == [path]
+
+    # A diff taken earlier is used as it is
+    diff = file_diff(path, ['alf', 'dan'])
+    assert not write_lines_if_changed(path, ['alf', 'dan'], diff=LineDiff())
+    assert write_lines_if_changed(path, ['alf', 'dan'], diff=diff)
+    assert path.read_text(encoding='utf8') == 'alf\ndan'
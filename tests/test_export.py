@@ -0,0 +1,57 @@
+import csv
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from members_files.export import export_comparison
+from members_files.process import Compare
+from members_files.xlsx_utils import iter_xlsx_rows
+
+from tests.test_process import Parent
+
+
+def test_export_csv(tmp_path):
+    path = Path(tmp_path, 'report.csv')
+    export_comparison(Compare(Parent()), path)
+
+    with open(path, newline='', encoding='utf8') as f_csv:
+        rows = list(csv.reader(f_csv))
+    assert rows[0] == ['Section', 'EBU', 'First name', 'Last name',
+                       'BBO username', 'Status']
+    assert rows[1:] == [
+        ['Missing from include', '456', 'Peter', 'Jones', 'pjones',
+         'Member'],
+        ['Missing from bbo_names', '456', 'Peter', 'Jones', 'pjones',
+         'Member'],
+    ]
+
+
+def test_export_xlsx(tmp_path):
+    path = Path(tmp_path, 'report.xlsx')
+    export_comparison(Compare(Parent()), path)
+
+    rows = [row for (line, row) in iter_xlsx_rows(path)]
+    assert rows == [
+        ['EBU', 'First name', 'Last name', 'BBO username', 'Status'],
+        ['456', 'Peter', 'Jones', 'pjones', 'Member'],
+    ]
+    with zipfile.ZipFile(path) as archive:
+        assert 'xl/worksheets/sheet3.xml' in archive.namelist()
+
+
+def test_export_html(tmp_path):
+    path = Path(tmp_path, 'report.html')
+    comparison = Compare(Parent())
+    comparison.results['missing_from_bbo']['456'].last_name = 'Jones <&>'
+    export_comparison(comparison, path)
+
+    page = path.read_text(encoding='utf8')
+    assert '<h2>Missing from bbo_names (1)</h2>' in page
+    assert '<td>Jones &lt;&amp;&gt;</td>' in page
+
+
+def test_export_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_comparison(Compare(Parent()), Path(tmp_path, 'report.pdf'))
+    assert not list(tmp_path.iterdir())
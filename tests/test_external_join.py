@@ -0,0 +1,102 @@
+from pathlib import Path
+
+from members_files.external_join import ExternalCompare, get_comparison
+from members_files.process import Compare, SourceFiles
+from members_files.rules import DEFAULT_RULES
+
+from tests.test_process import Parent
+
+
+def _write_sources(directory: Path) -> SourceFiles:
+    members = ['EBU,FIRSTNAME,SURNAME,BBOUSERNAME,STATUS']
+    names = []
+    include = []
+    for index in range(200):
+        status = 'Lapsed' if index % 7 == 0 else 'Member'
+        bbo = f'user{index}' if index % 5 else ''
+        members.append(f'{1000 + index},First{index},Last{index},'
+                       f'{bbo},{status}')
+        if index % 3:
+            names.append(f'user{index},First{index},Last{index},'
+                         f'{1000 + index}')
+        if index % 4:
+            include.append(f'user{index}')
+    members.append('1010,Dup,Member,dup,Member')
+    members.append('12x,Bad,Number,bad,Member')
+    names.append('extra,Only,Names,5000')
+    names.append('user1,Again,Names,1001')
+    names.append('short,line')
+    include += ['nobody', 'NOBODY', '', 'user8']
+
+    paths = []
+    for (name, lines) in (('members.csv', members),
+                          ('include.txt', include),
+                          ('bbo_names.txt', names)):
+        path = Path(directory, name)
+        path.write_text('\n'.join(lines) + '\n', encoding='utf8')
+        paths.append(str(path))
+    return SourceFiles(*paths)
+
+
+def _summary(comparison: Compare) -> tuple:
+    return (
+        {name: list(result.items())
+         for (name, result) in comparison.results.items()},
+        comparison.errors,
+        comparison.duplicates,
+    )
+
+
+def test_external_compare_matches_in_memory(tmp_path):
+    sources = _write_sources(tmp_path)
+
+    expected = _summary(Compare(sources, DEFAULT_RULES))
+    comparison = ExternalCompare(sources, DEFAULT_RULES, partitions=5,
+                                 directory=str(tmp_path))
+
+    assert comparison.external
+    assert _summary(comparison) == expected
+    assert not list(tmp_path.glob('members_files-*'))
+
+
+def test_records_without_username_are_spread(tmp_path):
+    sources = _write_sources(tmp_path)
+    counts = []  # records without a username in each partition
+
+    class Recording(ExternalCompare):
+        def _join_on_username(self, joined, include, results):
+            joined = list(joined)
+            counts.append(sum(1 for record in joined if not record[-1]))
+            super()._join_on_username(joined, include, results)
+
+    comparison = Recording(sources, DEFAULT_RULES, partitions=5)
+
+    assert _summary(comparison) == _summary(Compare(sources, DEFAULT_RULES))
+    assert sum(counts) > 1
+    assert max(counts) < sum(counts)
+
+
+def test_undecodable_names_line(tmp_path):
+    sources = _write_sources(tmp_path)
+    Path(sources.bbo_names_file.get()).write_bytes(
+        b'user1,A,A,1001\nuser2,B,\xe9B,1002\nuser3,C,C,1003\n')
+
+    expected = _summary(Compare(sources, DEFAULT_RULES))
+    comparison = ExternalCompare(sources, DEFAULT_RULES, partitions=3,
+                                 directory=str(tmp_path))
+
+    assert _summary(comparison) == expected
+    assert '1002' in comparison.missing_from_bbo
+    assert '1001' not in comparison.missing_from_bbo
+
+
+def test_external_compare_test_data():
+    expected = _summary(Compare(Parent()))
+
+    assert _summary(ExternalCompare(Parent(), partitions=3)) == expected
+
+
+def test_get_comparison_budget():
+    assert not get_comparison(Parent()).external
+    assert not get_comparison(Parent(), memory_budget_mb=100).external
+    assert get_comparison(Parent(), memory_budget_mb=1e-6).external
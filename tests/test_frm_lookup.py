@@ -0,0 +1,36 @@
+import tkinter as tk
+
+import pytest
+
+from members_files.process import Compare
+
+from tests.test_process import Parent
+
+# psiutils needs Pillow and python-dateutil
+frm_lookup = pytest.importorskip('members_files.forms.frm_lookup')
+
+
+@pytest.fixture
+def parent(monkeypatch):
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip('No display')
+    monkeypatch.setattr(frm_lookup.config_service, 'window_resize',
+                        lambda *args: None)
+    parent = Parent()
+    parent.root = root
+    yield parent
+    root.destroy()
+
+
+def test_lookup_reuses_parent_pipeline(parent):
+    parent.pipeline = Compare(
+        parent, frm_lookup.config_service.rules,
+        schemas=frm_lookup.config_service.schemas).pipeline
+
+    lookup = frm_lookup.LookupFrame(parent, ['jsmith'])
+
+    assert all(timing.cached for timing in lookup.comparison.timings
+               if timing.name in ('members', 'include', 'bbo_names'))
+    assert lookup.summary.get() == '1 entries, 0 not found'
@@ -0,0 +1,83 @@
+import tkinter as tk
+from pathlib import Path
+
+import pytest
+
+from members_files.include_upload import UploadError
+
+from tests.test_process import Parent
+
+# psiutils needs Pillow and python-dateutil
+frm_report = pytest.importorskip('members_files.forms.frm_report')
+
+
+@pytest.fixture
+def report(monkeypatch):
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip('No display')
+    monkeypatch.setattr(frm_report.config_service, 'window_resize',
+                        lambda *args: None)
+    parent = Parent()
+    parent.root = root
+    yield frm_report.ReportFrame(parent)
+    root.destroy()
+
+
+def test_search_then_repopulate(report):
+    rows = {tree: tree.get_children() for tree in report.tree_rows}
+    report.search.set('no such name')
+    assert not any(tree.get_children() for tree in report.tree_rows)
+
+    # The rows hidden by the search are replaced, not inserted again
+    report._populate_include_tree()
+    report._populate_names_tree()
+    report._populate_rule_trees()
+    report.search.set('')
+
+    assert {tree: tree.get_children() for tree in report.tree_rows} == rows
+
+
+def test_copy_disabled_while_filtered(report):
+    assert str(report.copy_include_button.state()) == tk.NORMAL
+
+    report.status_filter['Lapsed'].set(True)
+    assert str(report.copy_include_button.state()) == tk.DISABLED
+    assert str(report.copy_bbo_button.state()) == tk.DISABLED
+
+    report.status_filter['Lapsed'].set(False)
+    assert str(report.copy_include_button.state()) == tk.NORMAL
+
+
+class FailedUpload():
+    done = True
+    result = None
+    error = UploadError('Upload refused: 401 Unauthorized')
+
+    def __init__(self, *args):
+        pass
+
+    def start(self):
+        return self
+
+
+def test_failed_upload_leaves_include_file(report, monkeypatch):
+    path = Path(report.parent.bbo_include_file.get())
+    text = path.read_text()
+    errors = []
+    monkeypatch.setattr(report.config, 'upload_url', 'http://127.0.0.1/',
+                        raising=False)
+    monkeypatch.setattr(frm_report, 'BackgroundUpload', FailedUpload)
+    monkeypatch.setattr(frm_report.messagebox, 'askyesno',
+                        lambda *args, **kwargs: True)
+    monkeypatch.setattr(frm_report.messagebox, 'showerror',
+                        lambda *args, **kwargs: errors.append(args))
+
+    report._copy_include()
+    while report.upload:
+        report.root.update()
+
+    assert errors
+    assert path.read_text() == text
+    assert str(report.copy_include_button.state()) == tk.NORMAL
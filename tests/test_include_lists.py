@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from members_files.external_join import ExternalCompare
+from members_files.include_lists import merge_include_files
+from members_files.process import Compare, SourceFiles
+
+from tests.test_process import DATA_DIR
+
+
+def _write(directory, name, text):
+    path = Path(directory, name)
+    path.write_text(text, encoding='utf8')
+    return str(path)
+
+
+def test_merge_include_files(tmp_path):
+    paths = [_write(tmp_path, 'one.txt', 'Zed\nalf\nalf\n'),
+             _write(tmp_path, 'two.txt', 'bob\nzed\n'),
+             str(Path(tmp_path, 'missing.txt'))]
+    errors = []
+
+    assert list(merge_include_files(paths, errors)) == [
+        ('alf', 0b01), ('bob', 0b10), ('zed', 0b11)]
+    assert [error.path for error in errors] == [paths[2]]
+
+
+def test_compare_reports_each_include_file(tmp_path):
+    other = _write(tmp_path, 'other.txt', 'pjones\n')
+    sources = SourceFiles(
+        str(Path(DATA_DIR, 'members.csv')),
+        str(Path(DATA_DIR, 'include.txt')),
+        str(Path(DATA_DIR, 'bbo_names.txt')),
+        [other],
+    )
+
+    comparison = Compare(sources)
+
+    # Only the main include file counts for the built-in result
+    assert list(comparison.missing_from_include) == ['456']
+    assert list(comparison.results['missing_from_include_1']) == ['456']
+    assert list(comparison.results['missing_from_include_2']) == ['123']
+    assert (ExternalCompare(sources, partitions=3).results
+            == comparison.results)
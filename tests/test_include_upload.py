@@ -0,0 +1,101 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from members_files.diff import sorted_diff
+from members_files.include_upload import (
+    BackgroundUpload, IncludeUploader, RateLimiter, StandInServer,
+    UploadError, delta_batches)
+
+
+@pytest.fixture
+def server():
+    server = StandInServer(names=['alice', 'bob', 'carol'], token='secret')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(5)
+
+
+def test_delta_batches():
+    diff = sorted_diff(['a', 'b', 'c'], ['b', 'd', 'e'])
+
+    assert delta_batches(diff, 2) == [
+        {'add': ['d', 'e'], 'remove': []},
+        {'add': [], 'remove': ['a', 'c']},
+    ]
+
+
+def test_upload(server):
+    old = sorted(server.names)
+    new = ['alice', 'dave', 'erin', 'frank']
+    sleeps = []
+    with IncludeUploader(server.url, 'secret', batch_size=2,
+                         sleep=sleeps.append) as uploader:
+        result = uploader.upload(sorted_diff(old, new))
+
+    assert server.names == set(new)
+    assert (result.added, result.removed, result.requests) == (3, 2, 3)
+    assert server.connections == 1
+    assert len(sleeps) == 2  # rate limited between the batches
+
+
+def test_upload_retries(server):
+    server.failures = 2
+    with IncludeUploader(server.url, 'secret',
+                         sleep=lambda seconds: None) as uploader:
+        result = uploader.upload(sorted_diff(['alice'], ['alice', 'zoe']))
+
+    assert result.requests == 3
+    assert 'zoe' in server.names
+
+
+def test_upload_refused(server):
+    with IncludeUploader(server.url, 'wrong',
+                         sleep=lambda seconds: None) as uploader:
+        with pytest.raises(UploadError):
+            uploader.upload(sorted_diff([], ['zoe']))
+
+    assert server.requests == 1
+    assert 'zoe' not in server.names
+
+
+def test_rate_limiter():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.wait()
+
+    assert sleeps == [0.25, 0.25]
+
+
+def test_background_upload(server):
+    config = SimpleNamespace(
+        upload_url=server.url, upload_token='secret', upload_batch_size=2,
+        upload_requests_per_second=0)
+    upload = BackgroundUpload(
+        sorted_diff(['alice'], ['alice', 'zoe']), config).start()
+
+    assert upload.wait(5)
+    assert (upload.error, upload.result.added) == (None, 1)
+    assert 'zoe' in server.names
+
+
+def test_background_upload_failure(server):
+    config = SimpleNamespace(
+        upload_url=server.url, upload_token='wrong', upload_batch_size=2,
+        upload_requests_per_second=0)
+    upload = BackgroundUpload(sorted_diff([], ['zoe']), config).start()
+
+    assert upload.wait(5)
+    assert isinstance(upload.error, UploadError)
+    assert upload.result is None
@@ -0,0 +1,50 @@
+from members_files.process import Member
+from members_files.matching import soundex, suggest_matches, SuggestionIndex
+
+
+def member(ebu, first, last, bbo=''):
+    return Member(ebu, first, last, bbo, 'Member')
+
+
+def test_soundex():
+    assert soundex('Robert') == 'R163'
+    assert soundex('Rupert') == 'R163'
+    assert soundex('Ashcraft') == 'A261'
+    assert soundex('Tymczak') == 'T522'
+    assert soundex('') == ''
+
+
+def test_suggest_typo_in_ebu():
+    names = {
+        '12354': member('12354', 'Jane', 'Smith', 'jsmith'),
+        '99999': member('99999', 'Peter', 'Jones', 'pjones'),
+    }
+    unmatched = {'12345': member('12345', 'Jane', 'Smith', 'jsmith')}
+
+    suggestions = suggest_matches(unmatched, names)
+
+    assert len(suggestions) == 1
+    assert suggestions[0].candidate.ebu == '12354'
+
+
+def test_suggest_misspelt_name():
+    names = {'555': member('555', 'Jon', 'Smyth', 'jonsmyth')}
+    unmatched = {'777': member('777', 'John', 'Smith', 'jonsmyth')}
+
+    suggestions = suggest_matches(unmatched, names)
+
+    assert [item.candidate.ebu for item in suggestions] == ['555']
+
+
+def test_linked_entries_are_not_suggested():
+    names = {'12354': member('12354', 'Jane', 'Smith', 'jsmith')}
+    members = {'12354': member('12354', 'Fred', 'Smith', 'fsmith')}
+    unmatched = {'12345': member('12345', 'Jane', 'Smith', 'jsmith')}
+
+    assert suggest_matches(unmatched, names, members) == []
+
+
+def test_unrelated_entries_are_not_scored():
+    index = SuggestionIndex([member('1', 'Alice', 'Brown', 'abrown')])
+
+    assert index.suggest(member('987654', 'Zoe', 'Quinn', 'zq99')) == []
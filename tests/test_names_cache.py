@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from members_files import names_cache
+from members_files.names_cache import read_bbo_names
+from members_files.process import Member, _bbo_names_fields
+
+
+def _read(path, cache_dir):
+    errors = []
+    entries = read_bbo_names(path, _bbo_names_fields, Member, errors,
+                             cache_dir=cache_dir, min_size=0)
+    return ([(line, member.ebu) for (line, member) in entries],
+            [(error.line, error.message) for error in errors])
+
+
+def test_appended_lines_are_parsed_alone(tmp_path, mocker):
+    path = Path(tmp_path, 'bbo_names.txt')
+    cache_dir = Path(tmp_path, 'cache')
+    path.write_text('alf,Alf,Able,1\nbad,line\n', encoding='utf8')
+    first = _read(path, cache_dir)
+    assert first == ([(1, '1')], [(2, 'Expected 4 fields, found 2')])
+
+    with open(path, 'a', encoding='utf8') as f_names:
+        f_names.write('bob,Bob,Baker,2\ncat,Cat,Cole,3')
+    parse = mocker.patch('members_files.names_cache._parse',
+                         wraps=names_cache._parse)
+    assert _read(path, cache_dir) == (
+        [(1, '1'), (3, '2'), (4, '3')], [(2, 'Expected 4 fields, found 2')])
+    assert [call.args[1] for call in parse.call_args_list] == [
+        b'bob,Bob,Baker,2\n', b'cat,Cat,Cole,3']
+
+
+def test_changed_prefix_is_parsed_again(tmp_path):
+    path = Path(tmp_path, 'bbo_names.txt')
+    cache_dir = Path(tmp_path, 'cache')
+    path.write_text('alf,Alf,Able,1\nbob,Bob,Baker,2\n', encoding='utf8')
+    _read(path, cache_dir)
+
+    path.write_text('alf,Alf,Able,9\nbob,Bob,Baker,2\ncat,C,C,3\n',
+                    encoding='utf8')
+    assert _read(path, cache_dir) == ([(1, '9'), (2, '2'), (3, '3')], [])
@@ -0,0 +1,51 @@
+from members_files.external_join import ExternalCompare
+from members_files.pipeline import Pipeline
+from members_files.process import FILE_STAGES, Compare
+
+from tests.test_process import Parent
+
+
+def test_only_downstream_stages_run_again():
+    keys = {'a': 1, 'b': 1}
+    runs = []
+
+    def stage(name, value):
+        def run(*inputs):
+            runs.append(name)
+            return value + sum(inputs)
+        return run
+
+    pipeline = Pipeline()
+    pipeline.define('a', stage('a', 1), key=lambda: keys['a'])
+    pipeline.define('b', stage('b', 10), key=lambda: keys['b'])
+    pipeline.define('sum', stage('sum', 0), inputs=('a', 'b'))
+    assert pipeline.run(['sum', 'a']) == [11, 1]
+    assert runs == ['a', 'b', 'sum']
+
+    runs.clear()
+    keys['b'] = 2
+    assert pipeline.is_stale('sum') and not pipeline.is_stale('a')
+    assert pipeline.get('sum') == 11
+    assert runs == ['b', 'sum']
+
+
+def test_compare_reuses_unchanged_stages():
+    first = Compare(Parent())
+    rules = [{'name': 'lapsed', 'status': 'Lapsed'}]
+    second = Compare(Parent(), rules, pipeline=first.pipeline)
+
+    assert {timing.name for timing in second.timings
+            if not timing.cached} == {'rules', 'compare'}
+    assert second.members_ebu is first.members_ebu
+    assert 'lapsed' in second.results
+
+
+def test_external_compare_drops_file_stages():
+    pipeline = Compare(Parent()).pipeline
+    external = ExternalCompare(Parent(), partitions=2, pipeline=pipeline)
+
+    assert not set(FILE_STAGES) & set(pipeline.stages)
+    assert {'rules', 'schemas'} <= set(pipeline.stages)
+
+    again = Compare(Parent(), pipeline=pipeline)
+    assert again.results == external.results
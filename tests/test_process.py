@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from members_files.process import Compare
+
+DATA_DIR = Path(Path(__file__).parent, 'test_data', 'compare')
+
+
+class Value():
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class Parent():
+    def __init__(self, member_file='members.csv',
+                 bbo_include_file='include.txt',
+                 bbo_names_file='bbo_names.txt'):
+        self.member_file = Value(str(Path(DATA_DIR, member_file)))
+        self.bbo_include_file = Value(str(Path(DATA_DIR, bbo_include_file)))
+        self.bbo_names_file = Value(str(Path(DATA_DIR, bbo_names_file)))
+
+
+def test_compare():
+    comparison = Compare(Parent())
+
+    assert sorted(comparison.members_ebu) == ['123', '456', '789']
+    assert list(comparison.missing_from_include) == ['456']
+    assert list(comparison.missing_from_bbo) == ['456']
+
+
+def test_compare_collects_errors():
+    comparison = Compare(Parent())
+
+    errors = [(Path(error.path).name, error.line)
+              for error in comparison.errors]
+    assert errors == [
+        ('members.csv', 5),
+        ('bbo_names.txt', 2),
+        ('bbo_names.txt', 3),
+    ]
+
+
+def test_compare_missing_file():
+    comparison = Compare(Parent(bbo_include_file='missing.txt'))
+
+    errors = [error for error in comparison.errors
+              if Path(error.path).name == 'missing.txt']
+    assert [error.line for error in errors] == [0]
+    assert sorted(comparison.missing_from_include) == ['123', '456']
+
+
+def test_compare_missing_member_file(capsys):
+    comparison = Compare(Parent(member_file='missing.csv'))
+
+    errors = [(error.line, error.message) for error in comparison.errors
+              if Path(error.path).name == 'missing.csv']
+    assert errors == [(0, 'File not found')]
+    assert comparison.members_ebu == {}
+    assert 'missing.csv' not in capsys.readouterr().out
+
+
+def test_compare_parallel_matches_sequential():
+    sequential = Compare(Parent(), parallel=False)
+    threaded = Compare(Parent(), parallel=True)
+
+    assert threaded.results == sequential.results
+    assert threaded.errors == sequential.errors
+    assert threaded.duplicates == sequential.duplicates
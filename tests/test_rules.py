@@ -0,0 +1,41 @@
+import pytest
+
+from members_files.process import Compare
+from members_files.rules import DEFAULT_RULES, compile_rule, compile_rules
+from tests.test_process import Parent
+
+
+def test_default_rules():
+    comparison = Compare(Parent(), DEFAULT_RULES)
+
+    assert list(comparison.results['lapsed_in_include']) == []
+    assert list(comparison.results['include_without_member']) == [
+        'bbo:someoneelse']
+    assert list(comparison.results['bbo_mismatch']) == []
+    assert list(comparison.missing_from_include) == ['456']
+
+
+def test_rule_conditions():
+    rules = [{'name': 'lapsed', 'status': 'Lapsed', 'in_names': True}]
+    comparison = Compare(Parent(), rules)
+
+    assert list(comparison.results['lapsed']) == ['789']
+
+
+def test_unknown_condition():
+    with pytest.raises(ValueError):
+        compile_rule({'name': 'bad', 'colour': 'red'})
+
+
+def test_invalid_rules_are_reported():
+    (rules, errors) = compile_rules([
+        {'name': 'one', 'in_names': False},
+        {'name': 'one', 'in_names': True},
+        {'title': 'no name'},
+    ])
+
+    assert [rule.name for rule in rules] == ['one']
+    assert len(errors) == 2
+
+    comparison = Compare(Parent(), [{'title': 'no name'}])
+    assert comparison.errors[0].line == 0
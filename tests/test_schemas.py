@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from members_files.process import Compare
+from members_files.schemas import BUILTIN_SCHEMAS, compile_schemas
+
+from tests.test_process import DATA_DIR, Parent, Value
+
+LEAGUE = {'name': 'league', 'ebu': 'Member No', 'first_name': 'Forename',
+          'last_name': 'Surname', 'status': 'Status'}
+
+
+def test_declared_schema(tmp_path):
+    path = Path(tmp_path, 'league.csv')
+    path.write_text('Status,Surname,Member No,Forename\n'
+                    'Member,Smith,123,Jane\n'
+                    'Member,Jones,456\n')
+    parent = Parent()
+    parent.member_file = Value(str(path))
+
+    comparison = Compare(parent, schemas=[LEAGUE])
+
+    assert [error for error in comparison.errors
+            if error.path == str(path)] == []
+    jane = comparison.members_ebu['123']
+    assert (jane.first_name, jane.last_name, jane.bbo, jane.status) == (
+        'Jane', 'Smith', '', 'Member')
+    assert comparison.members_ebu['456'].first_name == ''
+
+
+def test_builtin_schema_unchanged():
+    comparison = Compare(Parent(), schemas=[LEAGUE])
+
+    assert sorted(comparison.members_ebu) == ['123', '456', '789']
+    assert comparison.members_ebu['123'].bbo == 'jsmith'
+
+
+def test_invalid_schemas():
+    (schemas, errors) = compile_schemas(
+        [{'ebu': 'No'}, {'name': 'x'}, {'name': 'y', 'ebu': 'No', 'age': 3}])
+
+    assert schemas == BUILTIN_SCHEMAS
+    assert len(errors) == 3
+
+
+def test_missing_columns():
+    parent = Parent()
+    parent.member_file = Value(str(Path(DATA_DIR, 'include.txt')))
+    comparison = Compare(parent)
+
+    assert [error.message for error in comparison.errors
+            if error.path == parent.member_file.get()] == [
+        'No title row with an EBU column found']
@@ -0,0 +1,39 @@
+from members_files.process import Member
+from members_files.search import SearchIndex
+
+ROWS = {
+    '12345': Member('12345', 'Jane', 'Smith', 'jsmith', 'Member'),
+    '23456': Member('23456', 'John', 'Smithson', 'bridgejohn', 'Member'),
+    '34567': Member('34567', 'Alice', 'Brown', 'ab99', 'Member'),
+}
+
+
+def test_search_empty_query_matches_all():
+    assert SearchIndex(ROWS).search('  ') == set(ROWS)
+
+
+def test_search_short_term():
+    index = SearchIndex(ROWS)
+    assert index.search('j') == {'12345', '23456'}
+    assert index.search('ab') == {'34567'}
+
+
+def test_search_narrows_as_typed():
+    index = SearchIndex(ROWS)
+    assert index.search('m') == {'12345', '23456'}
+    assert index.search('mi') == {'12345', '23456'}
+    assert index.search('mit') == {'12345', '23456'}
+    assert index.search('it') == {'12345', '23456'}
+
+
+def test_search_substring():
+    index = SearchIndex(ROWS)
+    assert index.search('smith') == {'12345', '23456'}
+    assert index.search('bridge') == {'23456'}
+    assert index.search('456') == {'23456', '34567'}
+
+
+def test_search_all_words_must_match():
+    index = SearchIndex(ROWS)
+    assert index.search('jane smith') == {'12345'}
+    assert index.search('alice smith') == set()
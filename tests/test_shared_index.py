@@ -0,0 +1,32 @@
+from members_files.bulk_lookup import BulkLookup
+from members_files.daemon import lookup
+from members_files.process import Compare
+from members_files.shared_index import SharedIndexes, map_in_workers
+
+from tests.test_process import Parent
+
+
+def test_attached_indexes_match_comparison():
+    comparison = Compare(Parent())
+    with SharedIndexes.publish(comparison) as published:
+        attached = SharedIndexes.attach(published.name)
+        assert dict(attached.members_ebu) == comparison.members_ebu
+        assert dict(attached.members_bbo) == comparison.members_bbo
+        assert dict(attached.include_index) == comparison.include_index
+        assert '0123' not in attached.members_ebu
+        assert 'nobody' not in attached.include_index
+        attached.close()
+
+
+def shared_lookup(indexes, query):
+    return lookup(indexes.bulk_lookup, query)
+
+
+def test_workers_query_shared_indexes():
+    comparison = Compare(Parent())
+    queries = ['jsmith', '456', 'nobody']
+    with SharedIndexes.publish(comparison) as indexes:
+        results = map_in_workers(
+            shared_lookup, queries, indexes, processes=2)
+    index = BulkLookup(comparison)
+    assert results == [lookup(index, query) for query in queries]
@@ -0,0 +1,22 @@
+from members_files.process import Member
+from members_files.sorting import SortIndex
+
+ROWS = {
+    '900': Member('900', 'Zoe', 'Adams', 'zed', 'Member'),
+    '10000': Member('10000', 'Amy', 'Brown', 'amy', 'Member'),
+    '5000': Member('5000', 'Bob', 'Adams', 'Bobby', 'Member'),
+}
+
+
+def test_sort_ebu_numerically():
+    index = SortIndex(ROWS)
+    assert index.order('ebu') == ['900', '5000', '10000']
+    assert index.order('ebu', reverse=True) == ['10000', '5000', '900']
+
+
+def test_sort_surname_then_first_name():
+    assert SortIndex(ROWS).order('name') == ['5000', '900', '10000']
+
+
+def test_sort_username_ignores_case():
+    assert SortIndex(ROWS).order('username') == ['10000', '5000', '900']
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from members_files.stall_monitor import StallMonitor
+
+
+class FakeRoot():
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+        return f'after#{len(self.callbacks)}'
+
+    def after_cancel(self, after_id):
+        pass
+
+
+def test_stall_is_logged_with_main_thread_stack(mocker):
+    logger = mocker.patch('members_files.stall_monitor.logger')
+    monitor = StallMonitor(FakeRoot(), threshold_ms=100)
+    monitor._schedule(0.0)
+
+    # The watcher thread samples the stack while the main thread is busy
+    watcher = threading.Thread(target=monitor.check, args=(1.0,))
+    watcher.start()
+    watcher.join()
+    monitor.record(950.0, monitor._sample)
+
+    (message,), kwargs = logger.warning.call_args
+    assert message == 'Main loop stalled'
+    assert kwargs['stalled_ms'] == 950
+    assert 'test_stall_is_logged_with_main_thread_stack' in kwargs['stack']
+
+
+def test_histogram_at_stop(mocker):
+    logger = mocker.patch('members_files.stall_monitor.logger')
+    root = FakeRoot()
+    monitor = StallMonitor(root, threshold_ms=100, interval_ms=1)
+    monitor._schedule(time.perf_counter())
+    for latency in (5, 5, 30, 400):
+        monitor.record(latency)
+    root.callbacks[-1]()
+    monitor.stop()
+
+    assert monitor.stalls == 1
+    assert logger.info.call_args.kwargs['worst_ms'] == 400
+    assert '<=10ms: ' in monitor.histogram_text()
+    assert '<=500ms: 1' in monitor.histogram_text()
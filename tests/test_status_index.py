@@ -0,0 +1,27 @@
+from members_files.process import Compare
+from members_files.status_index import StatusIndex
+
+from tests.test_process import Parent
+
+
+def _missing(roster, statuses, flag):
+    bits = (roster.status_bits(statuses) & roster.flag('has_bbo')
+            & roster.flag(flag, False))
+    return list(roster.select(bits))
+
+
+def test_status_filters():
+    comparison = Compare(Parent())
+    roster = StatusIndex(comparison.pipeline.get('joined'))
+
+    assert list(roster.statuses) == ['Lapsed', 'Member']
+    assert list(roster.select(roster.flag('has_member', False))) == [
+        'bbo:someoneelse']
+    # Member alone gives the built-in results
+    assert _missing(roster, ['Member'], 'in_main_include') == list(
+        comparison.missing_from_include)
+    assert _missing(roster, ['Member'], 'in_names') == list(
+        comparison.missing_from_bbo)
+    assert _missing(roster, ['Member', 'Lapsed'], 'in_main_include') == [
+        '456', '789']
+    assert _missing(roster, ['Lapsed'], 'in_names') == []
@@ -0,0 +1,63 @@
+import zipfile
+from pathlib import Path
+
+from members_files.csv_utils import get_records_from_csv_file
+from members_files.process import read_members
+from members_files.xlsx_utils import iter_xlsx_rows
+
+NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+REL_NS = ('xmlns:r="http://schemas.openxmlformats.org/officeDocument/'
+          '2006/relationships"')
+
+WORKBOOK = (f'<workbook {NS} {REL_NS}><sheets>'
+            '<sheet name="Members" sheetId="1" r:id="rId3"/>'
+            '</sheets></workbook>')
+RELS = ('<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+        '2006/relationships"><Relationship Id="rId3" Type="worksheet" '
+        'Target="worksheets/members.xml"/></Relationships>')
+SHARED = (f'<sst {NS}><si><t>EBU</t></si><si><t>SURNAME</t></si>'
+          '<si><r><t>Smith</t></r><r><t>, Jr</t></r></si></sst>')
+SHEET = (f'<worksheet {NS}><sheetData>'
+         '<row r="1"><c r="A1" t="inlineStr"><is><t>Export</t></is></c></row>'
+         '<row r="3"><c r="A3" t="s"><v>0</v></c><c r="B3" t="s"><v>1</v></c>'
+         '</row>'
+         '<row r="4"><c r="A4"><v>12345.0</v></c><c r="C4" t="s"><v>2</v></c>'
+         '</row>'
+         '</sheetData></worksheet>')
+
+
+def _workbook(tmp_path):
+    path = Path(tmp_path, 'members.xlsx')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('xl/workbook.xml', WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', RELS)
+        archive.writestr('xl/sharedStrings.xml', SHARED)
+        archive.writestr('xl/worksheets/members.xml', SHEET)
+    return path
+
+
+def test_iter_xlsx_rows(tmp_path):
+    assert list(iter_xlsx_rows(_workbook(tmp_path))) == [
+        (1, ['Export']),
+        (3, ['EBU', 'SURNAME']),
+        (4, ['12345', '', 'Smith, Jr']),
+    ]
+
+
+def test_records_from_xlsx(tmp_path):
+    (records, fieldnames) = get_records_from_csv_file(
+        _workbook(tmp_path), 'EBU')
+
+    assert fieldnames == ['EBU', 'SURNAME']
+    assert records == [(4, {'EBU': '12345', 'SURNAME': ''})]
+
+
+def test_workbook_without_sheet(tmp_path):
+    path = Path(tmp_path, 'members.xlsx')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('xl/sharedStrings.xml', SHARED)
+    errors = []
+
+    assert list(read_members(str(path), errors)) == []
+    assert [error.line for error in errors] == [0]
+    assert 'sheet1.xml' in errors[0].message